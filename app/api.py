@@ -0,0 +1,18 @@
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+
+from app.services.metrics import metrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Analysis, upload, scheduler and chord edit metrics for Prometheus."""
+    if not metrics.enabled:
+        return PlainTextResponse("Metrics are disabled.", status_code=404)
+    return Response(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+api = Starlette(routes=[Route("/metrics", metrics_endpoint)])
@@ -1,7 +1,9 @@
 import reflex as rx
+from app.api import api
 from app.states.base import State
 from app.components.sidebar import sidebar
 from app.components.main_content import main_content
+from app.services.workers import analysis_engine_lifespan
 
 
 def index() -> rx.Component:
@@ -17,6 +19,7 @@ def index() -> rx.Component:
 
 
 app = rx.App(
+    api_transformer=api,
     theme=rx.theme(appearance="light"),
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
@@ -26,6 +29,8 @@ app = rx.App(
             rel="stylesheet",
         ),
         rx.el.script(src="/js/audio_player.js"),
+        rx.el.script(src="/js/playhead.js"),
     ],
 )
+app.register_lifespan_task(analysis_engine_lifespan)
 app.add_page(index, title="Chord Analyzer")
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""Headless batch analysis of audio libraries.
+
+Analyzes every audio file under a directory (or listed in a manifest) on a
+process pool and appends one JSON record per file to a JSONL output. Files
+that already have a successful record in the output are skipped, so an
+interrupted run resumes where it stopped. Results also land in the shared
+analysis result cache, so the web app opens pre-analyzed tracks instantly.
+
+    python -m app.batch ~/Music --output catalog.jsonl --workers 8 --quality fast
+
+This module must not import Reflex or ``app.states``.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Iterator
+
+from app.services.analysis import (
+    analysis_fingerprint,
+    iter_analysis_stages,
+    merge_partial,
+)
+from app.services.presets import DEFAULT_PRESET, QUALITY_PRESETS
+from app.services.result_cache import hash_file, result_cache
+from app.services.workers import analysis_process_pool
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".flac", ".ogg"}
+PROGRESS_EVERY_S = 10.0
+
+
+def discover(source: Path) -> Iterator[Path]:
+    """Audio files under directory ``source``, or the paths listed in manifest ``source``.
+
+    Manifests hold one path per line; relative paths are resolved against
+    the manifest's directory, and blank lines and ``#`` comments are skipped.
+    """
+    if source.is_dir():
+        for path in sorted(source.rglob("*")):
+            if path.suffix.lower() in AUDIO_EXTENSIONS and path.is_file():
+                yield path
+        return
+    with source.open() as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield (source.parent / line).resolve()
+
+
+def completed_paths(output: Path, quality: str = DEFAULT_PRESET) -> set[str]:
+    """Paths that already have a successful ``quality`` record in ``output``."""
+    done = set()
+    if not output.exists():
+        return done
+    with output.open() as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if (
+                record.get("status") == "ok"
+                and record.get("quality", DEFAULT_PRESET) == quality
+            ):
+                done.add(record["path"])
+    return done
+
+
+def analyze_path(
+    path: str, use_cache: bool = True, quality: str = DEFAULT_PRESET
+) -> dict:
+    """Analyze one file in the current process and return its output record."""
+    start = time.perf_counter()
+    try:
+        audio_hash = hash_file(Path(path))
+        fingerprint = analysis_fingerprint(quality)
+        results = result_cache.get(audio_hash, fingerprint) if use_cache else None
+        cached = results is not None
+        if not cached:
+            results = {"chords": []}
+            for partial in iter_analysis_stages(
+                Path(path), quality, audio_hash=audio_hash, use_cache=use_cache
+            ):
+                merge_partial(results, partial)
+            result_cache.put(audio_hash, fingerprint, results)
+        # Stage timings of a cached result describe the run that produced it.
+        summary = {} if cached else results.get("metrics", {})
+        results = {field: v for field, v in results.items() if field != "metrics"}
+        timings = {
+            stage: totals["wall_s"]
+            for stage, totals in summary.get("stages", {}).items()
+        }
+    except Exception as e:
+        return {
+            "path": path,
+            "status": "error",
+            "quality": quality,
+            "error": f"{type(e).__name__}: {e}",
+        }
+    timings["total"] = time.perf_counter() - start
+    return {
+        "path": path,
+        "status": "ok",
+        "quality": quality,
+        "audio_hash": audio_hash,
+        "cached": cached,
+        **results,
+        "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+        "peak_rss_bytes": summary.get("peak_rss_bytes"),
+    }
+
+
+def run_batch(
+    paths: list[str],
+    output: Path,
+    workers: int,
+    use_cache: bool = True,
+    quality: str = DEFAULT_PRESET,
+) -> dict:
+    """Fan ``paths`` out over ``workers`` processes, appending records to ``output``.
+
+    At most ``2 * workers`` files are in flight, so huge catalogs are not
+    queued up front. Returns run statistics.
+    """
+    stats = {"ok": 0, "error": 0, "cached": 0}
+    start = last_report = time.perf_counter()
+    pending = set()
+    queue = iter(paths)
+    with analysis_process_pool(workers) as pool, output.open("a") as out:
+        while True:
+            for path in queue:
+                pending.add(pool.submit(analyze_path, path, use_cache, quality))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                out.write(json.dumps(record, default=float) + "\n")
+                stats[record["status"]] += 1
+                stats["cached"] += record.get("cached", False)
+                if record["status"] == "error":
+                    logging.warning(f"{record['path']}: {record['error']}")
+            out.flush()
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_EVERY_S:
+                last_report = now
+                finished = stats["ok"] + stats["error"]
+                logging.info(
+                    f"{finished}/{len(paths)} files, "
+                    f"{finished / (now - start) * 60:.1f} files/min"
+                )
+    stats["elapsed_s"] = time.perf_counter() - start
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="directory or manifest file")
+    parser.add_argument(
+        "-o", "--output", type=Path, default=Path("analysis.jsonl"), help="JSONL output"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1, help="processes"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="ignore the analysis result cache and feature store",
+    )
+    parser.add_argument(
+        "-q",
+        "--quality",
+        choices=sorted(QUALITY_PRESETS),
+        default=DEFAULT_PRESET,
+        help="analysis quality preset",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    done = completed_paths(args.output, args.quality)
+    paths = [str(p) for p in discover(args.source) if str(p) not in done]
+    logging.info(f"{len(paths)} files to analyze, {len(done)} already done")
+    if not paths:
+        return 0
+    stats = run_batch(
+        paths, args.output, max(1, args.workers), not args.no_cache, args.quality
+    )
+    finished = stats["ok"] + stats["error"]
+    logging.info(
+        f"Analyzed {finished} files ({stats['ok']} ok, {stats['error']} failed, "
+        f"{stats['cached']} from cache) in {stats['elapsed_s']:.1f}s: "
+        f"{finished / stats['elapsed_s'] * 60:.1f} files/min"
+    )
+    return 1 if stats["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
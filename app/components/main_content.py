@@ -1,5 +1,11 @@
 import reflex as rx
-from app.states.base import State, SUPPORTED_MIME_TYPES, MAX_FILE_SIZE_BYTES
+from app.states.base import (
+    State,
+    SUPPORTED_MIME_TYPES,
+    MAX_FILE_SIZE_BYTES,
+    PLAYHEAD_SYNC_INTERVAL_MS,
+)
+from app.services.presets import QUALITY_PRESETS
 
 
 def transport_controls() -> rx.Component:
@@ -32,8 +38,17 @@ def transport_controls() -> rx.Component:
         rx.el.div(
             rx.text(
                 f"{State.current_time.to_string()}s",
+                id="playback-time",
                 class_name="text-sm font-mono text-gray-600",
             ),
+            rx.el.button(
+                id="playhead-sync",
+                on_click=State.sync_playhead(
+                    rx.Var("window.playhead.time()"),
+                    rx.Var("window.playhead.playing()"),
+                ),
+                class_name="hidden",
+            ),
             class_name="px-4 py-2 bg-white rounded-lg border border-gray-200 shadow-sm",
         ),
         class_name="flex items-center gap-4",
@@ -87,7 +102,7 @@ def volume_controls() -> rx.Component:
 
 def beat_grid() -> rx.Component:
     return rx.foreach(
-        State.active_project.beats,
+        State.visible_beats,
         lambda beat_time: rx.el.div(
             style={
                 "position": "absolute",
@@ -104,25 +119,37 @@ def beat_grid() -> rx.Component:
 def waveform_display() -> rx.Component:
     return rx.el.div(
         rx.el.div(
+            rx.el.div(class_name="absolute inset-0 bg-gray-100 rounded-lg"),
             rx.el.svg(
-                rx.foreach(
-                    State.active_project.waveform_data,
-                    lambda peak, index: rx.el.rect(
-                        x=f"{index / 2000 * 100}%",
-                        y=f"{(1 - peak) * 50}%",
-                        width=f"{1 / 2000 * 100 * 0.8}%",
-                        height=f"{peak * 100}%",
-                        fill="#34d399",
-                    ),
-                ),
-                view_box="0 0 100 100",
+                rx.el.path(d=State.waveform_path, fill="#34d399"),
+                view_box=State.waveform_view_box,
                 width="100%",
                 height="128px",
                 preserve_aspect_ratio="none",
-                class_name="bg-gray-100 rounded-lg",
+                style={
+                    "position": "absolute",
+                    "top": "0",
+                    "left": f"{State.waveform_view_start * 100}%",
+                    "width": f"{(State.waveform_view_end - State.waveform_view_start) * 100}%",
+                },
+            ),
+            rx.cond(
+                State.waveform_building & (State.waveform_path == ""),
+                rx.el.div(
+                    rx.spinner(class_name="text-emerald-500", size="2"),
+                    rx.el.p("Building waveform...", class_name="text-sm text-gray-500"),
+                    class_name="absolute inset-0 flex items-center justify-center gap-2",
+                ),
+                rx.fragment(),
             ),
             rx.cond(State.analysis_complete, beat_grid(), rx.fragment()),
             rx.el.div(
+                id="playhead",
+                custom_attrs={
+                    "data-duration": State.active_project.duration,
+                    "data-sync-ms": PLAYHEAD_SYNC_INTERVAL_MS,
+                    "data-boundaries": State.chord_boundaries,
+                },
                 style={
                     "position": "absolute",
                     "left": f"{State.current_time / State.active_project.duration.to(float) * 100}%",
@@ -140,7 +167,7 @@ def waveform_display() -> rx.Component:
                 ),
             ),
             rx.el.div(
-                rx.foreach(State.active_project.chords, chord_chip),
+                rx.foreach(State.visible_chords, chord_chip),
                 class_name="absolute top-0 left-0 w-full h-[128px]",
                 style={"pointer_events": "none"},
             ),
@@ -152,6 +179,8 @@ def waveform_display() -> rx.Component:
             on_click=lambda e: State.on_scrub(e.target),
             class_name="relative cursor-pointer h-[128px]",
         ),
+        id="timeline-scroll",
+        on_scroll=State.on_timeline_scroll.throttle(200),
         class_name="w-full overflow-x-auto border border-gray-200 rounded-lg bg-gray-50",
     )
 
@@ -231,22 +260,75 @@ def loading_overlay() -> rx.Component:
     return rx.el.div(
         rx.spinner(class_name="text-emerald-500", size="3"),
         rx.el.p(
-            rx.cond(
-                State.is_uploading,
-                State.upload_message,
-                "Analyzing chords, key, & tempo...",
-            ),
+            State.upload_message,
             class_name="mt-4 text-gray-600 font-medium",
         ),
+        rx.el.progress(
+            value=State.upload_progress,
+            class_name="w-1/2 mt-4 [&::-webkit-progress-bar]:rounded-lg [&::-webkit-progress-value]:rounded-lg [&::-webkit-progress-bar]:bg-slate-300 [&::-webkit-progress-value]:bg-emerald-500 [&::-moz-progress-bar]:bg-emerald-500",
+        ),
+        class_name="absolute inset-0 flex flex-col items-center justify-center bg-gray-50/80 backdrop-blur-sm z-20 rounded-xl",
+    )
+
+
+def chord_editor() -> rx.Component:
+    """Pins the selected chord segment to a corrected label, e.g. "G maj/B"."""
+    return rx.el.div(
+        rx.cond(
+            State.selected_chord,
+            rx.el.form(
+                rx.el.span(
+                    State.selected_chord["label"],
+                    class_name="text-sm font-semibold text-gray-700 whitespace-nowrap",
+                ),
+                rx.icon("arrow-right", size=16, class_name="text-gray-400"),
+                rx.el.input(
+                    value=State.chord_edit_text,
+                    on_change=State.set_chord_edit_text,
+                    placeholder="e.g. G maj/B",
+                    class_name="w-40 px-3 py-2 border border-gray-200 rounded-md text-sm",
+                ),
+                rx.el.button(
+                    "Apply",
+                    type="submit",
+                    disabled=State.is_editing_chords,
+                    class_name="px-3 py-2 bg-emerald-500 text-white text-sm font-semibold rounded-md hover:bg-emerald-600 disabled:bg-gray-400",
+                ),
+                rx.el.button(
+                    rx.icon("x", size=16),
+                    type="button",
+                    on_click=State.close_chord_editor,
+                    class_name="p-2 bg-gray-200 rounded-md hover:bg-gray-300",
+                ),
+                on_submit=lambda _: State.apply_chord_edit(),
+                class_name="flex items-center gap-2",
+            ),
+            rx.el.p("Click a chord to correct it.", class_name="text-sm text-gray-500"),
+        ),
         rx.cond(
-            State.is_uploading,
-            rx.el.progress(
-                value=State.upload_progress,
-                class_name="w-1/2 mt-4 [&::-webkit-progress-bar]:rounded-lg [&::-webkit-progress-value]:rounded-lg [&::-webkit-progress-bar]:bg-slate-300 [&::-webkit-progress-value]:bg-emerald-500 [&::-moz-progress-bar]:bg-emerald-500",
+            State.active_project["chord_edits"].length() > 0,
+            rx.el.button(
+                "Clear edits",
+                on_click=State.clear_chord_edits,
+                disabled=State.is_editing_chords,
+                class_name="px-3 py-2 text-sm text-gray-600 bg-white border border-gray-200 rounded-md hover:bg-gray-100",
             ),
             rx.fragment(),
         ),
-        class_name="absolute inset-0 flex flex-col items-center justify-center bg-gray-50/80 backdrop-blur-sm z-20 rounded-xl",
+        class_name="mt-4 flex items-center justify-between gap-4",
+    )
+
+
+def analysis_progress() -> rx.Component:
+    """Non-blocking status bar so partial results stay visible while analyzing."""
+    return rx.el.div(
+        rx.cond(
+            State.queue_position > 0,
+            rx.icon("clock", size=16, class_name="text-emerald-500"),
+            rx.spinner(class_name="text-emerald-500", size="1"),
+        ),
+        rx.el.p(State.analysis_stage, class_name="text-sm text-gray-600 font-medium"),
+        class_name="flex items-center gap-3 mb-4 px-4 py-2 bg-emerald-50 border border-emerald-200 rounded-lg",
     )
 
 
@@ -287,6 +369,11 @@ def main_content() -> rx.Component:
                         rx.cond(
                             State.has_active_project_audio,
                             rx.el.div(
+                                rx.cond(
+                                    State.is_analyzing,
+                                    analysis_progress(),
+                                    rx.fragment(),
+                                ),
                                 rx.cond(
                                     State.analysis_complete,
                                     rx.el.div(
@@ -302,7 +389,7 @@ def main_content() -> rx.Component:
                                             class_name="text-center p-2 bg-white rounded-lg border border-gray-200",
                                         ),
                                         rx.cond(
-                                            State.chords_detected,
+                                            State.active_project.key,
                                             rx.el.div(
                                                 rx.el.p(
                                                     "Key",
@@ -316,6 +403,21 @@ def main_content() -> rx.Component:
                                             ),
                                             rx.fragment(),
                                         ),
+                                        rx.cond(
+                                            State.key_changes != "",
+                                            rx.el.div(
+                                                rx.el.p(
+                                                    "Key changes",
+                                                    class_name="text-xs text-gray-500",
+                                                ),
+                                                rx.el.p(
+                                                    State.key_changes,
+                                                    class_name="font-semibold text-sm text-emerald-600",
+                                                ),
+                                                class_name="text-center p-2 bg-white rounded-lg border border-gray-200",
+                                            ),
+                                            rx.fragment(),
+                                        ),
                                         rx.el.div(
                                             rx.el.button(
                                                 rx.icon("zoom-in"),
@@ -336,20 +438,39 @@ def main_content() -> rx.Component:
                                         ),
                                         class_name="flex justify-between items-center mb-4",
                                     ),
-                                    rx.el.button(
-                                        "Analyze Audio",
-                                        rx.icon("bar-chart-2", class_name="mr-2"),
-                                        on_click=State.analyze_audio,
-                                        class_name="mb-4 w-full flex items-center justify-center px-4 py-3 bg-emerald-500 text-white font-semibold rounded-lg hover:bg-emerald-600 transition-colors shadow-sm",
+                                    rx.el.div(
+                                        rx.el.select(
+                                            *[
+                                                rx.el.option(preset.label, value=name)
+                                                for name, preset in QUALITY_PRESETS.items()
+                                            ],
+                                            value=State.active_project["quality"],
+                                            on_change=State.set_analysis_quality,
+                                            disabled=State.is_analyzing,
+                                            class_name="px-3 py-3 bg-white border border-gray-200 rounded-lg text-sm text-gray-700",
+                                        ),
+                                        rx.el.button(
+                                            "Analyze Audio",
+                                            rx.icon("bar-chart-2", class_name="mr-2"),
+                                            on_click=State.analyze_audio,
+                                            disabled=State.is_analyzing,
+                                            class_name="flex-1 flex items-center justify-center px-4 py-3 bg-emerald-500 text-white font-semibold rounded-lg hover:bg-emerald-600 transition-colors shadow-sm disabled:bg-gray-400",
+                                        ),
+                                        class_name="mb-4 flex items-center gap-2",
                                     ),
                                 ),
                                 waveform_display(),
+                                rx.cond(
+                                    State.chords_detected,
+                                    chord_editor(),
+                                    rx.fragment(),
+                                ),
                                 class_name="w-full",
                             ),
                             upload_placeholder(),
                         ),
                         rx.cond(
-                            State.is_uploading | State.is_analyzing,
+                            State.is_uploading,
                             loading_overlay(),
                             rx.fragment(),
                         ),
@@ -360,4 +481,4 @@ def main_content() -> rx.Component:
             ),
             class_name="p-8 h-full flex flex-col",
         )
-    )
\ No newline at end of file
+    )
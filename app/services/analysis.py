@@ -1,27 +1,364 @@
 import asyncio
+import hashlib
+import logging
 import librosa
 import numpy as np
 from pathlib import Path
+from typing import AsyncIterator, Generator, Iterator, Optional
 from . import chord_recognition
+from .audio_cache import load_audio
+from .feature_store import AudioFeatures, feature_store
+from .metrics import StageTimer, metrics
+from .presets import DEFAULT_PRESET, AnalysisPreset, get_preset
+from .result_cache import hash_file, result_cache
+from .cancellation import AnalysisCancelled, CancelToken, check_cancelled
+from .workers import analysis_engine
+from .streaming import (
+    STREAMING_MIN_DURATION_S,
+    extract_streaming_features,
+    probe_duration,
+)
 
+ANALYSIS_VERSION = 6
+FEATURES_VERSION = 3
 
-async def run_full_analysis(file_path: Path) -> dict:
-    """Run full analysis (beats, key, chords) on an audio file."""
-    loop = asyncio.get_running_loop()
-    y, sr = await loop.run_in_executor(None, librosa.load, file_path, sr=22050)
-    tempo, beat_frames = await loop.run_in_executor(
-        None, librosa.beat.beat_track, y, sr
+
+def analysis_fingerprint(quality: str = DEFAULT_PRESET) -> str:
+    """Identifies the pipeline version and parameters that produced a result.
+
+    Namespaced by ``quality`` so each preset's cached results survive the others.
+    """
+    preset = get_preset(quality)
+    params = (
+        ANALYSIS_VERSION,
+        preset.sample_rate,
+        preset.chroma,
+        preset.hop_length,
+        preset.beat_hop_length,
+        preset.inversions,
+        chord_recognition.model_fingerprint(),
+        librosa.__version__,
+    )
+    digest = hashlib.sha256(repr(params).encode()).hexdigest()[:16]
+    return f"{preset.name}-{digest}"
+
+
+def feature_fingerprint(quality: str = DEFAULT_PRESET) -> str:
+    """Identifies the extraction parameters behind stored ``AudioFeatures``.
+
+    Decoder parameters are left out, so tuning templates, priors or the
+    Viterbi never invalidates stored features.
+    """
+    preset = get_preset(quality)
+    params = (
+        FEATURES_VERSION,
+        preset.sample_rate,
+        preset.chroma,
+        preset.hop_length,
+        preset.beat_hop_length,
+        chord_recognition.feature_fingerprint(),
+        librosa.__version__,
     )
-    beat_times = librosa.frames_to_time(beat_frames, sr=sr)
-    chroma = await loop.run_in_executor(None, librosa.feature.chroma_cqt, y, sr)
-    key = await loop.run_in_executor(None, chord_recognition.detect_key, chroma)
-    chords = await loop.run_in_executor(
-        None, chord_recognition.recognize_chords, chroma, beat_times, sr
+    digest = hashlib.sha256(repr(params).encode()).hexdigest()[:16]
+    return f"{preset.name}-{digest}"
+
+
+def _should_stream(file_path: Path) -> bool:
+    try:
+        return probe_duration(file_path) > STREAMING_MIN_DURATION_S
+    except Exception:
+        logging.warning(f"Could not probe {file_path}; analyzing in memory")
+        return False
+
+
+def _split_result(results: dict) -> list[dict]:
+    """Break a complete result into the partial updates of a progressive run."""
+    return [
+        {"stage": "duration", "duration": results["duration"]},
+        {"stage": "beats", "tempo": results["tempo"], "beats": results["beats"]},
+        {
+            "stage": "key",
+            "key": results["key"],
+            "key_timeline": results.get("key_timeline", []),
+        },
+        {"stage": "chords", "chords": results["chords"]},
+    ]
+
+
+def merge_partial(results: dict, partial: dict) -> dict:
+    """Apply a partial update in place."""
+    for field, value in partial.items():
+        if field != "stage":
+            results[field] = value
+    return results
+
+
+def _beat_times(beat_frames: np.ndarray, preset: AnalysisPreset) -> np.ndarray:
+    return librosa.frames_to_time(
+        beat_frames, sr=preset.sample_rate, hop_length=preset.beat_hop_length
     )
+
+
+def _beats_update(features: AudioFeatures, preset: AnalysisPreset) -> dict:
     return {
+        "stage": "beats",
+        "tempo": features.tempo,
+        "beats": _beat_times(features.beat_frames, preset).tolist(),
+    }
+
+
+def _iter_feature_stages(
+    file_path: Path,
+    preset: AnalysisPreset,
+    cancel_token: Optional[CancelToken],
+    timer: StageTimer,
+) -> Generator[dict, None, AudioFeatures]:
+    """Extract ``AudioFeatures``, yielding the duration and beat updates on the way."""
+    if _should_stream(file_path):
+        yield {"stage": "duration", "duration": probe_duration(file_path)}
+        with timer.stage("stream"):
+            features = extract_streaming_features(file_path, preset, cancel_token)
+        yield {"stage": "duration", "duration": features.duration}
+        yield _beats_update(features, preset)
+        return features
+    with timer.stage("load"):
+        y, sr = load_audio(file_path, preset.sample_rate)
+        duration = librosa.get_duration(y=y, sr=sr)
+    yield {"stage": "duration", "duration": duration}
+    check_cancelled(cancel_token)
+    with timer.stage("beats"):
+        onset_envelope = librosa.onset.onset_strength(
+            y=y, sr=sr, hop_length=preset.beat_hop_length, aggregate=np.median
+        )
+        tempo, beat_frames = librosa.beat.beat_track(
+            onset_envelope=onset_envelope, sr=sr, hop_length=preset.beat_hop_length
+        )
+    tempo = float(np.atleast_1d(tempo)[0])
+    yield {
+        "stage": "beats",
         "tempo": tempo,
-        "beats": beat_times.tolist(),
-        "key": key,
-        "chords": chords,
-        "duration": librosa.get_duration(y=y, sr=sr),
-    }
\ No newline at end of file
+        "beats": _beat_times(beat_frames, preset).tolist(),
+    }
+    check_cancelled(cancel_token)
+    with timer.stage("chroma"):
+        tuning = (
+            chord_recognition.estimate_tuning(y, sr) if preset.chroma == "cqt" else None
+        )
+        chroma, bass_chroma = chord_recognition.chroma_features(
+            y, sr, preset.hop_length, tuning, preset.chroma
+        )
+    return AudioFeatures(
+        duration=duration,
+        tempo=tempo,
+        tuning=tuning,
+        onset_envelope=onset_envelope,
+        beat_frames=beat_frames,
+        chroma=chroma,
+        bass_chroma=bass_chroma,
+    )
+
+
+def _chord_lattice(
+    features: AudioFeatures, preset: AnalysisPreset, key: str
+) -> chord_recognition.ChordLattice:
+    return chord_recognition.chord_lattice(
+        features.chroma,
+        _beat_times(features.beat_frames, preset),
+        preset.sample_rate,
+        key,
+        features.bass_chroma if preset.inversions else None,
+        preset.hop_length,
+    )
+
+
+def _iter_decode_stages(
+    features: AudioFeatures,
+    preset: AnalysisPreset,
+    cancel_token: Optional[CancelToken],
+    timer: StageTimer,
+) -> Iterator[dict]:
+    """Key, key timeline and chord updates decoded from ``features``."""
+    with timer.stage("key"):
+        key = chord_recognition.detect_key(features.chroma)
+        key_timeline = chord_recognition.key_timeline(
+            features.chroma, preset.sample_rate, preset.hop_length
+        )
+    yield {"stage": "key", "key": key, "key_timeline": key_timeline}
+    check_cancelled(cancel_token)
+    with timer.stage("chords"):
+        lattice = _chord_lattice(features, preset, key)
+        chords = chord_recognition.lattice_segments(
+            lattice, chord_recognition.decode_lattice(lattice)
+        )
+    yield {"stage": "chords", "chords": chords}
+
+
+def decode_features(features: AudioFeatures, quality: str = DEFAULT_PRESET) -> dict:
+    """The complete analysis result for already extracted ``features``."""
+    preset = get_preset(quality)
+    results = {"chords": [], "duration": features.duration}
+    merge_partial(results, _beats_update(features, preset))
+    for partial in _iter_decode_stages(
+        features, preset, None, StageTimer(enabled=False)
+    ):
+        merge_partial(results, partial)
+    return results
+
+
+def load_features(
+    file_path: Path, quality: str = DEFAULT_PRESET, audio_hash: Optional[str] = None
+) -> AudioFeatures:
+    """Stored features of ``file_path``, extracting and storing them first if missing."""
+    if audio_hash is None:
+        audio_hash = hash_file(file_path)
+    fingerprint = feature_fingerprint(quality)
+    features = feature_store.get(audio_hash, fingerprint)
+    if features is None:
+        stages = _iter_feature_stages(
+            file_path, get_preset(quality), None, StageTimer(enabled=False)
+        )
+        while True:
+            try:
+                next(stages)
+            except StopIteration as done:
+                features = done.value
+                break
+        feature_store.put(audio_hash, fingerprint, features)
+    return features
+
+
+def load_chord_lattice(
+    file_path: Path, quality: str = DEFAULT_PRESET, audio_hash: Optional[str] = None
+) -> chord_recognition.ChordLattice:
+    """The chord decoder's lattice for ``file_path``, as the last analysis built it."""
+    features = load_features(file_path, quality, audio_hash)
+    key = chord_recognition.detect_key(features.chroma)
+    return _chord_lattice(features, get_preset(quality), key)
+
+
+def iter_analysis_stages(
+    file_path: Path,
+    quality: str = DEFAULT_PRESET,
+    cancel_token: Optional[CancelToken] = None,
+    audio_hash: Optional[str] = None,
+    use_cache: bool = True,
+) -> Iterator[dict]:
+    """Blocking analysis pipeline yielding partial results as each stage completes.
+
+    Yields, in order: ``duration``, then ``tempo``/``beats``, then ``key``, then
+    ``chords``, decoded in one pass over the whole file. Each update carries a
+    ``stage`` name.
+    Files longer than ``STREAMING_MIN_DURATION_S`` are analyzed block by block.
+    ``quality`` names the ``QUALITY_PRESETS`` entry that sets the sample rate,
+    chroma method and frame resolutions. ``cancel_token`` is checked between
+    stages.
+
+    Extracted features are kept in the ``feature_store`` under ``audio_hash``
+    (hashed from the file if not given), so when only decoder parameters have
+    changed, a rerun skips loading the audio and goes straight to decoding.
+
+    The last update, stage ``metrics``, carries the wall and CPU time of each
+    stage, the peak RSS and the throughput (``StageTimer.as_dict``); it is
+    empty when metrics are disabled.
+    """
+    preset = get_preset(quality)
+    with StageTimer() as timer:
+        features = None
+        if use_cache:
+            with timer.stage("feature_store"):
+                if audio_hash is None:
+                    audio_hash = hash_file(file_path)
+                fingerprint = feature_fingerprint(quality)
+                features = feature_store.get(audio_hash, fingerprint)
+        if features is not None:
+            yield {"stage": "duration", "duration": features.duration}
+            yield _beats_update(features, preset)
+        else:
+            features = yield from _iter_feature_stages(
+                file_path, preset, cancel_token, timer
+            )
+            if use_cache:
+                with timer.stage("feature_store"):
+                    feature_store.put(audio_hash, fingerprint, features)
+        check_cancelled(cancel_token)
+        yield from _iter_decode_stages(features, preset, cancel_token, timer)
+        yield {"stage": "metrics", "metrics": timer.as_dict(features.duration)}
+
+
+async def find_cached_analysis(
+    file_path: Path, audio_hash: Optional[str] = None, quality: str = DEFAULT_PRESET
+) -> tuple[str, Optional[dict]]:
+    """Return the audio hash and the cached ``quality`` result for ``file_path``, if any."""
+    loop = asyncio.get_running_loop()
+    if audio_hash is None:
+        audio_hash = await loop.run_in_executor(None, hash_file, file_path)
+    cached = await loop.run_in_executor(
+        None, result_cache.get, audio_hash, analysis_fingerprint(quality)
+    )
+    return (audio_hash, cached)
+
+
+async def run_progressive_analysis(
+    file_path: Path,
+    audio_hash: Optional[str] = None,
+    use_cache: bool = True,
+    cancel_token: Optional[CancelToken] = None,
+    quality: str = DEFAULT_PRESET,
+) -> AsyncIterator[dict]:
+    """Analyze an audio file, yielding the updates of ``iter_analysis_stages``.
+
+    The whole pipeline runs in one call on an ``analysis_engine`` worker.
+    Results are cached on disk by audio content hash and ``analysis_fingerprint``.
+    Stage timings of fresh runs are folded into ``metrics``.
+    """
+    loop = asyncio.get_running_loop()
+    fingerprint = analysis_fingerprint(quality)
+    if use_cache:
+        audio_hash, cached = await find_cached_analysis(file_path, audio_hash, quality)
+        if cached is not None:
+            metrics.inc("analyses_total", quality=quality, status="cached")
+            for partial_result in _split_result(cached):
+                yield partial_result
+            return
+    results = {"chords": []}
+    try:
+        async for partial_result in analysis_engine.stream(
+            file_path,
+            iter_analysis_stages,
+            file_path,
+            quality,
+            cancel_token,
+            audio_hash,
+            use_cache,
+            cancel_token=cancel_token,
+        ):
+            if partial_result["stage"] == "metrics":
+                metrics.record_analysis(quality, partial_result["metrics"])
+            merge_partial(results, partial_result)
+            yield partial_result
+    except AnalysisCancelled:
+        metrics.inc("analyses_total", quality=quality, status="cancelled")
+        raise
+    except Exception:
+        metrics.inc("analyses_total", quality=quality, status="error")
+        raise
+    metrics.inc("analyses_total", quality=quality, status="ok")
+    if use_cache:
+        await loop.run_in_executor(
+            None, result_cache.put, audio_hash, fingerprint, results
+        )
+
+
+async def run_full_analysis(
+    file_path: Path,
+    audio_hash: Optional[str] = None,
+    use_cache: bool = True,
+    quality: str = DEFAULT_PRESET,
+) -> dict:
+    """Run full analysis (beats, key, chords) on an audio file."""
+    results = {"chords": []}
+    async for partial_result in run_progressive_analysis(
+        file_path, audio_hash, use_cache, quality=quality
+    ):
+        merge_partial(results, partial_result)
+    return results
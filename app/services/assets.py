@@ -0,0 +1,180 @@
+import functools
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from .chord_recognition import (
+    CHORD_BASS_INTERVALS,
+    CHORD_LABELS,
+    chord_name,
+    chord_notes,
+)
+from .disk_cache import evict_lru
+from .project_store import project_store
+
+UPLOAD_DIR = Path(os.environ.get("REFLEX_UPLOADED_FILES_DIR", "uploaded_files"))
+ASSET_SUBDIR = "analysis_assets"
+ANALYSIS_ASSETS_MAX_BYTES = int(
+    os.environ.get("ANALYSIS_ASSETS_MAX_BYTES", 512 * 1024 * 1024)
+)
+ASSET_CACHE_ENTRIES = 64
+# A timeline window sends at most this many beats and chords to the client,
+# however long the track, so session state does not grow with duration.
+MAX_WINDOW_BEATS = 1024
+MAX_WINDOW_CHORDS = 256
+
+BEAT_DTYPE = np.dtype("<f4")
+CHORD_DTYPE = np.dtype(
+    [
+        ("start_time", "<f4"),
+        ("end_time", "<f4"),
+        ("label", "<u2"),
+        ("inversion", "u1"),
+        ("confidence", "<f2"),
+    ]
+)
+# Chord tables store vocabulary and bass option indices, so they carry the
+# vocabulary they were written against and are refused once it changes.
+VOCABULARY_DIGEST = hashlib.sha256(
+    f"{'|'.join(CHORD_LABELS)}|{CHORD_BASS_INTERVALS!r}".encode()
+).digest()[:8]
+LABEL_INDEX = {label.replace(":", " "): i for i, label in enumerate(CHORD_LABELS)}
+
+
+class StaleAssetError(ValueError):
+    pass
+
+
+class AnalysisAssetStore:
+    """Immutable, content-addressed binary blobs served as static upload files.
+
+    Each blob is named by the hash of its bytes under ``ASSET_SUBDIR`` of the
+    upload directory, so its URL never changes meaning and can be cached
+    forever. Reads refresh an entry's mtime; the total size is kept under
+    ``max_bytes`` by deleting the least recently used blobs. Blobs named by
+    ``referenced()`` (those saved projects point to) are never deleted and
+    do not count toward the budget, which only bounds superseded results.
+    """
+
+    def __init__(
+        self,
+        root: Path = UPLOAD_DIR / ASSET_SUBDIR,
+        max_bytes: int = ANALYSIS_ASSETS_MAX_BYTES,
+        referenced: Optional[Callable[[], set[str]]] = None,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.referenced = referenced
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes, suffix: str) -> str:
+        """Store ``data``; returns its name relative to the upload directory."""
+        file_name = f"{hashlib.sha256(data).hexdigest()[:32]}{suffix}"
+        path = self.root / file_name
+        if not path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._evict()
+        return f"{ASSET_SUBDIR}/{file_name}"
+
+    def read(self, name: str) -> bytes:
+        path = self.root / Path(name).name
+        data = path.read_bytes()
+        os.utime(path)
+        return data
+
+    def _referenced_names(self) -> set[str]:
+        return {Path(name).name for name in self.referenced()}
+
+    def _evict(self):
+        pinned = None if self.referenced is None else self._referenced_names
+        with self._lock:
+            for entry in evict_lru(self.root.iterdir(), self.max_bytes, pinned):
+                logging.info(f"Evicted analysis asset {entry.name}")
+
+
+asset_store = AnalysisAssetStore(referenced=project_store.referenced_assets)
+
+
+def store_beats(beats: list[float]) -> str:
+    """Beat times as little-endian float32 seconds."""
+    return asset_store.put(np.asarray(beats, dtype=BEAT_DTYPE).tobytes(), ".f32")
+
+
+def store_chords(chords: list[dict]) -> str:
+    """Chord segments as a packed table of ``CHORD_DTYPE`` records."""
+    table = np.zeros(len(chords), dtype=CHORD_DTYPE)
+    for i, chord in enumerate(chords):
+        table[i] = (
+            chord["start_time"],
+            chord["end_time"],
+            LABEL_INDEX[f"{chord['root']} {chord['quality']}"],
+            chord["inversion"],
+            chord["confidence"],
+        )
+    return asset_store.put(VOCABULARY_DIGEST + table.tobytes(), ".chords")
+
+
+@functools.lru_cache(maxsize=ASSET_CACHE_ENTRIES)
+def load_beats(name: str) -> np.ndarray:
+    return np.frombuffer(asset_store.read(name), dtype=BEAT_DTYPE)
+
+
+@functools.lru_cache(maxsize=ASSET_CACHE_ENTRIES)
+def load_chord_table(name: str) -> np.ndarray:
+    data = asset_store.read(name)
+    if data[: len(VOCABULARY_DIGEST)] != VOCABULARY_DIGEST:
+        raise StaleAssetError(f"Chord table {name} uses a different vocabulary.")
+    return np.frombuffer(data[len(VOCABULARY_DIGEST) :], dtype=CHORD_DTYPE)
+
+
+def beats_in_window(beats: np.ndarray, start: float, end: float) -> np.ndarray:
+    """Beats between ``start`` and ``end``, thinned to at most ``MAX_WINDOW_BEATS``."""
+    lo, hi = np.searchsorted(beats, [start, end])
+    step = max(1, -(-(hi - lo) // MAX_WINDOW_BEATS))
+    return beats[lo:hi:step]
+
+
+def chords_in_window(table: np.ndarray, start: float, end: float) -> np.ndarray:
+    """Chord records overlapping ``start``..``end``.
+
+    When more than ``MAX_WINDOW_CHORDS`` overlap, only those covering at least
+    ``1 / MAX_WINDOW_CHORDS`` of the window are kept; the others would be too
+    narrow to read at this zoom anyway. The visible parts of the kept chords
+    add up to at most the window, so there are never more than the cap.
+    """
+    table = table[(table["end_time"] > start) & (table["start_time"] < end)]
+    if len(table) <= MAX_WINDOW_CHORDS:
+        return table
+    covered = np.minimum(table["end_time"], end) - np.maximum(
+        table["start_time"], start
+    )
+    return table[covered >= (end - start) / MAX_WINDOW_CHORDS]
+
+
+def chord_segments(table: np.ndarray) -> list[dict]:
+    """Expand packed chord records into the segment dicts the UI renders."""
+    segments = []
+    for start_time, end_time, label_index, inversion, confidence in table.tolist():
+        label = CHORD_LABELS[label_index]
+        root, quality = label.split(":")
+        segments.append(
+            {
+                "start_time": round(start_time, 3),
+                "end_time": round(end_time, 3),
+                "label": chord_name(label, inversion),
+                "root": root,
+                "quality": quality,
+                "inversion": inversion,
+                "confidence": round(confidence, 3),
+                "notes": chord_notes(label, inversion),
+            }
+        )
+    return segments
@@ -0,0 +1,102 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+ANALYSIS_SR = 22050
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get("AUDIO_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+class DecodedAudioCache:
+    """Byte-budgeted LRU of decoded, resampled mono audio shared across sessions.
+
+    Entries are keyed by path, size, mtime and sample rate, so a re-uploaded
+    file under the same name is decoded again. Cached arrays are read-only.
+    """
+
+    def __init__(self, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple, threading.Lock] = {}
+
+    @staticmethod
+    def _key(file_path: Path, sr: int) -> tuple:
+        stat = os.stat(file_path)
+        return (str(Path(file_path).resolve()), stat.st_size, stat.st_mtime_ns, sr)
+
+    def _get(self, key: tuple):
+        with self._lock:
+            y = self._entries.get(key)
+            if y is not None:
+                self._entries.move_to_end(key)
+            return y
+
+    def _put(self, key: tuple, y: np.ndarray):
+        if y.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = y
+            self.current_bytes += y.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    def load(self, file_path: Path, sr: int = ANALYSIS_SR) -> tuple[np.ndarray, int]:
+        """Decode ``file_path`` to mono at ``sr`` once; later calls share the buffer.
+
+        Files are only ever decoded at ``ANALYSIS_SR``, the rate the waveform
+        uses. Lower rates are resampled from that buffer, so the waveform and
+        an analysis at any preset's rate share one decode, and the samples a
+        preset sees do not depend on which of them ran first.
+        """
+        key = self._key(file_path, sr)
+        y = self._get(key)
+        if y is not None:
+            return (y, sr)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            y = self._get(key)
+            if y is None:
+                import librosa
+
+                if sr < ANALYSIS_SR:
+                    decoded, _ = self.load(file_path, ANALYSIS_SR)
+                    y = librosa.resample(
+                        decoded, orig_sr=ANALYSIS_SR, target_sr=sr, res_type="soxr_hq"
+                    )
+                else:
+                    y, _ = librosa.load(file_path, sr=sr)
+                y.flags.writeable = False
+                self._put(key, y)
+                logging.info(
+                    f"Decoded {Path(file_path).name} at {sr} Hz ({y.nbytes / 1e6:.1f} MB)"
+                )
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return (y, sr)
+
+    def evict(self, file_path: Path):
+        """Drop every cached decode of ``file_path``."""
+        path = str(Path(file_path).resolve())
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                self.current_bytes -= self._entries.pop(key).nbytes
+
+
+audio_cache = DecodedAudioCache()
+
+
+def load_audio(file_path: Path, sr: int = ANALYSIS_SR) -> tuple[np.ndarray, int]:
+    return audio_cache.load(file_path, sr)
+
+
+def evict_audio(file_path: Path):
+    audio_cache.evict(file_path)
@@ -0,0 +1,61 @@
+import logging
+import threading
+from typing import Optional
+
+
+class AnalysisCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """Cooperative cancellation flag that can be shared with worker processes.
+
+    ``event`` is a ``threading.Event`` for in-process work or a manager
+    ``Event`` proxy when the token is sent to a worker process.
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise AnalysisCancelled("Analysis was cancelled.")
+
+
+def check_cancelled(token: Optional[CancelToken]):
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+_active_jobs: dict[str, CancelToken] = {}
+_lock = threading.Lock()
+
+
+def register_job(job_id: str, token: CancelToken):
+    with _lock:
+        _active_jobs[job_id] = token
+
+
+def unregister_job(job_id: str):
+    with _lock:
+        _active_jobs.pop(job_id, None)
+
+
+def cancel_job(job_id: Optional[str]) -> bool:
+    """Cancel the running job ``job_id``; returns whether one was found."""
+    if not job_id:
+        return False
+    with _lock:
+        token = _active_jobs.pop(job_id, None)
+    if token is None:
+        return False
+    token.cancel()
+    logging.info(f"Cancelled analysis job {job_id}")
+    return True
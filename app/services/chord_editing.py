@@ -0,0 +1,102 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from . import chord_recognition
+from .analysis import load_chord_lattice
+from .presets import DEFAULT_PRESET
+from .result_cache import hash_file
+
+EDIT_WINDOW_BEATS = int(os.environ.get("EDIT_WINDOW_BEATS", 32))
+EDIT_SESSION_ENTRIES = 8
+
+
+class ChordEditSession:
+    """One analysis's decoder lattice and its chord path with the edits applied so far.
+
+    An edit pins the beats it covers to a chord and bass option, then only
+    ``EDIT_WINDOW_BEATS`` beats either side are re-decoded, with every pin
+    as a hard constraint and the path outside the window left as it is.
+    """
+
+    def __init__(self, lattice: chord_recognition.ChordLattice):
+        self.lattice = lattice
+        self.decoded_path = chord_recognition.decode_lattice(lattice)
+        self.reset()
+
+    def reset(self):
+        n_beats = len(self.decoded_path)
+        self.path = self.decoded_path.copy()
+        self.pinned = np.full(n_beats, -1, dtype=np.int64)
+        self.pinned_inversions = np.full(n_beats, -1, dtype=np.int16)
+        self.edits: list[dict] = []
+
+    def apply(self, edit: dict):
+        """Pin the beats centred in ``[start_time, end_time)`` to ``edit["chord"]``."""
+        index, inversion = chord_recognition.parse_chord_name(edit["chord"])
+        times = self.lattice.segment_times
+        midpoints = (times[:-1] + times[1:]) / 2
+        lo, hi = np.searchsorted(midpoints, [edit["start_time"], edit["end_time"]])
+        self.edits.append(edit)
+        if lo == hi:
+            return
+        self.pinned[lo:hi] = index
+        self.pinned_inversions[lo:hi] = inversion
+        chord_recognition.decode_window(
+            self.lattice,
+            self.path,
+            self.pinned,
+            max(0, lo - EDIT_WINDOW_BEATS),
+            min(len(self.path), hi + EDIT_WINDOW_BEATS),
+        )
+
+    def segments(self) -> list[dict]:
+        return chord_recognition.lattice_segments(
+            self.lattice, self.path, self.pinned_inversions
+        )
+
+
+_sessions: OrderedDict[tuple[str, str], ChordEditSession] = OrderedDict()
+_lock = threading.Lock()
+
+
+def apply_chord_edits(
+    file_path: Path,
+    edits: list[dict],
+    quality: str = DEFAULT_PRESET,
+    audio_hash: Optional[str] = None,
+) -> list[dict]:
+    """Chord segments of ``file_path`` with ``edits`` applied in order.
+
+    Each edit is ``{"start_time", "end_time", "chord"}`` with a
+    ``chord_name``. Sessions are kept per audio and quality, so when
+    ``edits`` extends the list applied last time only the new edits are
+    re-decoded; any other list is replayed from the unedited decode.
+    Raises ``ValueError`` for an unknown chord name.
+    """
+    if audio_hash is None:
+        audio_hash = hash_file(file_path)
+    with _lock:
+        session = _sessions.pop((audio_hash, quality), None)
+        if session is None:
+            session = ChordEditSession(
+                load_chord_lattice(file_path, quality, audio_hash)
+            )
+        _sessions[(audio_hash, quality)] = session
+        while len(_sessions) > EDIT_SESSION_ENTRIES:
+            _sessions.popitem(last=False)
+        applied = len(session.edits)
+        if edits[:applied] != session.edits:
+            session.reset()
+            applied = 0
+        try:
+            for edit in edits[applied:]:
+                session.apply(edit)
+        except ValueError:
+            session.reset()
+            raise
+        return session.segments()
@@ -1,6 +1,7 @@
+import functools
+import hashlib
 import numpy as np
-from scipy.spatial.distance import cosine
-import librosa
+from typing import NamedTuple, Optional
 
 PITCH_CLASSES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
 KEY_PROFILES = {
@@ -94,115 +95,571 @@ KEY_PROFILES = {
     "A# Minor": [3.52, 5.38, 2.6, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17, 6.33, 2.68],
     "B Minor": [2.68, 3.52, 5.38, 2.6, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17, 6.33],
 }
-CHORD_TEMPLATES = {}
-CHORD_MIDI_INTERVALS = {}
-
-
-def _generate_chord_templates():
-    qualities = {
-        "maj": [0, 4, 7],
-        "min": [0, 3, 7],
-        "dim": [0, 3, 6],
-        "aug": [0, 4, 8],
-        "sus2": [0, 2, 7],
-        "sus4": [0, 5, 7],
-        "maj7": [0, 4, 7, 11],
-        "min7": [0, 3, 7, 10],
-        "dom7": [0, 4, 7, 10],
-        "dim7": [0, 3, 6, 9],
-        "add9": [0, 2, 4, 7],
+SCALE_INTERVALS = {
+    "Major": [0, 2, 4, 5, 7, 9, 11],
+    "Minor": [0, 2, 3, 5, 7, 8, 10, 11],
+}
+HOP_LENGTH = 512
+SELF_TRANSITION_PROB = 0.8
+IN_KEY_WEIGHT = 4.0
+EMISSION_SCALE = 25.0
+KEY_WINDOW_SECONDS = 30.0
+KEY_STEP_SECONDS = 5.0
+KEY_SELF_TRANSITION_PROB = 0.95
+KEY_EMISSION_SCALE = 100.0
+CQT_BINS_PER_OCTAVE = 36
+CQT_OCTAVES = 7
+STFT_N_FFT = 4096
+BASS_OCTAVES = 2.5
+BASS_WEIGHT = 0.3
+INVERSION_PENALTY = 0.025
+CHORD_QUALITIES = {
+    "maj": [0, 4, 7],
+    "min": [0, 3, 7],
+    "dim": [0, 3, 6],
+    "aug": [0, 4, 8],
+    "sus2": [0, 2, 7],
+    "sus4": [0, 5, 7],
+    "maj7": [0, 4, 7, 11],
+    "min7": [0, 3, 7, 10],
+    "dom7": [0, 4, 7, 10],
+    "dim7": [0, 3, 6, 9],
+    "add9": [0, 2, 4, 7],
+}
+CHORD_MIDI_INTERVALS = {
+    f"{root}:{quality}": intervals
+    for root in PITCH_CLASSES
+    for quality, intervals in CHORD_QUALITIES.items()
+}
+CHORD_LABELS = list(CHORD_MIDI_INTERVALS)
+# Bass notes a chord may be heard over, in semitones above its root: its own
+# tones (root position first, then the inversions) followed by common slash
+# basses. A chord segment's ``inversion`` indexes this list.
+SLASH_BASS_INTERVALS = {"maj": [2, 10], "min": [10, 9]}
+CHORD_BASS_INTERVALS = {
+    quality: intervals + SLASH_BASS_INTERVALS.get(quality, [])
+    for quality, intervals in CHORD_QUALITIES.items()
+}
+KEY_LABELS = list(KEY_PROFILES.keys())
+KEY_PROFILE_MATRIX = np.array(list(KEY_PROFILES.values()))
+KEY_PROFILE_MATRIX /= np.linalg.norm(KEY_PROFILE_MATRIX, axis=1, keepdims=True)
+
+
+@functools.cache
+def chord_template_matrix() -> np.ndarray:
+    """Unit-norm pitch-class templates, one read-only row per ``CHORD_LABELS`` entry.
+
+    Built on first use rather than at import, so code that only needs the
+    vocabulary (asset decoding, the UI) stays cheap to load.
+    """
+    templates = np.zeros((len(CHORD_LABELS), 12))
+    for i, label in enumerate(CHORD_LABELS):
+        root = PITCH_CLASSES.index(label.split(":")[0])
+        for interval in CHORD_MIDI_INTERVALS[label]:
+            templates[i, (root + interval) % 12] = 1
+    templates /= np.linalg.norm(templates, axis=1, keepdims=True)
+    templates.flags.writeable = False
+    return templates
+
+
+@functools.cache
+def bass_option_table() -> np.ndarray:
+    """Bass pitch class of each chord's bass options, shape (K, max options).
+
+    Row ``i`` follows ``CHORD_BASS_INTERVALS`` for ``CHORD_LABELS[i]``; chords
+    with fewer options are padded with -1.
+    """
+    width = max(len(options) for options in CHORD_BASS_INTERVALS.values())
+    table = np.full((len(CHORD_LABELS), width), -1)
+    for i, label in enumerate(CHORD_LABELS):
+        root, quality = label.split(":")
+        options = CHORD_BASS_INTERVALS[quality]
+        table[i, : len(options)] = (PITCH_CLASSES.index(root) + np.array(options)) % 12
+    table.flags.writeable = False
+    return table
+
+
+def chord_name(label: str, inversion: int = 0) -> str:
+    """Display name of ``label`` (``"C:maj"``) over a bass option, e.g. ``"C maj/E"``."""
+    root, quality = label.split(":")
+    if inversion == 0:
+        return f"{root} {quality}"
+    bass_interval = CHORD_BASS_INTERVALS[quality][inversion]
+    bass = PITCH_CLASSES[(PITCH_CLASSES.index(root) + bass_interval) % 12]
+    return f"{root} {quality}/{bass}"
+
+
+@functools.cache
+def _chord_name_index() -> dict[str, tuple[int, int]]:
+    return {
+        chord_name(label, inversion): (index, inversion)
+        for index, label in enumerate(CHORD_LABELS)
+        for inversion in range(len(CHORD_BASS_INTERVALS[label.split(":")[1]]))
     }
-    for root_idx, root_name in enumerate(PITCH_CLASSES):
-        for quality, intervals in qualities.items():
-            label = f"{root_name}:{quality}"
-            template = np.zeros(12)
-            midi_notes = []
-            for interval in intervals:
-                pitch_class_idx = (root_idx + interval) % 12
-                template[pitch_class_idx] = 1
-                midi_notes.append(60 + root_idx + interval)
-            CHORD_TEMPLATES[label] = template / np.linalg.norm(template)
-            CHORD_MIDI_INTERVALS[label] = intervals
 
 
-_generate_chord_templates()
+def parse_chord_name(name: str) -> tuple[int, int]:
+    """Vocabulary index and bass option of a ``chord_name`` such as ``"G maj/B"``."""
+    try:
+        return _chord_name_index()[" ".join(name.replace(":", " ").split())]
+    except KeyError:
+        raise ValueError(f"Unknown chord {name!r}") from None
+
+
+def chord_notes(label: str, inversion: int = 0) -> list[int]:
+    """MIDI notes of chord ``label`` (``"C:maj"``) voiced over a bass option.
+
+    Root position is voiced from middle C upwards. Inversions raise the chord
+    tones below the bass by an octave; slash basses sound an octave below.
+    """
+    root, quality = label.split(":")
+    base_midi = 60 + PITCH_CLASSES.index(root)
+    intervals = CHORD_MIDI_INTERVALS[label]
+    bass = CHORD_BASS_INTERVALS[quality][inversion]
+    if bass not in intervals:
+        return [base_midi - 12 + bass] + [base_midi + i for i in intervals]
+    return sorted(base_midi + i + (12 if i < bass else 0) for i in intervals)
+
+
+def estimate_tuning(y: np.ndarray, sr: int, method: str = "cqt") -> float:
+    """Tuning offset in the units ``chroma_features`` takes for ``method``.
+
+    CQT tuning is a fraction of one of its ``CQT_BINS_PER_OCTAVE`` bins, as
+    ``librosa.cqt`` estimates it; STFT chroma filters take a fraction of a
+    semitone, estimated from the same power spectrum the STFT path uses.
+    """
+    import librosa
+
+    if method == "stft":
+        spectrum = np.abs(librosa.stft(y, n_fft=STFT_N_FFT, hop_length=HOP_LENGTH)) ** 2
+        return float(librosa.estimate_tuning(S=spectrum, sr=sr, bins_per_octave=12))
+    return float(
+        librosa.estimate_tuning(y=y, sr=sr, bins_per_octave=CQT_BINS_PER_OCTAVE)
+    )
+
+
+def chroma_features(
+    y: np.ndarray,
+    sr: int,
+    hop_length: int = HOP_LENGTH,
+    tuning: Optional[float] = None,
+    method: str = "cqt",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Full-range and bass chroma, each shape (12, T), from a single transform.
+
+    ``method`` is ``"cqt"`` (equal to ``librosa.feature.chroma_cqt``) or the
+    much cheaper ``"stft"`` (equal to ``librosa.feature.chroma_stft``). The
+    bass chroma folds only the part of the same transform below
+    ``BASS_OCTAVES`` above C1 and is scaled by the full-range peak, so a
+    quiet bass stays small rather than being normalized up to 1.
+    """
+    import librosa
+
+    if method == "cqt":
+        spectrum = np.abs(
+            librosa.cqt(
+                y,
+                sr=sr,
+                hop_length=hop_length,
+                n_bins=CQT_OCTAVES * CQT_BINS_PER_OCTAVE,
+                bins_per_octave=CQT_BINS_PER_OCTAVE,
+                tuning=tuning,
+            )
+        )
+        bass_bins = int(BASS_OCTAVES * CQT_BINS_PER_OCTAVE)
+        chroma_map = librosa.filters.cq_to_chroma(
+            len(spectrum), bins_per_octave=CQT_BINS_PER_OCTAVE
+        )
+    elif method == "stft":
+        spectrum = np.abs(librosa.stft(y, n_fft=STFT_N_FFT, hop_length=hop_length)) ** 2
+        if tuning is None:
+            tuning = librosa.estimate_tuning(S=spectrum, sr=sr, bins_per_octave=12)
+        bass_hz = librosa.note_to_hz("C1") * 2**BASS_OCTAVES
+        bass_bins = int(np.ceil(bass_hz * STFT_N_FFT / sr))
+        chroma_map = librosa.filters.chroma(sr=sr, n_fft=STFT_N_FFT, tuning=tuning)
+    else:
+        raise ValueError(f"Unknown chroma method {method!r}")
+    raw_chroma = chroma_map @ spectrum
+    bass_chroma = chroma_map[:, :bass_bins] @ spectrum[:bass_bins]
+    peak = raw_chroma.max(axis=0, keepdims=True)
+    bass_chroma /= np.where(peak > 0, peak, 1.0)
+    return (librosa.util.normalize(raw_chroma, norm=np.inf, axis=0), bass_chroma)
+
+
+def key_scores(chroma_sums: np.ndarray) -> np.ndarray:
+    """Cosine similarity of every key profile to each chroma column, shape (24, N).
+
+    Columns may be sums or means; all-zero columns score 0 for every key.
+    """
+    norms = np.linalg.norm(chroma_sums, axis=0)
+    return (KEY_PROFILE_MATRIX @ chroma_sums) / np.where(norms > 0, norms, np.inf)
 
 
 def detect_key(chroma: np.ndarray) -> str:
     chroma_mean = np.mean(chroma, axis=1)
-    best_key = ""
-    max_corr = -1
-    for key, profile in KEY_PROFILES.items():
-        corr = 1 - cosine(chroma_mean, np.array(profile))
-        if corr > max_corr:
-            max_corr = corr
-            best_key = key
-    return best_key
-
-
-def recognize_chords(chroma: np.ndarray, beat_times: np.ndarray, sr: int) -> list[dict]:
-    frames_per_beat = (
-        len(chroma[0])
-        * (beat_times[1] - beat_times[0])
-        / (
-            len(chroma[0])
-            * librosa.frames_to_time(1, sr=sr, n_fft=2048, hop_length=512)
-        )
+    if not np.any(chroma_mean):
+        return ""
+    return KEY_LABELS[int(np.argmax(key_scores(chroma_mean[:, None])[:, 0]))]
+
+
+def key_timeline(
+    chroma: np.ndarray,
+    sr: int,
+    hop_length: int = HOP_LENGTH,
+    window_s: float = KEY_WINDOW_SECONDS,
+    step_s: float = KEY_STEP_SECONDS,
+) -> list[dict]:
+    """Smoothed local key over time, as ``start_time``/``end_time``/``key`` segments.
+
+    Windows of ``window_s`` seconds every ``step_s`` seconds are summed from a
+    cumulative chroma sum, so each window costs O(1) regardless of its length.
+    An HMM with a strong self-transition then smooths the per-window scores
+    so brief borrowed chords do not register as modulations.
+    """
+    n_frames = chroma.shape[1]
+    if n_frames == 0:
+        return []
+    frames_per_s = sr / hop_length
+    window = max(1, int(round(window_s * frames_per_s)))
+    step = max(1, int(round(step_s * frames_per_s)))
+    cumulative = np.zeros((chroma.shape[0], n_frames + 1))
+    np.cumsum(chroma, axis=1, out=cumulative[:, 1:])
+    centers = np.arange(0, n_frames, step) + step // 2
+    starts = np.clip(centers - window // 2, 0, n_frames)
+    ends = np.clip(centers + window // 2 + 1, 0, n_frames)
+    scores = key_scores(cumulative[:, ends] - cumulative[:, starts])
+    n_keys = len(KEY_LABELS)
+    off_prob = (1 - KEY_SELF_TRANSITION_PROB) / (n_keys - 1)
+    log_trans = np.full((n_keys, n_keys), np.log(off_prob))
+    np.fill_diagonal(log_trans, np.log(KEY_SELF_TRANSITION_PROB))
+    path = viterbi(
+        KEY_EMISSION_SCALE * scores, log_trans, np.full(n_keys, -np.log(n_keys))
+    )
+    duration = n_frames / frames_per_s
+    boundaries = np.flatnonzero(np.diff(path)) + 1
+    segment_starts = np.concatenate(([0], boundaries))
+    segment_ends = np.concatenate((boundaries, [len(path)]))
+    return [
+        {
+            "start_time": round(float(min(start * step / frames_per_s, duration)), 3),
+            "end_time": round(float(min(end * step / frames_per_s, duration)), 3),
+            "key": KEY_LABELS[path[start]],
+        }
+        for start, end in zip(segment_starts, segment_ends)
+    ]
+
+
+def feature_fingerprint() -> str:
+    """Hash of the front-end parameters that shape chroma and bass chroma."""
+    params = (CQT_BINS_PER_OCTAVE, CQT_OCTAVES, STFT_N_FFT, BASS_OCTAVES)
+    return hashlib.sha256(repr(params).encode()).hexdigest()[:16]
+
+
+def model_fingerprint() -> str:
+    """Hash of the template set and decoder parameters that shape chord output."""
+    digest = hashlib.sha256()
+    digest.update("|".join(CHORD_LABELS).encode())
+    digest.update(chord_template_matrix().tobytes())
+    digest.update(np.array(list(KEY_PROFILES.values())).tobytes())
+    digest.update(
+        repr(
+            (
+                HOP_LENGTH,
+                SELF_TRANSITION_PROB,
+                IN_KEY_WEIGHT,
+                EMISSION_SCALE,
+                SCALE_INTERVALS,
+                KEY_WINDOW_SECONDS,
+                KEY_STEP_SECONDS,
+                KEY_SELF_TRANSITION_PROB,
+                KEY_EMISSION_SCALE,
+                CHORD_BASS_INTERVALS,
+                CQT_BINS_PER_OCTAVE,
+                CQT_OCTAVES,
+                STFT_N_FFT,
+                BASS_OCTAVES,
+                BASS_WEIGHT,
+                INVERSION_PENALTY,
+            )
+        ).encode()
     )
-    hop_length = 512
+    return digest.hexdigest()[:16]
+
+
+def key_chord_prior(key: Optional[str]) -> np.ndarray:
+    """Prior over ``CHORD_LABELS`` favouring chords whose notes lie in ``key``.
+
+    Minor keys use the natural scale plus the leading tone so the major V is
+    in-key. Returns a uniform prior when the key is unknown.
+    """
+    prior = np.ones(len(CHORD_LABELS))
+    if not key:
+        return prior / prior.sum()
+    tonic, mode = key.split(" ")
+    scale = np.zeros(12, dtype=bool)
+    scale[(PITCH_CLASSES.index(tonic) + np.array(SCALE_INTERVALS[mode])) % 12] = True
+    out_of_key = (chord_template_matrix() > 0) & ~scale
+    prior[~out_of_key.any(axis=1)] = IN_KEY_WEIGHT
+    return prior / prior.sum()
+
+
+def key_transition_matrix(
+    key: Optional[str], self_prob: float = SELF_TRANSITION_PROB
+) -> np.ndarray:
+    """Log transition matrix (K, K) with a self-loop bonus and key-informed targets.
+
+    Leaving a chord distributes ``1 - self_prob`` over the other chords in
+    proportion to ``key_chord_prior(key)``.
+    """
+    prior = key_chord_prior(key)
+    trans = (1 - self_prob) * prior[None, :] / (1 - prior)[:, None]
+    np.fill_diagonal(trans, self_prob)
+    return np.log(trans)
+
+
+def viterbi(
+    log_emission: np.ndarray,
+    log_trans: np.ndarray,
+    log_init: np.ndarray,
+    log_final: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Most likely state path for log emissions (K, T) under an HMM.
+
+    ``log_final`` scores the last state, e.g. the transition into a fixed
+    state after the decoded span. Each step is a single (K, K) broadcast;
+    the only Python loop is over time. Emissions may be float32, but path
+    scores are accumulated in float64 and shifted to a maximum of zero at
+    every step, so ties are broken exactly even over hours of beats.
+    """
+    n_states, n_steps = log_emission.shape
+    if n_steps == 0:
+        return np.zeros(0, dtype=int)
+    # Laid out as (to, from) so the per-step argmax runs along contiguous rows.
+    trans_to_from = np.ascontiguousarray(log_trans.T, dtype=np.float64)
+    emission = np.ascontiguousarray(log_emission.T)
+    candidates = np.empty((n_states, n_states), dtype=np.float64)
+    backpointers = np.zeros((n_steps, n_states), dtype=np.int32)
+    score = log_init.astype(np.float64) + emission[0]
+    states = np.arange(n_states)
+    for t in range(1, n_steps):
+        np.add(trans_to_from, score, out=candidates)
+        best_prev = np.argmax(candidates, axis=1)
+        backpointers[t] = best_prev
+        score = candidates[states, best_prev] + emission[t]
+        score -= score.max()
+    if log_final is not None:
+        score = score + log_final
+    path = np.empty(n_steps, dtype=int)
+    path[-1] = np.argmax(score)
+    for t in range(n_steps - 1, 0, -1):
+        path[t - 1] = backpointers[t, path[t]]
+    return path
+
+
+def beat_sync_chroma(chroma: np.ndarray, beat_frames: np.ndarray) -> np.ndarray:
+    """Mean chroma between consecutive beat frames, shape (12, len(beat_frames) - 1).
+
+    Empty segments (start >= end) are left as zero columns.
+    """
+    starts, ends = beat_frames[:-1], beat_frames[1:]
+    valid = starts < ends
+    synced = np.zeros((chroma.shape[0], len(starts)))
+    if not np.any(valid):
+        return synced
+    bounds = np.minimum(np.stack([starts, ends], axis=1).ravel(), chroma.shape[1] - 1)
+    sums = np.add.reduceat(chroma, bounds, axis=1)[:, ::2]
+    synced[:, valid] = sums[:, valid] / (ends - starts)[valid]
+    return synced
+
+
+def chord_emissions(beat_chroma: np.ndarray) -> np.ndarray:
+    """Negative cosine distance of every template to every beat, shape (K, n_beats).
+
+    Equivalent to ``-scipy.spatial.distance.cosine(segment, template)`` per cell,
+    computed with a single matrix product against ``chord_template_matrix()``.
+    Silent beats (zero chroma) carry no evidence and score 0 for every chord.
+    """
+    norms = np.linalg.norm(beat_chroma, axis=0)
+    silent = norms == 0
+    similarity = (chord_template_matrix() @ beat_chroma) / np.where(silent, 1.0, norms)
+    scores = -np.clip(1.0 - similarity, 0.0, 2.0)
+    scores[:, silent] = 0.0
+    return scores
+
+
+def inversion_emissions(
+    log_prob: np.ndarray, beat_bass: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Best bass option of every chord on every beat, scored against bass chroma.
+
+    ``log_prob`` holds the treble scores from ``chord_emissions``. Each bass
+    option adds ``BASS_WEIGHT`` times the beat's bass chroma at its pitch
+    class, and all but root position pay ``INVERSION_PENALTY``, so weak or
+    ambiguous bass leaves chords in root position. Returns the best joint
+    score (K, n_beats) and the option achieving it. A chord's options share
+    its treble score, so only their bass terms are compared; the loop runs
+    over the few options and each step scores every chord on every beat.
+    """
+    table = bass_option_table()
+    weighted = (BASS_WEIGHT * beat_bass).astype(np.float32)
+    best = weighted[table[:, 0]]
+    inversions = np.zeros(best.shape, dtype=np.uint8)
+    for option in range(1, table.shape[1]):
+        rows = np.flatnonzero(table[:, option] >= 0)
+        score = weighted[table[rows, option]] - INVERSION_PENALTY
+        current = best[rows]
+        inversions[rows] = np.where(score > current, option, inversions[rows])
+        best[rows] = np.maximum(current, score)
+    return (log_prob + best, inversions)
+
+
+class ChordLattice(NamedTuple):
+    """Everything the chord decoder scores, one column per beat segment.
+
+    ``emission`` is what Viterbi maximizes; ``log_prob`` the treble scores
+    behind confidences; ``inversions`` the best bass option of every chord on
+    every beat. ``segment_times`` holds the ``n_beats + 1`` segment edges.
+    """
+
+    emission: np.ndarray
+    log_prob: np.ndarray
+    inversions: np.ndarray
+    log_trans: np.ndarray
+    log_init: np.ndarray
+    segment_times: np.ndarray
+
+
+def chord_lattice(
+    chroma: np.ndarray,
+    beat_times: np.ndarray,
+    sr: int,
+    key: Optional[str] = None,
+    bass_chroma: Optional[np.ndarray] = None,
+    hop_length: int = HOP_LENGTH,
+) -> ChordLattice:
+    """Beat-level emissions and transitions for decoding chords from chroma.
+
+    With ``bass_chroma`` every chord takes its best ``CHORD_BASS_INTERVALS``
+    option per beat. Transitions depend only on the chord, so Viterbi over
+    the chords of the best per-beat bass option finds the same path as
+    decoding the full (chord, bass) vocabulary, at the cost of the
+    chord-only decoder. Without it every chord is in root position.
+    """
+    import librosa
+
     beat_frames = librosa.time_to_frames(beat_times, sr=sr, hop_length=hop_length)
     beat_frames = np.concatenate(([0], beat_frames, [chroma.shape[1] - 1]))
-    chord_labels = list(CHORD_TEMPLATES.keys())
-    num_chords = len(chord_labels)
-    log_prob = np.zeros((num_chords, len(beat_frames) - 1))
-    for i in range(len(beat_frames) - 1):
-        start, end = (beat_frames[i], beat_frames[i + 1])
-        if start >= end:
-            continue
-        chroma_segment = np.mean(chroma[:, start:end], axis=1)
-        for j, label in enumerate(chord_labels):
-            template = CHORD_TEMPLATES[label]
-            log_prob[j, i] = -cosine(chroma_segment, template)
-    trans_prob = np.full((num_chords, num_chords), -1.0)
-    np.fill_diagonal(trans_prob, 0.0)
-    path = np.zeros(len(beat_frames) - 1, dtype=int)
-    path[0] = np.argmax(log_prob[:, 0])
-    for i in range(1, len(beat_frames) - 1):
-        path[i] = np.argmax(log_prob[:, i] + trans_prob[path[i - 1], :])
-    chords = []
-    for i in range(len(path)):
-        start_time = beat_times[i] if i < len(beat_times) else beat_times[-1]
-        end_time = (
-            beat_times[i + 1]
-            if i + 1 < len(beat_times)
-            else librosa.frames_to_time(chroma.shape[1], sr=sr, hop_length=hop_length)
+    beat_chroma = beat_sync_chroma(chroma, beat_frames)
+    log_prob = chord_emissions(beat_chroma)
+    log_prob[:, beat_frames[:-1] >= beat_frames[1:]] = 0.0
+    if bass_chroma is None:
+        joint, inversions = (log_prob, np.zeros(log_prob.shape, dtype=np.uint8))
+    else:
+        beat_bass = beat_sync_chroma(bass_chroma, beat_frames)
+        joint, inversions = inversion_emissions(log_prob, beat_bass)
+    segment_times = np.concatenate(
+        (
+            [0.0],
+            beat_times,
+            [librosa.frames_to_time(chroma.shape[1], sr=sr, hop_length=hop_length)],
         )
-        if end_time <= start_time:
-            continue
-        label = chord_labels[path[i]]
+    )
+    return ChordLattice(
+        emission=(EMISSION_SCALE * joint).astype(np.float32),
+        log_prob=log_prob,
+        inversions=inversions,
+        log_trans=key_transition_matrix(key),
+        log_init=np.log(key_chord_prior(key)),
+        segment_times=segment_times,
+    )
+
+
+def decode_lattice(lattice: ChordLattice) -> np.ndarray:
+    """Most likely chord index for every beat segment of ``lattice``."""
+    return viterbi(lattice.emission, lattice.log_trans, lattice.log_init)
+
+
+def decode_window(
+    lattice: ChordLattice,
+    path: np.ndarray,
+    pinned: np.ndarray,
+    start: int,
+    end: int,
+) -> np.ndarray:
+    """Re-decode beats ``[start, end)`` of ``path`` in place, with pins as hard constraints.
+
+    ``pinned`` holds a chord index per beat, or -1 where the decoder is free.
+    The beats either side of the window keep their chords, so the window
+    gets the best path that joins the rest of ``path`` unchanged.
+    """
+    emission = lattice.emission[:, start:end].copy()
+    window_pins = pinned[start:end]
+    columns = np.flatnonzero(window_pins >= 0)
+    if len(columns):
+        kept = emission[window_pins[columns], columns]
+        emission[:, columns] = -np.inf
+        emission[window_pins[columns], columns] = kept
+    log_init = lattice.log_init if start == 0 else lattice.log_trans[path[start - 1]]
+    log_final = None if end == len(path) else lattice.log_trans[:, path[end]]
+    path[start:end] = viterbi(emission, lattice.log_trans, log_init, log_final)
+    return path
+
+
+def lattice_segments(
+    lattice: ChordLattice,
+    path: np.ndarray,
+    pinned_inversions: Optional[np.ndarray] = None,
+) -> list[dict]:
+    """Chord segment dicts for a decoded ``path``, merging repeated labels.
+
+    ``pinned_inversions`` holds a bass option per beat, or -1 to keep the
+    lattice's best one; pinned beats are reported with full confidence.
+    """
+    steps = np.arange(len(path))
+    inversions = lattice.inversions[path, steps].astype(int)
+    confidences = np.clip(1 + lattice.log_prob[path, steps], 0, 1)
+    if pinned_inversions is not None:
+        pinned = pinned_inversions >= 0
+        inversions[pinned] = pinned_inversions[pinned]
+        confidences[pinned] = 1.0
+    times = lattice.segment_times
+    beats = np.flatnonzero(times[1:] > times[:-1])
+    if not len(beats):
+        return []
+    chords_at, inversions_at = (path[beats], inversions[beats])
+    changes = (chords_at[1:] != chords_at[:-1]) | (
+        inversions_at[1:] != inversions_at[:-1]
+    )
+    firsts = np.flatnonzero(np.concatenate(([True], changes)))
+    lasts = np.concatenate((firsts[1:], [len(beats)])) - 1
+    chords = []
+    for first, last in zip(beats[firsts].tolist(), beats[lasts].tolist()):
+        label = CHORD_LABELS[path[first]]
         root, quality = label.split(":")
-        confidence = 1 + log_prob[path[i], i]
-        inversion = 0
-        base_midi = 60 + PITCH_CLASSES.index(root)
-        notes = [base_midi + interval for interval in CHORD_MIDI_INTERVALS[label]]
+        inversion = int(inversions[first])
         chords.append(
             {
-                "start_time": start_time,
-                "end_time": end_time,
-                "label": label.replace(":", " "),
+                "start_time": times[first],
+                "end_time": times[last + 1],
+                "label": chord_name(label, inversion),
                 "root": root,
                 "quality": quality,
                 "inversion": inversion,
-                "confidence": max(0, min(1, confidence)),
-                "notes": notes,
+                "confidence": float(confidences[first]),
+                "notes": chord_notes(label, inversion),
             }
         )
-    if not chords:
-        return []
-    merged_chords = [chords[0]]
-    for i in range(1, len(chords)):
-        if chords[i]["label"] == merged_chords[-1]["label"]:
-            merged_chords[-1]["end_time"] = chords[i]["end_time"]
-        else:
-            merged_chords.append(chords[i])
-    return merged_chords
\ No newline at end of file
+    return chords
+
+
+def recognize_chords(
+    chroma: np.ndarray,
+    beat_times: np.ndarray,
+    sr: int,
+    key: Optional[str] = None,
+    bass_chroma: Optional[np.ndarray] = None,
+    hop_length: int = HOP_LENGTH,
+) -> list[dict]:
+    """Beat-level chord segments decoded from chroma; see ``chord_lattice``."""
+    lattice = chord_lattice(chroma, beat_times, sr, key, bass_chroma, hop_length)
+    return lattice_segments(lattice, decode_lattice(lattice))
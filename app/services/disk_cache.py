@@ -0,0 +1,109 @@
+import logging
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, Container, Iterable, Optional
+
+
+def fingerprint_namespace(fingerprint: str) -> str:
+    """The ``<namespace>`` of a ``<namespace>-<digest>`` fingerprint."""
+    return fingerprint.rpartition("-")[0]
+
+
+def _entry_size(entry: Path) -> int:
+    if entry.is_dir():
+        return sum(f.stat().st_size for f in entry.iterdir())
+    return entry.stat().st_size
+
+
+def _remove(entry: Path):
+    if entry.is_dir():
+        shutil.rmtree(entry, ignore_errors=True)
+    else:
+        entry.unlink(missing_ok=True)
+
+
+def evict_lru(
+    entries: Iterable[Path],
+    max_bytes: int,
+    pinned: Optional[Callable[[], Container[str]]] = None,
+) -> list[Path]:
+    """Delete the least recently used ``entries`` until the rest fit in ``max_bytes``.
+
+    An entry is a file or a directory of files, and its mtime is its last
+    use, which readers refresh with ``os.utime``. Temporary ``.tmp`` entries
+    are ignored, and so are entries deleted by another process while they
+    are measured. When over budget, entries whose names are in ``pinned()``
+    are neither deleted nor counted. Returns the deleted entries.
+    """
+    sized = []
+    for entry in entries:
+        if entry.name.endswith(".tmp"):
+            continue
+        try:
+            sized.append((entry.stat().st_mtime, _entry_size(entry), entry))
+        except FileNotFoundError:
+            continue
+    total = sum(size for _, size, _ in sized)
+    if total <= max_bytes:
+        return []
+    if pinned is not None:
+        keep = pinned()
+        sized = [e for e in sized if e[2].name not in keep]
+        total = sum(size for _, size, _ in sized)
+    evicted = []
+    for _, size, entry in sorted(sized, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        _remove(entry)
+        evicted.append(entry)
+        total -= size
+    return evicted
+
+
+class FingerprintedStore:
+    """Base of the on-disk stores keyed by audio hash and parameter fingerprint.
+
+    Entries made with each fingerprint live in their own subdirectory of
+    ``root``. A fingerprint may be namespaced as ``<namespace>-<digest>``; the
+    first use of a new fingerprint deletes every other subdirectory of the
+    same namespace, so stale entries are dropped as soon as parameters change
+    while entries of other namespaces (other quality presets) are kept.
+    Subclasses name their entries and call ``_evict`` after each write.
+    """
+
+    description = "store"
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._active_fingerprints: dict[str, str] = {}
+
+    def _dir(self, fingerprint: str) -> Path:
+        namespace = fingerprint_namespace(fingerprint)
+        if self._active_fingerprints.get(namespace) != fingerprint:
+            with self._lock:
+                self.root.mkdir(parents=True, exist_ok=True)
+                for stale in self.root.iterdir():
+                    if (
+                        stale.is_dir()
+                        and stale.name != fingerprint
+                        and fingerprint_namespace(stale.name) == namespace
+                    ):
+                        shutil.rmtree(stale, ignore_errors=True)
+                        logging.info(f"Invalidated {self.description} {stale.name}")
+                self._active_fingerprints[namespace] = fingerprint
+        path = self.root / fingerprint
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _evict(self, pattern: str):
+        """Keep the entries matching ``pattern`` under ``root`` within ``max_bytes``."""
+        with self._lock:
+            evict_lru(self.root.glob(pattern), self.max_bytes)
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._active_fingerprints.clear()
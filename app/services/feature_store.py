@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .disk_cache import FingerprintedStore
+
+FEATURE_STORE_DIR = Path(os.environ.get("FEATURE_STORE_DIR", ".feature_store"))
+FEATURE_STORE_MAX_BYTES = int(
+    os.environ.get("FEATURE_STORE_MAX_BYTES", 2 * 1024 * 1024 * 1024)
+)
+FEATURE_ARRAYS = ("onset_envelope", "beat_frames", "chroma", "bass_chroma")
+META_FILE = "meta.json"
+
+
+class AudioFeatures(NamedTuple):
+    """Everything the decoding stages need from the audio, and nothing they produce.
+
+    ``tuning`` is None when the chroma front end estimated it internally.
+    Arrays read back from the store are read-only memory maps.
+    """
+
+    duration: float
+    tempo: float
+    tuning: Optional[float]
+    onset_envelope: np.ndarray
+    beat_frames: np.ndarray
+    chroma: np.ndarray
+    bass_chroma: np.ndarray
+
+
+class FeatureStore(FingerprintedStore):
+    """On-disk store of intermediate features as ``.npy`` arrays, opened with ``mmap_mode``.
+
+    Each entry is a directory ``<fingerprint>/<audio_hash>`` holding one array
+    per ``FEATURE_ARRAYS`` name and the scalars in ``meta.json``, written to a
+    temporary directory and renamed into place so readers never see a partial
+    entry. Fingerprints are invalidated by namespace as described in
+    ``FingerprintedStore``, and the total size is kept under ``max_bytes`` by
+    evicting least recently used entries. Like the result cache, the store is
+    best effort: failures are logged and the features are extracted again.
+    """
+
+    description = "feature store"
+
+    def __init__(
+        self, root: Path = FEATURE_STORE_DIR, max_bytes: int = FEATURE_STORE_MAX_BYTES
+    ):
+        super().__init__(root, max_bytes)
+
+    def get(self, audio_hash: str, fingerprint: str) -> Optional[AudioFeatures]:
+        try:
+            entry = self._dir(fingerprint) / audio_hash
+        except OSError as e:
+            logging.warning(f"Feature store unavailable: {e}")
+            return None
+        try:
+            with (entry / META_FILE).open("r") as f:
+                meta = json.load(f)
+            arrays = {
+                name: np.load(entry / f"{name}.npy", mmap_mode="r")
+                for name in FEATURE_ARRAYS
+            }
+            os.utime(entry)
+            return AudioFeatures(**meta, **arrays)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError):
+            logging.exception(f"Discarding unreadable feature store entry {entry}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+    def put(self, audio_hash: str, fingerprint: str, features: AudioFeatures):
+        """Store ``features``; best effort, so a failed write is logged and skipped."""
+        tmp_entry = None
+        try:
+            directory = self._dir(fingerprint)
+            entry = directory / audio_hash
+            tmp_entry = directory / f"{audio_hash}.{threading.get_ident()}.tmp"
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            tmp_entry.mkdir()
+            for name in FEATURE_ARRAYS:
+                np.save(tmp_entry / f"{name}.npy", getattr(features, name))
+            meta = {
+                field: getattr(features, field)
+                for field in AudioFeatures._fields
+                if field not in FEATURE_ARRAYS
+            }
+            with (tmp_entry / META_FILE).open("w") as f:
+                json.dump(meta, f, default=float)
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(tmp_entry, entry)
+            except OSError:
+                # Another process stored the same entry first; keep theirs.
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+            self._evict("*/*")
+        except OSError as e:
+            logging.warning(f"Could not store features of {audio_hash}: {e}")
+            if tmp_entry is not None:
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+
+
+feature_store = FeatureStore()
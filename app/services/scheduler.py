@@ -0,0 +1,234 @@
+import asyncio
+import itertools
+import os
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, NamedTuple, Optional
+from .metrics import Sample, metrics
+from .streaming import STREAMING_MIN_DURATION_S
+from .workers import ANALYSIS_WORKERS
+
+MAX_CONCURRENT_ANALYSES = int(
+    os.environ.get("MAX_CONCURRENT_ANALYSES", max(1, ANALYSIS_WORKERS))
+)
+MAX_JOBS_PER_SESSION = int(os.environ.get("MAX_JOBS_PER_SESSION", 2))
+ANALYSIS_MEMORY_BUDGET_BYTES = int(
+    os.environ.get("ANALYSIS_MEMORY_BUDGET_BYTES", 4 * 1024**3)
+)
+MEMORY_BYTES_PER_AUDIO_SECOND = 1.4e6
+INITIAL_SECONDS_PER_AUDIO_SECOND = 0.15
+THROUGHPUT_SMOOTHING = 0.2
+STATUS_REFRESH_S = 2.0
+
+
+class SessionLimitError(Exception):
+    pass
+
+
+class QueueStatus(NamedTuple):
+    position: int
+    eta_s: float
+
+
+def estimate_memory_bytes(duration_s: float) -> int:
+    """Peak analysis memory; streaming caps it beyond the streaming threshold."""
+    return int(
+        min(duration_s, STREAMING_MIN_DURATION_S) * MEMORY_BYTES_PER_AUDIO_SECOND
+    )
+
+
+@dataclass(eq=False)
+class AnalysisTicket:
+    scheduler: "AnalysisScheduler"
+    session_id: str
+    duration_s: float
+    memory_bytes: int
+    seq: int
+    tag: int
+    submitted_at: float = field(default_factory=time.monotonic)
+    admitted: asyncio.Event = field(default_factory=asyncio.Event)
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    started_at: Optional[float] = None
+    released: bool = False
+
+    async def wait(self) -> AsyncIterator[QueueStatus]:
+        """Yield queue status whenever it changes until the job is admitted."""
+        while not (self.admitted.is_set() or self.released):
+            yield self.scheduler.status(self)
+            self.changed.clear()
+            admitted = asyncio.create_task(self.admitted.wait())
+            changed = asyncio.create_task(self.changed.wait())
+            try:
+                await asyncio.wait(
+                    {admitted, changed},
+                    timeout=STATUS_REFRESH_S,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                admitted.cancel()
+                changed.cancel()
+
+    def release(self, cancelled: bool = False):
+        self.scheduler.release(self, cancelled)
+
+
+class AnalysisScheduler:
+    """Server-wide admission control for analysis jobs.
+
+    At most ``max_concurrent`` jobs run at once, and the estimated memory of
+    running jobs stays under ``memory_budget`` (a lone job is always
+    admitted). Queued jobs are ordered by start-time fair queuing: each job is
+    tagged one round after its session's previous job, but never earlier than
+    the round currently being served. Sessions therefore take turns instead
+    of one session's backlog blocking everyone else. Each session may hold at
+    most ``max_per_session`` queued or running jobs.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_ANALYSES,
+        max_per_session: int = MAX_JOBS_PER_SESSION,
+        memory_budget: int = ANALYSIS_MEMORY_BUDGET_BYTES,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_session = max_per_session
+        self.memory_budget = memory_budget
+        self.seconds_per_audio_second = INITIAL_SECONDS_PER_AUDIO_SECOND
+        self._queue: list[AnalysisTicket] = []
+        self._running: list[AnalysisTicket] = []
+        self._seq = itertools.count()
+        self._round = 0
+        self.cancelled_jobs = 0
+        self.cancelled_while_queued = 0
+        self.seconds_saved_estimate = 0.0
+        self.audio_seconds_skipped = 0.0
+        self._last_tag: dict[str, int] = {}
+
+    def submit(self, session_id: str, duration_s: float) -> AnalysisTicket:
+        active = [t for t in self._queue + self._running if t.session_id == session_id]
+        if len(active) >= self.max_per_session:
+            raise SessionLimitError(
+                f"At most {self.max_per_session} analyses per session can be queued."
+            )
+        ticket = AnalysisTicket(
+            scheduler=self,
+            session_id=session_id,
+            duration_s=duration_s,
+            memory_bytes=estimate_memory_bytes(duration_s),
+            seq=next(self._seq),
+            tag=max(self._round, self._last_tag.get(session_id, 0) + 1),
+        )
+        self._last_tag[session_id] = ticket.tag
+        self._queue.append(ticket)
+        self._queue.sort(key=lambda t: (t.tag, t.seq))
+        self._dispatch()
+        return ticket
+
+    def release(self, ticket: AnalysisTicket, cancelled: bool = False):
+        """Free the ticket's slot; cancelled tickets count toward savings stats."""
+        if ticket.released:
+            return
+        ticket.released = True
+        if cancelled:
+            self._record_cancellation(ticket)
+        if ticket in self._running:
+            self._running.remove(ticket)
+            if (
+                not cancelled
+                and ticket.started_at is not None
+                and ticket.duration_s > 0
+            ):
+                observed = (time.monotonic() - ticket.started_at) / ticket.duration_s
+                self.seconds_per_audio_second += THROUGHPUT_SMOOTHING * (
+                    observed - self.seconds_per_audio_second
+                )
+        elif ticket in self._queue:
+            self._queue.remove(ticket)
+        if not any(
+            t.session_id == ticket.session_id for t in self._queue + self._running
+        ):
+            self._last_tag.pop(ticket.session_id, None)
+        self._dispatch()
+
+    def _record_cancellation(self, ticket: AnalysisTicket):
+        self.cancelled_jobs += 1
+        expected = self._expected_s(ticket)
+        if ticket.started_at is None:
+            self.cancelled_while_queued += 1
+            self.seconds_saved_estimate += expected
+            self.audio_seconds_skipped += ticket.duration_s
+            return
+        done = min(1.0, (time.monotonic() - ticket.started_at) / max(expected, 1e-9))
+        self.seconds_saved_estimate += expected * (1 - done)
+        self.audio_seconds_skipped += ticket.duration_s * (1 - done)
+
+    def cancellation_stats(self) -> dict:
+        return {
+            "cancelled_jobs": self.cancelled_jobs,
+            "cancelled_while_queued": self.cancelled_while_queued,
+            "worker_seconds_saved_estimate": self.seconds_saved_estimate,
+            "audio_seconds_skipped_estimate": self.audio_seconds_skipped,
+        }
+
+    def metric_samples(self) -> list[Sample]:
+        """Queue and cancellation state for ``metrics.render``."""
+        return [
+            ("queued_analyses", {}, len(self._queue)),
+            ("running_analyses", {}, len(self._running)),
+            (
+                "cancelled_analyses_total",
+                {"where": "queued"},
+                self.cancelled_while_queued,
+            ),
+            (
+                "cancelled_analyses_total",
+                {"where": "running"},
+                self.cancelled_jobs - self.cancelled_while_queued,
+            ),
+            (
+                "cancelled_worker_seconds_saved_total",
+                {},
+                self.seconds_saved_estimate,
+            ),
+        ]
+
+    def _fits(self, ticket: AnalysisTicket) -> bool:
+        if not self._running:
+            return True
+        if len(self._running) >= self.max_concurrent:
+            return False
+        used = sum(t.memory_bytes for t in self._running)
+        return used + ticket.memory_bytes <= self.memory_budget
+
+    def _dispatch(self):
+        while self._queue and self._fits(self._queue[0]):
+            ticket = self._queue.pop(0)
+            self._round = max(self._round, ticket.tag)
+            ticket.started_at = time.monotonic()
+            metrics.observe(
+                "queue_wait_seconds", ticket.started_at - ticket.submitted_at
+            )
+            self._running.append(ticket)
+            ticket.admitted.set()
+        for ticket in self._queue:
+            ticket.changed.set()
+
+    def _expected_s(self, ticket: AnalysisTicket) -> float:
+        return ticket.duration_s * self.seconds_per_audio_second
+
+    def status(self, ticket: AnalysisTicket) -> QueueStatus:
+        """1-based queue position and a rough ETA until the job starts."""
+        if ticket not in self._queue:
+            return QueueStatus(0, 0.0)
+        position = self._queue.index(ticket)
+        now = time.monotonic()
+        remaining = sum(
+            max(0.0, self._expected_s(t) - (now - t.started_at)) for t in self._running
+        )
+        ahead = sum(self._expected_s(t) for t in self._queue[:position])
+        eta = (remaining + ahead) / max(1, self.max_concurrent)
+        return QueueStatus(position + 1, eta)
+
+
+analysis_scheduler = AnalysisScheduler()
+metrics.register_collector(analysis_scheduler.metric_samples)
@@ -0,0 +1,227 @@
+import librosa
+import numpy as np
+import soundfile as sf
+import soxr
+from pathlib import Path
+from typing import Iterator, Optional
+from . import chord_recognition
+from .cancellation import CancelToken, check_cancelled
+from .feature_store import AudioFeatures
+from .presets import AnalysisPreset
+
+STREAMING_MIN_DURATION_S = 15 * 60
+STREAM_BLOCK_SECONDS = 30
+STREAM_CONTEXT_FRAMES = 128
+TUNING_ESTIMATE_SECONDS = 60
+ONSET_N_FFT = 2048
+ONSET_TOP_DB = 80.0
+TEMPOGRAM_AC_SIZE_S = 8.0
+TEMPOGRAM_CHUNK_FRAMES = 4096
+
+
+def probe_duration(file_path: Path) -> float:
+    """Duration in seconds from the container header, without decoding."""
+    return sf.info(str(file_path)).duration
+
+
+def iter_resampled_blocks(
+    file_path: Path, sr: int, block_seconds: float = STREAM_BLOCK_SECONDS
+) -> Iterator[np.ndarray]:
+    """Yield mono float32 blocks of ``file_path`` resampled to ``sr``.
+
+    Resampling runs through a single ``soxr.ResampleStream`` so block
+    boundaries introduce no discontinuities.
+    """
+    info = sf.info(str(file_path))
+    resampler = soxr.ResampleStream(info.samplerate, sr, 1, dtype="float32")
+    for block in sf.blocks(
+        str(file_path),
+        blocksize=int(block_seconds * info.samplerate),
+        dtype="float32",
+        always_2d=True,
+    ):
+        out = resampler.resample_chunk(block.mean(axis=1))
+        if len(out):
+            yield out
+    tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+    if len(tail):
+        yield tail
+
+
+class StreamingFeatureExtractor:
+    """Computes chroma, bass chroma and the onset envelope frame by frame from audio blocks.
+
+    Each segment handed to librosa carries ``context_frames`` of audio on both
+    sides, and only the interior frames are kept, so frames match a whole-file
+    computation up to edge effects far smaller than the context. Peak memory
+    is a few blocks of audio plus 25 float32 values per output frame. The
+    onset envelope may use a finer hop, ``onset_hop_length``, that divides
+    ``hop_length``.
+    """
+
+    def __init__(
+        self,
+        sr: int,
+        hop_length: int = chord_recognition.HOP_LENGTH,
+        onset_hop_length: Optional[int] = None,
+        chroma_method: str = "cqt",
+        block_seconds: float = STREAM_BLOCK_SECONDS,
+        context_frames: int = STREAM_CONTEXT_FRAMES,
+    ):
+        self.sr = sr
+        self.hop_length = hop_length
+        self.onset_hop_length = onset_hop_length or hop_length
+        if hop_length % self.onset_hop_length:
+            raise ValueError("hop_length must be a multiple of onset_hop_length")
+        self._onset_ratio = hop_length // self.onset_hop_length
+        self.chroma_method = chroma_method
+        self.block_frames = int(block_seconds * sr / hop_length)
+        self.context = context_frames
+        self.tuning: Optional[float] = None
+        self.n_samples = 0
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0
+        self._next_frame = 0
+        self._prev_mel_db: Optional[np.ndarray] = None
+        self._db_max = -np.inf
+        self._chroma: list[np.ndarray] = []
+        self._bass_chroma: list[np.ndarray] = []
+        self._onset_diff: list[np.ndarray] = []
+
+    def push(self, block: np.ndarray):
+        self._buffer = np.concatenate((self._buffer, block))
+        self.n_samples += len(block)
+        if self.tuning is None:
+            if self.n_samples < TUNING_ESTIMATE_SECONDS * self.sr:
+                return
+            self._estimate_tuning()
+        available = self.n_samples // self.hop_length - self.context
+        while available - self._next_frame >= self.block_frames:
+            self._emit(self._next_frame + self.block_frames)
+
+    def finish(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Flush remaining frames; returns ``(chroma, bass_chroma, onset_envelope)``."""
+        if self.tuning is None:
+            self._estimate_tuning()
+        n_frames = 1 + self.n_samples // self.hop_length
+        if self._next_frame < n_frames:
+            self._emit(n_frames, last=True)
+        chroma = np.concatenate(self._chroma, axis=1)
+        bass_chroma = np.concatenate(self._bass_chroma, axis=1)
+        onset_diff = np.concatenate(self._onset_diff)[1:]
+        pad_width = 1 + ONSET_N_FFT // (2 * self.onset_hop_length)
+        n_onset_frames = 1 + self.n_samples // self.onset_hop_length
+        onset_envelope = np.concatenate((np.zeros(pad_width), onset_diff))[
+            :n_onset_frames
+        ]
+        return (chroma, bass_chroma, onset_envelope)
+
+    def _estimate_tuning(self):
+        self.tuning = (
+            chord_recognition.estimate_tuning(self._buffer, self.sr, self.chroma_method)
+            if len(self._buffer)
+            else 0.0
+        )
+
+    def _emit(self, end_frame: int, last: bool = False):
+        hop = self.hop_length
+        first = self._next_frame
+        seg_start_frame = max(0, first - self.context - 1)
+        seg_start = seg_start_frame * hop
+        seg_end = self.n_samples if last else (end_frame + self.context) * hop
+        segment = self._buffer[
+            seg_start - self._buffer_start : seg_end - self._buffer_start
+        ]
+        offset = first - seg_start_frame
+        count = end_frame - first
+
+        chroma, bass_chroma = chord_recognition.chroma_features(
+            segment, self.sr, hop, self.tuning, self.chroma_method
+        )
+        self._chroma.append(chroma[:, offset : offset + count].astype(np.float32))
+        self._bass_chroma.append(
+            bass_chroma[:, offset : offset + count].astype(np.float32)
+        )
+
+        mel = librosa.feature.melspectrogram(
+            y=segment, sr=self.sr, n_fft=ONSET_N_FFT, hop_length=self.onset_hop_length
+        )
+        ratio = self._onset_ratio
+        mel = (
+            mel[:, offset * ratio :]
+            if last
+            else mel[:, offset * ratio : (offset + count) * ratio]
+        )
+        mel_db = librosa.power_to_db(mel, top_db=None)
+        self._db_max = max(self._db_max, float(mel_db.max(initial=-np.inf)))
+        mel_db = np.maximum(mel_db, self._db_max - ONSET_TOP_DB)
+        previous = mel_db[:, :1] if self._prev_mel_db is None else self._prev_mel_db
+        diff = np.diff(np.concatenate((previous, mel_db), axis=1), axis=1)
+        self._onset_diff.append(np.median(np.maximum(0.0, diff), axis=0))
+        self._prev_mel_db = mel_db[:, -1:]
+
+        self._next_frame = end_frame
+        keep_from = max(0, (end_frame - self.context - 1) * hop)
+        self._buffer = self._buffer[keep_from - self._buffer_start :]
+        self._buffer_start = keep_from
+
+
+def chunked_tempo(onset_envelope: np.ndarray, sr: int, hop_length: int) -> float:
+    """Global tempo from a mean tempogram accumulated in fixed-size chunks.
+
+    Matches ``librosa.feature.tempo`` without materializing the full
+    (win_length, n_frames) tempogram.
+    """
+    win_length = librosa.time_to_frames(
+        TEMPOGRAM_AC_SIZE_S, sr=sr, hop_length=hop_length
+    ).item()
+    n_frames = len(onset_envelope)
+    total = np.zeros(win_length)
+    for start in range(0, n_frames, TEMPOGRAM_CHUNK_FRAMES):
+        end = min(start + TEMPOGRAM_CHUNK_FRAMES, n_frames)
+        lo, hi = (max(0, start - win_length), min(n_frames, end + win_length))
+        tg = librosa.feature.tempogram(
+            onset_envelope=onset_envelope[lo:hi],
+            sr=sr,
+            hop_length=hop_length,
+            win_length=win_length,
+        )
+        total += tg[:, start - lo : end - lo].sum(axis=1)
+    tempo = librosa.feature.tempo(
+        sr=sr, hop_length=hop_length, tg=(total / max(n_frames, 1))[:, None]
+    )
+    return float(tempo[0])
+
+
+def extract_streaming_features(
+    file_path: Path,
+    preset: AnalysisPreset,
+    cancel_token: Optional[CancelToken] = None,
+) -> AudioFeatures:
+    """Blocking feature extraction from ``file_path`` with memory bounded by the block size.
+
+    ``cancel_token`` is checked after every block and between stages.
+    """
+    sr = preset.sample_rate
+    extractor = StreamingFeatureExtractor(
+        sr, preset.hop_length, preset.beat_hop_length, preset.chroma
+    )
+    for block in iter_resampled_blocks(file_path, sr):
+        check_cancelled(cancel_token)
+        extractor.push(block)
+    chroma, bass_chroma, onset_envelope = extractor.finish()
+    check_cancelled(cancel_token)
+    onset_hop = extractor.onset_hop_length
+    tempo = chunked_tempo(onset_envelope, sr, onset_hop)
+    _, beat_frames = librosa.beat.beat_track(
+        onset_envelope=onset_envelope, sr=sr, hop_length=onset_hop, bpm=tempo
+    )
+    return AudioFeatures(
+        duration=extractor.n_samples / sr,
+        tempo=tempo,
+        tuning=extractor.tuning,
+        onset_envelope=onset_envelope.astype(np.float32),
+        beat_frames=beat_frames,
+        chroma=chroma,
+        bass_chroma=bass_chroma,
+    )
@@ -0,0 +1,146 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import soundfile as sf
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadRejected(Exception):
+    pass
+
+
+class AudioInfo(NamedTuple):
+    duration: float
+    sample_rate: int
+    channels: int
+
+
+def probe_audio(file_path: Path) -> Optional[AudioInfo]:
+    """Duration, sample rate and channel count read from the header only.
+
+    Returns None when libsndfile cannot parse the container; the decoded
+    duration from the waveform build fills in later.
+    """
+    try:
+        info = sf.info(str(file_path))
+    except RuntimeError:
+        return None
+    return AudioInfo(info.duration, info.samplerate, info.channels)
+
+
+# Bitrates in kbit/s by bitrate index, keyed by (MPEG-1, layer); index 0 is
+# free format and 15 is invalid.
+MPEG_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by sample-rate index, keyed by the header's version bits
+# (0: MPEG-2.5, 2: MPEG-2, 3: MPEG-1; 1 is reserved).
+MPEG_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000),
+}
+
+
+def _mpeg_frame_length(head: bytes, offset: int = 0) -> Optional[int]:
+    """Length of the MPEG audio frame whose header starts at ``offset``.
+
+    Returns None unless the four bytes there are a valid frame header: frame
+    sync, a known version, a layer other than the reserved ``00`` (which AAC
+    ADTS streams use), a bitrate index other than ``1111`` and a sample-rate
+    index other than ``11``. Free-format frames have no fixed length and
+    return 0.
+    """
+    if len(head) < offset + 4 or head[offset] != 0xFF or head[offset + 1] < 0xE0:
+        return None
+    version = (head[offset + 1] >> 3) & 0b11
+    layer = 4 - ((head[offset + 1] >> 1) & 0b11)
+    bitrate_index = head[offset + 2] >> 4
+    rate_index = (head[offset + 2] >> 2) & 0b11
+    if version == 1 or layer == 4 or bitrate_index == 0b1111 or rate_index == 0b11:
+        return None
+    mpeg1 = version == 3
+    bitrate = MPEG_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = MPEG_SAMPLE_RATES[version][rate_index]
+    padding = (head[offset + 2] >> 1) & 1
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4
+    samples_per_byte = 72 if layer == 3 and not mpeg1 else 144
+    return samples_per_byte * bitrate // sample_rate + padding
+
+
+def _is_mpeg_audio(head: bytes) -> bool:
+    """Whether ``head`` starts with an MPEG audio frame followed by another.
+
+    The second header confirms the first, which a stray ``FF Ex`` byte pair
+    (UTF-16 text, say) rarely survives. A free-format first frame is
+    confirmed by the next header with the same version, layer and rate.
+    """
+    length = _mpeg_frame_length(head)
+    if length is None:
+        return False
+    if length == 0:
+        offset = head.find(head[:2], 4)
+        while offset != -1:
+            if _mpeg_frame_length(head, offset) is not None:
+                return (head[offset + 2] ^ head[2]) & 0b1100 == 0
+            offset = head.find(head[:2], offset + 1)
+        return False
+    if len(head) < length + 4:
+        # The file ends within its first frame or right after it.
+        return len(head) == length
+    return _mpeg_frame_length(head, length) is not None
+
+
+def sniff_audio_format(head: bytes) -> Optional[str]:
+    """Container format from a file's leading bytes, or None if unrecognized."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:3] == b"ID3" or _is_mpeg_audio(head):
+        return "mp3"
+    return None
+
+
+async def save_upload(upload, dest: Path, max_bytes: int) -> str:
+    """Stream ``upload`` to ``dest`` in fixed-size chunks; returns its SHA-256.
+
+    The container is sniffed from the first chunk and the size limit is
+    enforced while copying, so bad files are rejected with
+    ``UploadRejected`` before they are fully read. Nothing is left at
+    ``dest`` unless the whole upload succeeds.
+    """
+    digest = hashlib.sha256()
+    tmp_path = dest.with_name(f"{dest.name}.part")
+    written = 0
+    try:
+        with tmp_path.open("wb") as f:
+            while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                if written == 0 and sniff_audio_format(chunk) is None:
+                    raise UploadRejected(
+                        "File is not a supported audio format (MP3, WAV, FLAC, OGG)."
+                    )
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadRejected(
+                        f"File is too large. Maximum size is {max_bytes // (1024 * 1024)}MB."
+                    )
+                digest.update(chunk)
+                f.write(chunk)
+        if written == 0:
+            raise UploadRejected("Uploaded file is empty.")
+        os.replace(tmp_path, dest)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return digest.hexdigest()
@@ -0,0 +1,166 @@
+import numpy as np
+from pathlib import Path
+from typing import Iterable, NamedTuple
+from .audio_cache import ANALYSIS_SR, load_audio
+
+# The finest level gives PEAK_MIN_BUCKETS_PER_SCREEN buckets per screen at
+# the timeline's 10x maximum zoom; a finer one could never be read.
+PEAK_LEVELS = (2000, 8000, 32000)
+PEAK_SCALE = 127
+PEAK_WINDOW_MARGIN = 0.5
+PEAK_MIN_BUCKETS_PER_SCREEN = 1000
+
+
+class PeakWindow(NamedTuple):
+    """Waveform outline of ``buckets`` peaks covering ``start``..``end`` of the file.
+
+    ``path`` is SVG path data in a ``buckets - 1`` by ``2 * PEAK_SCALE``
+    coordinate space.
+    """
+
+    path: str
+    buckets: int
+    start: float
+    end: float
+
+
+def peaks_path(file_path: Path) -> Path:
+    return file_path.with_name(f"{file_path.name}.peaks.npy")
+
+
+def _finest_peaks(
+    blocks: Iterable[np.ndarray], total: int
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """Running min/max of consecutive sample ``blocks`` over the finest level.
+
+    Bucket ``b`` of a stream of ``total`` samples starts at sample
+    ``b * total // finest``; samples past ``total`` extend the last bucket and
+    buckets no sample reached are left at +/-inf. Returns the mins, the maxs
+    and the number of samples seen.
+    """
+    finest = PEAK_LEVELS[-1]
+    mins = np.full(finest, np.inf, dtype=np.float32)
+    maxs = np.full(finest, -np.inf, dtype=np.float32)
+    position = 0
+    for block in blocks:
+        # The bucket holding sample i is the last one starting at or before it.
+        first = min(((position + 1) * finest - 1) // total, finest - 1)
+        last = min(((position + len(block)) * finest - 1) // total, finest - 1)
+        buckets = np.arange(first, last + 1)
+        starts = np.maximum(buckets * total // finest - position, 0)
+        mins[buckets] = np.minimum(mins[buckets], np.minimum.reduceat(block, starts))
+        maxs[buckets] = np.maximum(maxs[buckets], np.maximum.reduceat(block, starts))
+        position += len(block)
+    return (mins, maxs, position)
+
+
+def _quantize_pyramid(mins: np.ndarray, maxs: np.ndarray) -> np.ndarray:
+    reached = np.isfinite(mins)
+    mins, maxs = (np.where(reached, mins, 0.0), np.where(reached, maxs, 0.0))
+    peak = max(float(np.max(np.abs(mins))), float(np.max(maxs)))
+    scale = PEAK_SCALE / max(peak, 1e-9)
+    finest = PEAK_LEVELS[-1]
+    parts = []
+    for level in PEAK_LEVELS:
+        factor = finest // level
+        parts.append(mins.reshape(level, factor).min(axis=1))
+        parts.append(maxs.reshape(level, factor).max(axis=1))
+    return np.round(np.concatenate(parts) * scale).astype(np.int8)
+
+
+def build_peak_pyramid(y: np.ndarray) -> np.ndarray:
+    """Min/max peaks of ``y`` at every level of ``PEAK_LEVELS``, quantized to int8.
+
+    Returns one flat array holding, for each level in order, ``level`` mins
+    followed by ``level`` maxs. The finest level is reduced from the samples
+    in one pass; coarser levels are reduced from the finest.
+    """
+    if len(y) == 0:
+        return np.zeros(2 * sum(PEAK_LEVELS), dtype=np.int8)
+    mins, maxs, _ = _finest_peaks([y], len(y))
+    return _quantize_pyramid(mins, maxs)
+
+
+def _level_slice(level_index: int) -> tuple[int, int]:
+    offset = 2 * sum(PEAK_LEVELS[:level_index])
+    return (offset, PEAK_LEVELS[level_index])
+
+
+def generate_waveform(file_path: Path) -> float:
+    """Write the peak pyramid next to ``file_path`` and return the duration.
+
+    Files longer than ``STREAMING_MIN_DURATION_S`` are decoded block by block
+    and reduced as they arrive, so the build holds one block of samples
+    rather than the whole file. Shorter ones go through ``load_audio``, whose
+    buffer the analysis then reuses.
+    """
+    from .streaming import (
+        STREAMING_MIN_DURATION_S,
+        iter_resampled_blocks,
+        probe_duration,
+    )
+
+    try:
+        duration = probe_duration(file_path)
+    except Exception:
+        duration = 0.0
+    if duration > STREAMING_MIN_DURATION_S:
+        mins, maxs, samples = _finest_peaks(
+            iter_resampled_blocks(file_path, ANALYSIS_SR),
+            round(duration * ANALYSIS_SR),
+        )
+        pyramid, duration = (_quantize_pyramid(mins, maxs), samples / ANALYSIS_SR)
+    else:
+        y, sr = load_audio(file_path)
+        pyramid, duration = (build_peak_pyramid(y), len(y) / sr)
+    tmp_path = peaks_path(file_path).with_suffix(".tmp.npy")
+    np.save(tmp_path, pyramid)
+    tmp_path.replace(peaks_path(file_path))
+    return duration
+
+
+def peak_outline_path(mins: np.ndarray, maxs: np.ndarray) -> str:
+    """A single closed SVG path tracing the max peaks forward and the mins back.
+
+    Coordinates are integer bucket indices and quantized levels, written as
+    relative line-tos, which keeps the string smaller than the peak values
+    themselves.
+    """
+    if len(maxs) == 0:
+        return ""
+    if len(maxs) == 1:
+        mins, maxs = (np.repeat(mins, 2), np.repeat(maxs, 2))
+    top = PEAK_SCALE - maxs.astype(np.int16)
+    bottom = PEAK_SCALE - mins.astype(np.int16)
+    forward = " ".join(f"1 {d}" for d in np.diff(top)).replace(" -", "-")
+    backward = " ".join(f"-1 {d}" for d in np.diff(bottom[::-1])).replace(" -", "-")
+    return f"M0 {top[0]}l{forward}V{bottom[-1]}l{backward}Z"
+
+
+def read_peak_window(file_path: Path, zoom: float, view_start: float) -> PeakWindow:
+    """Peaks for the visible part of the timeline at ``zoom``.
+
+    Picks the coarsest level that still gives ``PEAK_MIN_BUCKETS_PER_SCREEN``
+    buckets per screen width, and returns the visible span starting at fraction
+    ``view_start`` of the file plus ``PEAK_WINDOW_MARGIN`` screens on each side.
+    """
+    zoom = max(zoom, 1.0)
+    level_index = next(
+        (
+            i
+            for i, level in enumerate(PEAK_LEVELS)
+            if level >= PEAK_MIN_BUCKETS_PER_SCREEN * zoom
+        ),
+        len(PEAK_LEVELS) - 1,
+    )
+    offset, size = _level_slice(level_index)
+    visible = 1.0 / zoom
+    start = max(0.0, view_start - PEAK_WINDOW_MARGIN * visible)
+    end = min(1.0, view_start + (1 + PEAK_WINDOW_MARGIN) * visible)
+    lo, hi = (int(start * size), min(size, int(np.ceil(end * size))))
+    pyramid = np.load(peaks_path(file_path), mmap_mode="r")
+    path = peak_outline_path(
+        pyramid[offset + lo : offset + hi],
+        pyramid[offset + size + lo : offset + size + hi],
+    )
+    return PeakWindow(path, hi - lo, lo / size, hi / size)
@@ -0,0 +1,230 @@
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+from .cancellation import AnalysisCancelled, CancelToken
+
+ANALYSIS_WORKERS = int(
+    os.environ.get("ANALYSIS_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+)
+PROGRESS_POLL_S = 0.25
+AFFINITY_MAX_ENTRIES = 4096
+
+
+def _init_worker():
+    """Import the DSP stack and JIT-compile librosa's numba kernels once per worker.
+
+    The web process does not preload them; it imports the DSP modules
+    lazily, and only if analysis runs in-process (``ANALYSIS_WORKERS=0``).
+    """
+    import librosa
+    import numpy as np
+
+    from . import analysis, chord_recognition
+
+    y = np.random.default_rng(0).normal(0, 0.1, 22050 * 4).astype(np.float32)
+    librosa.beat.beat_track(y=y, sr=22050)
+    chord_recognition.chroma_features(y, 22050)
+    fingerprint = analysis.analysis_fingerprint()
+    logging.info(f"Analysis worker {os.getpid()} ready (model {fingerprint})")
+
+
+def analysis_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """A spawn-based process pool whose workers are warmed up by ``_init_worker``."""
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _drain_into_queue(fn: Callable, args: tuple, progress) -> None:
+    """Run generator function ``fn`` in the worker, forwarding each item."""
+    try:
+        for item in fn(*args):
+            progress.put(item)
+    finally:
+        progress.put(None)
+
+
+class AnalysisEngine:
+    """Fixed set of single-process analysis workers with per-file affinity.
+
+    Each worker is its own one-process pool so jobs for the same file go to
+    the same process and hit its decoded-audio cache. New files go to the
+    least busy worker. With ``max_workers=0`` jobs run on a thread pool in
+    this process instead, which is useful for development.
+    """
+
+    def __init__(self, max_workers: int = ANALYSIS_WORKERS):
+        self.max_workers = max_workers
+        self._executors: list[Executor] = []
+        self._pending: list[int] = []
+        self._affinity: dict[str, int] = {}
+        self._manager = None
+        self._lock = threading.Lock()
+        self._in_flight: dict[CancelToken, asyncio.Future] = {}
+
+    def _new_executor(self) -> Executor:
+        return analysis_process_pool(1)
+
+    def start(self):
+        with self._lock:
+            if self._executors:
+                return
+            if self.max_workers <= 0:
+                self._executors = [ThreadPoolExecutor(thread_name_prefix="analysis")]
+                self._pending = [0]
+                return
+            self._executors = [self._new_executor() for _ in range(self.max_workers)]
+            self._pending = [0] * self.max_workers
+            self._manager = multiprocessing.get_context("spawn").Manager()
+        for executor in self._executors:
+            executor.submit(_ping)
+        logging.info(f"Started {self.max_workers} analysis workers")
+
+    def shutdown(self):
+        with self._lock:
+            for executor in self._executors:
+                executor.shutdown(wait=False, cancel_futures=True)
+            if self._manager is not None:
+                self._manager.shutdown()
+            self._executors, self._pending, self._manager = ([], [], None)
+            self._affinity.clear()
+
+    def _pick_worker(self, affinity_key: str) -> int:
+        with self._lock:
+            index = self._affinity.get(affinity_key)
+            if index is None:
+                index = min(range(len(self._pending)), key=self._pending.__getitem__)
+                self._affinity[affinity_key] = index
+                if len(self._affinity) > AFFINITY_MAX_ENTRIES:
+                    self._affinity.pop(next(iter(self._affinity)))
+            self._pending[index] += 1
+            return index
+
+    def _release_worker(self, index: int, error: Optional[BaseException]):
+        with self._lock:
+            if index >= len(self._pending):
+                return
+            self._pending[index] -= 1
+            if isinstance(error, BrokenProcessPool):
+                logging.error(f"Analysis worker {index} died; restarting it")
+                self._executors[index] = self._new_executor()
+
+    def _release_worker_when_done(self, index: int, future: asyncio.Future):
+        self._release_worker(index, None if future.cancelled() else future.exception())
+
+    def still_running(self, cancel_token: CancelToken) -> Optional[asyncio.Future]:
+        """The worker future of the job streamed with ``cancel_token``, until it is done.
+
+        A cancelled stream stops before its worker does; this is how callers
+        holding resources for the job learn when the worker is really free.
+        """
+        future = self._in_flight.get(cancel_token)
+        return None if future is None or future.done() else future
+
+    def new_cancel_token(self) -> CancelToken:
+        """A token whose flag is visible inside the worker processes."""
+        self.start()
+        return CancelToken(None if self._manager is None else self._manager.Event())
+
+    def release(self, affinity_key: Path, cleanup: Callable, *args):
+        """Drop ``affinity_key`` and run ``cleanup(*args)`` on its worker, if any."""
+        with self._lock:
+            index = self._affinity.pop(str(affinity_key), None)
+            if index is None or index >= len(self._executors):
+                return
+            self._executors[index].submit(cleanup, *args)
+
+    async def run(self, affinity_key: Path, fn: Callable, *args):
+        """Run ``fn(*args)`` on the worker assigned to ``affinity_key``."""
+        self.start()
+        index = self._pick_worker(str(affinity_key))
+        error = None
+        try:
+            return await asyncio.wrap_future(self._executors[index].submit(fn, *args))
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release_worker(index, error)
+
+    async def stream(
+        self,
+        affinity_key: Path,
+        fn: Callable,
+        *args,
+        cancel_token: Optional[CancelToken] = None,
+    ) -> AsyncIterator:
+        """Run generator function ``fn(*args)`` in a worker, yielding its items.
+
+        When ``cancel_token`` is set the stream stops at the next poll without
+        waiting for the worker, which stops at its own next checkpoint. The
+        worker counts as busy until then; see ``still_running``.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        index = self._pick_worker(str(affinity_key))
+        progress = queue.Queue() if self._manager is None else self._manager.Queue()
+        future = None
+        error = None
+        try:
+            future = asyncio.wrap_future(
+                self._executors[index].submit(_drain_into_queue, fn, args, progress)
+            )
+            if cancel_token is not None:
+                self._in_flight[cancel_token] = future
+                future.add_done_callback(
+                    lambda _: self._in_flight.pop(cancel_token, None)
+                )
+            while True:
+                try:
+                    item = await loop.run_in_executor(
+                        None, partial(progress.get, timeout=PROGRESS_POLL_S)
+                    )
+                except queue.Empty:
+                    if future.done():
+                        break
+                    if cancel_token is not None and cancel_token.cancelled:
+                        raise AnalysisCancelled("Analysis was cancelled.")
+                    continue
+                if item is None:
+                    break
+                yield item
+            await future
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if future is None:
+                self._release_worker(index, error)
+            else:
+                # A stream that stopped early leaves its worker busy until the
+                # next checkpoint, so the worker is only released once done.
+                future.add_done_callback(partial(self._release_worker_when_done, index))
+
+
+analysis_engine = AnalysisEngine()
+
+
+@contextlib.asynccontextmanager
+async def analysis_engine_lifespan():
+    """Start the worker pool with the server and stop it on shutdown."""
+    await asyncio.get_running_loop().run_in_executor(None, analysis_engine.start)
+    try:
+        yield
+    finally:
+        analysis_engine.shutdown()
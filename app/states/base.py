@@ -3,11 +3,19 @@ from typing import TypedDict, Optional
 import datetime
 import logging
 import random
-from pathlib import Path
 import json
 import os
-import librosa
-import numpy as np
+import uuid
+from app.services.cancellation import (
+    AnalysisCancelled,
+    cancel_job,
+    register_job,
+    unregister_job,
+)
+from app.services.metrics import metrics
+from app.services.presets import QUALITY_PRESETS
+from app.services.project_store import project_store
+from app.services.workers import analysis_engine
 
 MAX_FILE_SIZE_MB = 100
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
@@ -18,7 +26,13 @@ SUPPORTED_MIME_TYPES = {
     "audio/flac": [".flac"],
     "audio/ogg": [".ogg"],
 }
-WAVEFORM_SAMPLES = 2000
+PLAYHEAD_SYNC_INTERVAL_MS = int(os.environ.get("PLAYHEAD_SYNC_INTERVAL_MS", 2000))
+ANALYSIS_STAGE_MESSAGES = {
+    "start": "Loading audio...",
+    "duration": "Detecting beats & tempo...",
+    "beats": "Detecting key...",
+    "key": "Recognizing chords...",
+}
 
 
 class ChordSegment(TypedDict):
@@ -32,42 +46,91 @@ class ChordSegment(TypedDict):
     notes: list[int]
 
 
+class KeySegment(TypedDict):
+    start_time: float
+    end_time: float
+    key: str
+
+
+class ChordEdit(TypedDict):
+    start_time: float
+    end_time: float
+    chord: str
+
+
+class ProjectSummary(TypedDict):
+    id: int
+    name: str
+    created_at: str
+
+
 class Project(TypedDict):
     id: int
     name: str
     created_at: str
     audio_file_name: Optional[str]
-    waveform_data: list[float]
+    audio_hash: Optional[str]
     duration: float
+    sample_rate: Optional[int]
+    channels: Optional[int]
     tempo: float
-    beats: list[float]
     key: Optional[str]
-    chords: list[ChordSegment]
+    key_timeline: list[KeySegment]
+    beats_asset: Optional[str]
+    beat_count: int
+    chords_asset: Optional[str]
+    chord_count: int
+    quality: str
+    analyzed_quality: Optional[str]
+    chord_edits: list[ChordEdit]
 
 
 class State(rx.State):
-    projects: list[Project] = []
+    library_id: str = rx.LocalStorage("", name="chord_analyzer_library")
+    projects: list[ProjectSummary] = []
     active_project_id: Optional[int] = None
+    active_project: Optional[Project] = None
     new_project_name: str = ""
     is_uploading: bool = False
     is_playing: bool = False
     current_time: float = 0.0
     is_analyzing: bool = False
+    analysis_stage: str = ""
+    queue_position: int = 0
+    analysis_job_id: str = ""
+    analyzing_project_id: Optional[int] = None
     timeline_zoom: float = 1.0
+    timeline_scroll: float = 0.0
+    waveform_path: str = ""
+    waveform_view_box: str = "0 0 1 1"
+    waveform_view_start: float = 0.0
+    waveform_view_end: float = 1.0
+    visible_beats: list[float] = []
+    visible_chords: list[ChordSegment] = []
+    selected_chord: Optional[ChordSegment] = None
+    chord_edit_text: str = ""
+    is_editing_chords: bool = False
     main_audio_volume: float = 0.8
     chord_track_enabled: bool = True
     chord_track_volume: float = 0.5
     upload_progress: int = 0
+    waveform_building: bool = False
     upload_message: str = ""
 
     @rx.var
-    def active_project(self) -> Optional[Project]:
-        if self.active_project_id is None:
-            return None
-        for p in self.projects:
-            if p["id"] == self.active_project_id:
-                return p
-        return None
+    def chord_boundaries(self) -> str:
+        """Visible chord start times, for the client playhead's sync points."""
+        return json.dumps([chord["start_time"] for chord in self.visible_chords])
+
+    @rx.var
+    def key_changes(self) -> str:
+        """Modulations after the opening key, e.g. ``G Major @ 1:10``."""
+        if not self.active_project or len(self.active_project["key_timeline"]) < 2:
+            return ""
+        return " → ".join(
+            f"{segment['key']} @ {int(segment['start_time']) // 60}:{int(segment['start_time']) % 60:02d}"
+            for segment in self.active_project["key_timeline"][1:]
+        )
 
     @rx.var
     def has_active_project_audio(self) -> bool:
@@ -78,17 +141,21 @@ class State(rx.State):
 
     @rx.var
     def analysis_complete(self) -> bool:
-        return self.active_project is not None and bool(self.active_project["beats"])
+        return self.active_project is not None and self.active_project["beat_count"] > 0
 
     @rx.var
     def chords_detected(self) -> bool:
-        return self.active_project is not None and bool(self.active_project["chords"])
+        return (
+            self.active_project is not None and self.active_project["chord_count"] > 0
+        )
 
     @rx.event
     def load_initial_data(self):
-        """Called on mount to load initial data."""
-        if not self.projects:
-            self.projects = []
+        """Called on mount to load this browser's project list."""
+        if not self.library_id:
+            self.library_id = uuid.uuid4().hex
+        self.projects = project_store.list_summaries(self.library_id)
+        self._load_active_project(self.active_project_id)
 
     @rx.event
     def set_new_project_name(self, name: str):
@@ -98,54 +165,82 @@ class State(rx.State):
     def create_project(self):
         if not self.new_project_name.strip():
             return rx.toast.error("Project name cannot be empty.", duration=3000)
-        new_id = len(self.projects) + 1 if self.projects else 1
-        new_project: Project = {
-            "id": new_id,
-            "name": self.new_project_name,
-            "created_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "audio_file_name": None,
-            "waveform_data": [],
-            "duration": 0.0,
-            "tempo": 0.0,
-            "beats": [],
-            "key": None,
-            "chords": [],
-        }
-        self.projects.append(new_project)
+        new_project = project_store.create(self.library_id, self.new_project_name)
+        self.projects.append(
+            {
+                "id": new_project["id"],
+                "name": new_project["name"],
+                "created_at": new_project["created_at"],
+            }
+        )
         self.new_project_name = ""
-        self.active_project_id = new_id
+        self._load_active_project(new_project["id"])
         return rx.toast.success(
             f"Project '{new_project['name']}' created!", duration=3000
         )
 
     @rx.event
     def set_active_project(self, project_id: int):
-        self.stop_playback()
-        self.active_project_id = project_id
+        if project_id != self.analyzing_project_id:
+            self._cancel_analysis()
+        events = [self.stop_playback()]
+        self._load_active_project(project_id)
         if self.active_project and self.active_project["audio_file_name"]:
             audio_file = self.active_project["audio_file_name"]
-            return rx.call_script(f"loadAudio(rx.get_upload_url('{audio_file}'))")
+            events.append(
+                rx.call_script(f"loadAudio(rx.get_upload_url('{audio_file}'))")
+            )
+        return events
 
     @rx.event
     def delete_project(self, project_id: int):
-        project_to_delete = next(
-            (p for p in self.projects if p["id"] == project_id), None
-        )
+        if project_id == self.analyzing_project_id:
+            self._cancel_analysis()
+        project_to_delete = project_store.delete(self.library_id, project_id)
         if project_to_delete and project_to_delete["audio_file_name"]:
             self._cleanup_audio_file(project_to_delete["audio_file_name"])
         self.projects = [p for p in self.projects if p["id"] != project_id]
         if self.active_project_id == project_id:
-            self.active_project_id = self.projects[0]["id"] if self.projects else None
-            if self.active_project_id:
-                return State.set_active_project(self.active_project_id)
+            self._load_active_project(None)
+            if self.projects:
+                return State.set_active_project(self.projects[0]["id"])
         return rx.toast.info("Project deleted.", duration=3000)
 
+    def _load_active_project(self, project_id: Optional[int]):
+        """Fetch the selected project's row and the timeline data it needs."""
+        self.active_project = (
+            project_store.get(self.library_id, project_id)
+            if project_id is not None
+            else None
+        )
+        self.active_project_id = (
+            self.active_project["id"] if self.active_project else None
+        )
+        self.timeline_scroll = 0.0
+        self.selected_chord = None
+        self._refresh_timeline_view()
+
+    def _update_project(self, project_id: int, fields: dict):
+        """Persist ``fields`` and mirror them into the active project."""
+        project_store.update(self.library_id, project_id, fields)
+        if self.active_project and self.active_project["id"] == project_id:
+            self.active_project = {**self.active_project, **fields}
+
+    def _cancel_analysis(self):
+        """Cooperatively stop this session's running analysis, if any."""
+        cancel_job(self.analysis_job_id)
+
     def _cleanup_audio_file(self, filename: Optional[str]):
+        from app.services.audio_cache import evict_audio
+        from app.services.waveform import peaks_path
+
         if not filename:
             return
         try:
             upload_dir = rx.get_upload_dir()
             file_path = upload_dir / filename
+            analysis_engine.release(file_path, evict_audio, file_path)
+            peaks_path(file_path).unlink(missing_ok=True)
             if file_path.exists():
                 os.remove(file_path)
                 logging.info(f"Cleaned up old audio file: {filename}")
@@ -154,6 +249,8 @@ class State(rx.State):
 
     @rx.event
     async def handle_upload(self, files: list[rx.UploadFile]):
+        from app.services.uploads import UploadRejected, probe_audio, save_upload
+
         if self.active_project_id is None:
             yield rx.toast.warning("Please select a project first.", duration=3000)
             return
@@ -161,116 +258,116 @@ class State(rx.State):
             yield rx.toast.error("No file selected for upload.", duration=3000)
             return
         file = files[0]
-        if file.size > MAX_FILE_SIZE_BYTES:
+        if file.size is not None and file.size > MAX_FILE_SIZE_BYTES:
             yield rx.toast.error(
                 f"File is too large. Maximum size is {MAX_FILE_SIZE_MB}MB.",
                 duration=5000,
             )
             return
-        if file.content_type not in SUPPORTED_MIME_TYPES:
-            yield rx.toast.error(
-                f"Unsupported file type: {file.content_type}. Please upload MP3, WAV, FLAC, or OGG.",
-                duration=5000,
-            )
-            return
         self.is_uploading = True
         self.upload_message = "Uploading file..."
         self.upload_progress = 0
         yield
-        old_filename = None
+        if self.active_project_id == self.analyzing_project_id:
+            self._cancel_analysis()
+        project_id = self.active_project_id
         try:
-            project_index = -1
-            for i, p in enumerate(self.projects):
-                if p["id"] == self.active_project_id:
-                    project_index = i
-                    break
-            if project_index == -1:
+            if self.active_project is None:
                 raise Exception("Active project not found.")
-            old_filename = self.projects[project_index]["audio_file_name"]
-            self._cleanup_audio_file(old_filename)
-            upload_data = await file.read()
+            old_filename = self.active_project["audio_file_name"]
             upload_dir = rx.get_upload_dir()
             upload_dir.mkdir(parents=True, exist_ok=True)
             unique_name = f"{self.active_project_id}_{datetime.datetime.now().timestamp()}_{file.name}"
             file_path = upload_dir / unique_name
-            with file_path.open("wb") as f:
-                f.write(upload_data)
-            self.upload_message = "Generating waveform..."
-            self.upload_progress = 50
-            yield
-            waveform_data, duration = await self._generate_waveform(file_path)
-            self.upload_message = "Finalizing..."
-            self.upload_progress = 90
-            yield
-            self.projects[project_index].update(
+            with metrics.timer("upload_stage_seconds", stage="write"):
+                audio_hash = await save_upload(file, file_path, MAX_FILE_SIZE_BYTES)
+            with metrics.timer("upload_stage_seconds", stage="probe"):
+                info = probe_audio(file_path)
+            self._cleanup_audio_file(old_filename)
+            self._update_project(
+                project_id,
                 {
                     "audio_file_name": unique_name,
-                    "waveform_data": waveform_data,
-                    "duration": duration,
+                    "audio_hash": audio_hash,
+                    "duration": info.duration if info else 0.0,
+                    "sample_rate": info.sample_rate if info else None,
+                    "channels": info.channels if info else None,
                     "tempo": 0.0,
-                    "beats": [],
                     "key": None,
-                    "chords": [],
-                }
+                    "key_timeline": [],
+                    "beats_asset": None,
+                    "beat_count": 0,
+                    "chords_asset": None,
+                    "chord_count": 0,
+                    "analyzed_quality": None,
+                    "chord_edits": [],
+                },
             )
             self.upload_progress = 100
-            audio_file_name = self.projects[project_index]["audio_file_name"]
-            yield rx.call_script(f"loadAudio(rx.get_upload_url('{audio_file_name}'))")
-            yield rx.toast.success(
-                "Audio uploaded and processed successfully.", duration=3000
-            )
+            self._refresh_timeline_view()
+            yield rx.call_script(f"loadAudio(rx.get_upload_url('{unique_name}'))")
+            yield rx.toast.success("Audio uploaded.", duration=3000)
+            yield State.build_waveform(project_id, unique_name)
+        except UploadRejected as e:
+            logging.info(f"Rejected upload {file.name}: {e}")
+            yield rx.toast.error(str(e), duration=5000)
         except Exception as e:
             logging.exception(f"Upload and processing failed: {e}")
             yield rx.toast.error(f"Upload failed: {e}", duration=5000)
-            if (
-                "project_index" in locals()
-                and project_index != -1
-                and (old_filename is not None)
-            ):
-                self.projects[project_index]["audio_file_name"] = old_filename
-                self.projects[project_index]["waveform_data"] = []
-                self.projects[project_index]["duration"] = 0.0
         finally:
             self.is_uploading = False
             self.upload_progress = 0
             self.upload_message = ""
 
-    async def _generate_waveform(self, file_path: Path) -> tuple[list[float], float]:
-        """Generates a low-resolution waveform preview using librosa."""
+    @rx.event(background=True)
+    async def build_waveform(self, project_id: int, audio_file_name: str):
+        """Decode a finished upload on the analysis workers to build its peaks.
+
+        Runs after the upload has returned, so playback starts right away. The
+        decoded duration replaces the header estimate. If decoding fails the
+        project's audio is removed again.
+        """
+        from app.services.waveform import generate_waveform
+
+        file_path = rx.get_upload_dir() / audio_file_name
+        async with self:
+            self.waveform_building = True
         try:
-            loop = self.get_event_loop()
-            y, sr = await loop.run_in_executor(None, librosa.load, file_path, sr=None)
-            duration = librosa.get_duration(y=y, sr=sr)
-            if y.ndim > 1 or (
-                y.ndim == 1 and y.shape[0] > 0 and isinstance(y[0], np.ndarray)
-            ):
-                y = librosa.to_mono(y)
-            if np.max(np.abs(y)) > 0:
-                y = y / np.max(np.abs(y))
-            num_samples = WAVEFORM_SAMPLES
-            step = len(y) // num_samples if num_samples > 0 else 1
-            if step == 0:
-                step = 1
-            peaks = [
-                float(np.max(np.abs(y[i : i + step]))) for i in range(0, len(y), step)
-            ]
-            return (peaks[:num_samples], duration)
+            with metrics.timer("upload_stage_seconds", stage="waveform"):
+                duration = await analysis_engine.run(
+                    file_path, generate_waveform, file_path
+                )
         except Exception as e:
             logging.exception(f"Waveform generation failed for {file_path}: {e}")
-            try:
-                self._cleanup_audio_file(file_path.name)
-            except Exception as cleanup_error:
-                logging.exception(
-                    f"Failed to cleanup file during waveform error: {cleanup_error}"
+            duration = None
+        async with self:
+            self.waveform_building = False
+            project = project_store.get(self.library_id, project_id)
+            if project is None or project["audio_file_name"] != audio_file_name:
+                return
+            if duration is None:
+                self._cleanup_audio_file(audio_file_name)
+                self._update_project(
+                    project_id,
+                    {"audio_file_name": None, "audio_hash": None, "duration": 0.0},
                 )
-            raise IOError(
-                f"Failed to process audio. The file may be corrupt or in an unsupported format."
-            )
+                if project_id == self.active_project_id:
+                    self._refresh_timeline_view()
+                yield rx.toast.error(
+                    "Failed to process audio. The file may be corrupt or in an unsupported format.",
+                    duration=5000,
+                )
+                return
+            self._update_project(project_id, {"duration": duration})
+            if project_id == self.active_project_id:
+                self._refresh_timeline_view()
 
     @rx.event
     def trigger_upload(self, upload_id: str):
         return rx.upload_files(upload_id=upload_id)
 
+    # The client playhead follows the audio element's own events and reports
+    # back through sync_playhead, so these handlers only drive the player.
     @rx.event
     def toggle_play_pause(self):
         self.is_playing = not self.is_playing
@@ -283,8 +380,10 @@ class State(rx.State):
         return rx.call_script("stopPlayback()")
 
     @rx.event
-    def set_current_time(self, time: float):
+    def sync_playhead(self, time: float, playing: bool):
+        """Position and play state reported by the client playhead."""
         self.current_time = time
+        self.is_playing = bool(playing)
 
     @rx.event
     def on_scrub(self, e_target: dict):
@@ -295,9 +394,26 @@ class State(rx.State):
             self.current_time = new_time
             return rx.call_script(f"seekAudio({new_time})")
 
+    @rx.event
+    def set_analysis_quality(self, quality: str):
+        """Choose the preset the next analysis of the active project runs with."""
+        if self.active_project_id is None or quality not in QUALITY_PRESETS:
+            return
+        self._update_project(self.active_project_id, {"quality": quality})
+
     @rx.event(background=True)
     async def analyze_audio(self):
+        from app.services.analysis import (
+            find_cached_analysis,
+            merge_partial,
+            run_progressive_analysis,
+        )
+        from app.services.assets import store_beats, store_chords
+        from app.services.scheduler import analysis_scheduler
+
         async with self:
+            if self.is_analyzing:
+                return
             if self.active_project_id is None or not self.active_project:
                 yield rx.toast.error("No active project to analyze.", duration=3000)
                 return
@@ -307,56 +423,296 @@ class State(rx.State):
                 )
                 return
             self.is_analyzing = True
-            project_index = -1
-            for i, p in enumerate(self.projects):
-                if p["id"] == self.active_project_id:
-                    project_index = i
-                    break
-            if project_index != -1:
-                self.projects[project_index]["tempo"] = 0.0
-                self.projects[project_index]["beats"] = []
-                self.projects[project_index]["key"] = None
-                self.projects[project_index]["chords"] = []
+            self.analysis_stage = ANALYSIS_STAGE_MESSAGES["start"]
+            project_id = self.active_project_id
+            self._update_project(
+                project_id,
+                {
+                    "tempo": 0.0,
+                    "key": None,
+                    "key_timeline": [],
+                    "beats_asset": None,
+                    "beat_count": 0,
+                    "chords_asset": None,
+                    "chord_count": 0,
+                    "analyzed_quality": self.active_project["quality"],
+                    "chord_edits": [],
+                },
+            )
+            self.selected_chord = None
+            self._refresh_timeline_view()
+            file_path = rx.get_upload_dir() / self.active_project["audio_file_name"]
+            stored_hash = self.active_project["audio_hash"]
+            duration = self.active_project["duration"]
+            quality = self.active_project["quality"]
+            session_id = self.router.session.client_token
+            job_id = f"{session_id}:{project_id}:{uuid.uuid4().hex}"
+            cancel_token = analysis_engine.new_cancel_token()
+            register_job(job_id, cancel_token)
+            self.analysis_job_id = job_id
+            self.analyzing_project_id = project_id
+        ticket = None
         try:
-            from app.services.analysis import run_full_analysis
-
-            upload_dir = rx.get_upload_dir()
-            file_path = upload_dir / self.active_project["audio_file_name"]
-            analysis_results = await run_full_analysis(file_path)
+            audio_hash, cached = await find_cached_analysis(
+                file_path, stored_hash, quality
+            )
+            if cached is None:
+                ticket = analysis_scheduler.submit(session_id, duration)
+                async for status in ticket.wait():
+                    cancel_token.raise_if_cancelled()
+                    async with self:
+                        self.queue_position = status.position
+                        self.analysis_stage = f"Queued #{status.position} (starts in ~{status.eta_s:.0f}s)"
+                cancel_token.raise_if_cancelled()
+                async with self:
+                    self.queue_position = 0
+                    self.analysis_stage = ANALYSIS_STAGE_MESSAGES["start"]
+            analysis_results = {"chords": []}
+            async for partial_result in run_progressive_analysis(
+                file_path, audio_hash, cancel_token=cancel_token, quality=quality
+            ):
+                if partial_result["stage"] == "metrics":
+                    continue
+                merge_partial(analysis_results, partial_result)
+                summary = {
+                    field: partial_result[field]
+                    for field in ("duration", "tempo", "key", "key_timeline")
+                    if field in partial_result
+                }
+                if "beats" in partial_result:
+                    summary["beats_asset"] = store_beats(partial_result["beats"])
+                    summary["beat_count"] = len(partial_result["beats"])
+                if "chords" in partial_result:
+                    summary["chords_asset"] = store_chords(partial_result["chords"])
+                    summary["chord_count"] = len(partial_result["chords"])
+                async with self:
+                    cancel_token.raise_if_cancelled()
+                    self.analysis_stage = ANALYSIS_STAGE_MESSAGES.get(
+                        partial_result["stage"], ""
+                    )
+                    self._update_project(project_id, summary)
+                    if project_id == self.active_project_id:
+                        self._refresh_timeline_view()
             async with self:
-                if project_index != -1:
-                    self.projects[project_index].update(analysis_results)
+                cancel_token.raise_if_cancelled()
                 yield rx.toast.success(
                     f"Analysis complete! Key: {analysis_results['key']}, Tempo: {analysis_results['tempo']:.1f} BPM",
                     duration=5000,
                 )
+        except AnalysisCancelled:
+            logging.info(f"Analysis {job_id} cancelled")
         except Exception as e:
             logging.exception(f"Analysis failed: {e}")
             async with self:
                 yield rx.toast.error(f"Analysis failed: {e}", duration=5000)
         finally:
+            still_running = analysis_engine.still_running(cancel_token)
+            if ticket is not None and still_running is not None:
+                # The worker keeps going until its next checkpoint, so the
+                # slot only goes to the next queued job once it has stopped.
+                still_running.add_done_callback(
+                    lambda _: ticket.release(cancelled=cancel_token.cancelled)
+                )
+            elif ticket is not None:
+                ticket.release(cancelled=cancel_token.cancelled)
+            unregister_job(job_id)
             async with self:
                 self.is_analyzing = False
+                self.analysis_stage = ""
+                self.queue_position = 0
+                if self.analysis_job_id == job_id:
+                    self.analysis_job_id = ""
+                    self.analyzing_project_id = None
+
+    def _refresh_timeline_view(self):
+        """Load the peaks, beats and chords matching the current zoom and scroll.
+
+        Each is capped per window (``PEAK_LEVELS``, ``MAX_WINDOW_BEATS``,
+        ``MAX_WINDOW_CHORDS``), so the state sent on every zoom and scroll has
+        a fixed upper bound whatever the track length.
+        """
+        import numpy as np
+
+        from app.services.assets import (
+            beats_in_window,
+            chord_segments,
+            chords_in_window,
+            load_beats,
+            load_chord_table,
+        )
+        from app.services.waveform import PEAK_SCALE, read_peak_window
+
+        self.waveform_path, self.waveform_view_box = ("", "0 0 1 1")
+        self.waveform_view_start, self.waveform_view_end = (0.0, 1.0)
+        self.visible_beats, self.visible_chords = ([], [])
+        project = self.active_project
+        if not project or not project["audio_file_name"]:
+            return
+        file_path = rx.get_upload_dir() / project["audio_file_name"]
+        try:
+            window = read_peak_window(
+                file_path, self.timeline_zoom, self.timeline_scroll
+            )
+            self.waveform_path = window.path
+            self.waveform_view_box = (
+                f"0 0 {max(window.buckets - 1, 1)} {2 * PEAK_SCALE}"
+            )
+            self.waveform_view_start, self.waveform_view_end = (
+                window.start,
+                window.end,
+            )
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logging.exception(f"Could not read waveform peaks for {file_path}")
+        start = self.waveform_view_start * project["duration"]
+        end = self.waveform_view_end * project["duration"]
+        try:
+            if project["beats_asset"]:
+                beats = beats_in_window(load_beats(project["beats_asset"]), start, end)
+                self.visible_beats = np.round(beats, 3).tolist()
+            if project["chords_asset"]:
+                table = load_chord_table(project["chords_asset"])
+                self.visible_chords = chord_segments(
+                    chords_in_window(table, start, end)
+                )
+        except (OSError, ValueError):
+            logging.exception(f"Could not read analysis assets for {file_path}")
+
+    @rx.event
+    def on_timeline_scroll(self):
+        return rx.call_script(
+            "(el => el.scrollLeft / el.scrollWidth)(document.getElementById('timeline-scroll'))",
+            callback=State.set_timeline_scroll,
+        )
+
+    @rx.event
+    def set_timeline_scroll(self, fraction: float):
+        self.timeline_scroll = min(max(float(fraction), 0.0), 1.0)
+        visible_end = self.timeline_scroll + 1.0 / self.timeline_zoom
+        if (
+            self.timeline_scroll < self.waveform_view_start
+            or min(visible_end, 1.0) > self.waveform_view_end
+        ):
+            self._refresh_timeline_view()
 
     @rx.event
     def zoom_in(self):
         self.timeline_zoom = min(self.timeline_zoom * 1.5, 10.0)
+        self._refresh_timeline_view()
 
     @rx.event
     def zoom_out(self):
         self.timeline_zoom = max(self.timeline_zoom / 1.5, 1.0)
+        self.timeline_scroll = min(self.timeline_scroll, 1.0 - 1.0 / self.timeline_zoom)
+        self._refresh_timeline_view()
 
     @rx.event
     def reset_zoom(self):
         self.timeline_zoom = 1.0
+        self.timeline_scroll = 0.0
+        self._refresh_timeline_view()
 
     @rx.event
     def on_chord_click(self, chord_index: int):
-        if not self.active_project or not self.active_project["chords"]:
+        if chord_index >= len(self.visible_chords):
             return
-        chord = self.active_project["chords"][chord_index]
+        chord = self.visible_chords[chord_index]
+        self.selected_chord = chord
+        self.chord_edit_text = chord["label"]
         return rx.call_script(f"playChord({json.dumps(chord['notes'])}, 1.5)")
 
+    @rx.event
+    def set_chord_edit_text(self, text: str):
+        self.chord_edit_text = text
+
+    @rx.event
+    def close_chord_editor(self):
+        self.selected_chord = None
+
+    @rx.event(background=True)
+    async def apply_chord_edit(self):
+        """Pin the selected chord segment to the typed chord and re-decode around it."""
+        async with self:
+            if not self.selected_chord or not self.active_project:
+                return
+            edit = {
+                "start_time": self.selected_chord["start_time"],
+                "end_time": self.selected_chord["end_time"],
+                "chord": self.chord_edit_text.strip(),
+            }
+            edits = self.active_project["chord_edits"] + [edit]
+        async for event in self._redecode_chords(edits):
+            yield event
+
+    @rx.event(background=True)
+    async def clear_chord_edits(self):
+        async for event in self._redecode_chords([]):
+            yield event
+
+    async def _redecode_chords(self, edits: list[ChordEdit]):
+        """Apply ``edits`` to the active project's chords and store the result.
+
+        Runs on the file's analysis worker, which keeps the decoder lattice
+        from the previous edit, so only the span around a new edit is decoded.
+        The lattice is that of the preset the chords were analyzed with, which
+        may differ from the one currently selected for the next analysis.
+        Called from background events: the state lock is held only to read
+        the project and to store the result, and ``is_editing_chords`` reaches
+        the client while the worker decodes. The result is dropped if the
+        project's audio or chords changed in the meantime.
+        """
+        from app.services.assets import store_chords
+        from app.services.chord_editing import apply_chord_edits
+
+        async with self:
+            project = self.active_project
+            if self.is_analyzing or self.is_editing_chords or not project:
+                return
+            if not project["chord_count"]:
+                yield rx.toast.error("Analyze the audio before editing chords.")
+                return
+            self.is_editing_chords = True
+        file_path = rx.get_upload_dir() / project["audio_file_name"]
+        try:
+            with metrics.timer("chord_edit_seconds"):
+                chords = await analysis_engine.run(
+                    file_path,
+                    apply_chord_edits,
+                    file_path,
+                    edits,
+                    project["analyzed_quality"] or project["quality"],
+                    project["audio_hash"],
+                )
+        except ValueError as e:
+            yield rx.toast.error(str(e), duration=3000)
+            return
+        except Exception as e:
+            logging.exception(f"Chord edit failed: {e}")
+            yield rx.toast.error("Could not apply the chord edit.", duration=3000)
+            return
+        finally:
+            async with self:
+                self.is_editing_chords = False
+        async with self:
+            current = project_store.get(self.library_id, project["id"])
+            if current is None or any(
+                current[field] != project[field]
+                for field in ("audio_file_name", "chords_asset", "chord_edits")
+            ):
+                return
+            self._update_project(
+                project["id"],
+                {
+                    "chord_edits": edits,
+                    "chords_asset": store_chords(chords),
+                    "chord_count": len(chords),
+                },
+            )
+            if project["id"] == self.active_project_id:
+                self.selected_chord = None
+                self._refresh_timeline_view()
+
     @rx.event
     def set_main_audio_volume(self, volume: float):
         self.main_audio_volume = float(volume)
@@ -388,4 +744,4 @@ class State(rx.State):
             window.remove_chord_analyzer_listeners = () => {
                 document.removeEventListener('keydown', space_handler);
             };
-        """)
\ No newline at end of file
+        """)
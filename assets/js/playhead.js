@@ -0,0 +1,139 @@
+// Client-side playhead. Animates the timeline cursor and the time readout on
+// every animation frame, so playback needs no server round-trips. It follows
+// the audio element itself: the element's play, pause, seeked, ended and
+// emptied events start, stop and move the cursor, however playback was
+// started (transport buttons, the Space shortcut or the player script). The
+// position and play state are reported to the server (by clicking the hidden
+// #playhead-sync button) on those events, every data-sync-ms milliseconds
+// and when playback crosses a chord boundary. Configuration is read from the
+// data attributes of the #playhead element.
+window.playhead = (() => {
+  let media = null;
+  let playing = false;
+  let startedAt = 0;
+  let offset = 0;
+  let frame = null;
+  let lastSync = 0;
+  let lastTime = 0;
+
+  const element = () => document.getElementById("playhead");
+
+  const time = () => {
+    if (typeof window.getPlaybackTime === "function") {
+      return window.getPlaybackTime();
+    }
+    if (media) return media.currentTime;
+    return playing ? offset + (performance.now() - startedAt) / 1000 : offset;
+  };
+
+  const sync = () => {
+    lastSync = performance.now();
+    document.getElementById("playhead-sync")?.click();
+  };
+
+  const crossedBoundary = (from, to) => {
+    const boundaries = JSON.parse(element()?.dataset.boundaries || "[]");
+    return boundaries.some((b) => from < b && b <= to);
+  };
+
+  const render = () => {
+    const el = element();
+    if (!el) return;
+    const duration = parseFloat(el.dataset.duration) || 0;
+    const now = Math.min(time(), duration || Infinity);
+    if (duration > 0) el.style.left = `${(now / duration) * 100}%`;
+    const readout = document.getElementById("playback-time");
+    if (readout) readout.textContent = `${now.toFixed(1)}s`;
+    const syncMs = parseFloat(el.dataset.syncMs) || 0;
+    if (
+      playing &&
+      (crossedBoundary(lastTime, now) ||
+        (syncMs > 0 && performance.now() - lastSync >= syncMs))
+    ) {
+      sync();
+    }
+    lastTime = now;
+  };
+
+  const loop = () => {
+    render();
+    frame = playing ? requestAnimationFrame(loop) : null;
+  };
+
+  const api = {
+    time,
+    playing: () => playing,
+    play(from) {
+      offset = from;
+      lastTime = from;
+      startedAt = performance.now();
+      playing = true;
+      lastSync = startedAt;
+      if (frame === null) frame = requestAnimationFrame(loop);
+    },
+    pause() {
+      offset = time();
+      playing = false;
+      render();
+      return offset;
+    },
+    seek(to) {
+      offset = to;
+      lastTime = to;
+      startedAt = performance.now();
+      render();
+    },
+    stop() {
+      playing = false;
+      offset = 0;
+      lastTime = 0;
+      render();
+    },
+  };
+
+  const onMediaEvent = (event) => {
+    const target = event.target;
+    if (!(target instanceof HTMLMediaElement)) return;
+    if (event.type === "emptied") {
+      if (target === media) media = null;
+      api.stop();
+      sync();
+      return;
+    }
+    media = target;
+    if (event.type === "play") {
+      api.play(target.currentTime);
+    } else if (event.type === "pause" || event.type === "ended") {
+      api.pause();
+    } else if (event.type === "seeked") {
+      api.seek(target.currentTime);
+    }
+    sync();
+  };
+
+  // Media events do not bubble: elements in the document are caught in the
+  // capture phase, detached ones (new Audio()) when they are first played.
+  const MEDIA_EVENTS = ["play", "pause", "seeked", "ended", "emptied"];
+  const followed = new WeakSet();
+  const follow = (target) => {
+    if (followed.has(target)) return;
+    followed.add(target);
+    for (const type of MEDIA_EVENTS) target.addEventListener(type, onMediaEvent);
+  };
+  for (const type of MEDIA_EVENTS) {
+    document.addEventListener(
+      type,
+      (event) => {
+        if (event.target instanceof HTMLMediaElement) follow(event.target);
+      },
+      true,
+    );
+  }
+  const nativePlay = HTMLMediaElement.prototype.play;
+  HTMLMediaElement.prototype.play = function (...args) {
+    follow(this);
+    return nativePlay.apply(this, args);
+  };
+
+  return api;
+})();
@@ -0,0 +1,86 @@
+"""Latency of a chord edit: local re-decoding versus decoding the whole track.
+
+Builds the decoder lattice for synthetic chroma of several lengths, then pins
+random spans to random chords one after another, as a user correcting a
+track would. Each edit is timed through ``ChordEditSession`` (re-decode a
+window around the edit, rebuild the segments) and against a full
+constrained decode. Also reports how often the two disagree on beats
+outside the edit window. Run from the repository root:
+
+    python -m benchmarks.bench_chord_edits
+"""
+
+import time
+
+import numpy as np
+
+from app.services import chord_recognition
+from app.services.chord_editing import EDIT_WINDOW_BEATS, ChordEditSession
+from benchmarks.bench_chord_recognition import SR, HOP_LENGTH, synthetic_input
+from benchmarks.bench_inversions import synthetic_bass
+
+DURATIONS_MINUTES = [5, 60, 120]
+EDITS = 20
+EDIT_BEATS = 8
+KEY = "C Major"
+
+
+def full_constrained_decode(session: ChordEditSession) -> np.ndarray:
+    """The whole-track decode with every pin as a hard constraint."""
+    path = session.decoded_path.copy()
+    return chord_recognition.decode_window(
+        session.lattice, path, session.pinned, 0, len(path)
+    )
+
+
+def run(minutes: float, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    chroma, beat_times = synthetic_input(minutes)
+    lattice = chord_recognition.chord_lattice(
+        chroma, beat_times, SR, KEY, synthetic_bass(chroma), HOP_LENGTH
+    )
+    start = time.perf_counter()
+    session = ChordEditSession(lattice)
+    session.segments()
+    full_s = time.perf_counter() - start
+
+    times = lattice.segment_times
+    names = list(chord_recognition._chord_name_index())
+    edit_s, full_edit_s, outside_changed, outside_beats = ([], [], 0, 0)
+    for _ in range(EDITS):
+        first = int(rng.integers(len(times) - EDIT_BEATS - 1))
+        edit = {
+            "start_time": times[first],
+            "end_time": times[first + EDIT_BEATS],
+            "chord": names[rng.integers(len(names))],
+        }
+        start = time.perf_counter()
+        session.apply(edit)
+        session.segments()
+        edit_s.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        reference = full_constrained_decode(session)
+        chord_recognition.lattice_segments(
+            lattice, reference, session.pinned_inversions
+        )
+        full_edit_s.append(time.perf_counter() - start)
+        outside = np.ones(len(reference), dtype=bool)
+        outside[
+            max(0, first - EDIT_WINDOW_BEATS) : first + EDIT_BEATS + EDIT_WINDOW_BEATS
+        ] = False
+        outside_changed += int(np.count_nonzero((reference != session.path)[outside]))
+        outside_beats += int(np.count_nonzero(outside))
+
+    print(
+        f"{minutes:>4} min | {len(times) - 1:>6} beats | first decode {full_s:6.3f}s | "
+        f"edit p50 {np.median(edit_s) * 1e3:6.1f} ms, max {max(edit_s) * 1e3:6.1f} ms | "
+        f"full re-decode p50 {np.median(full_edit_s) * 1e3:7.1f} ms | "
+        f"beats outside the window differing from the full decode "
+        f"{outside_changed / outside_beats:6.2%}"
+    )
+
+
+if __name__ == "__main__":
+    for minutes in DURATIONS_MINUTES:
+        run(minutes)
@@ -0,0 +1,94 @@
+"""Benchmark batched chord emission scoring against the per-beat scipy loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chord_recognition
+"""
+
+import time
+
+import librosa
+import numpy as np
+from scipy.spatial.distance import cosine
+
+from app.services import chord_recognition
+
+SR = 22050
+HOP_LENGTH = 512
+TEMPO = 120.0
+DURATIONS_MINUTES = [5, 60]
+
+
+def legacy_emissions(chroma: np.ndarray, beat_frames: np.ndarray) -> np.ndarray:
+    """The original per-beat ``np.mean`` + per-template ``cosine`` loop."""
+    templates = chord_recognition.chord_template_matrix()
+    log_prob = np.zeros((len(templates), len(beat_frames) - 1))
+    for i in range(len(beat_frames) - 1):
+        start, end = (beat_frames[i], beat_frames[i + 1])
+        if start >= end:
+            continue
+        chroma_segment = np.mean(chroma[:, start:end], axis=1)
+        for j, template in enumerate(templates):
+            log_prob[j, i] = -cosine(chroma_segment, template)
+    return log_prob
+
+
+def greedy_path(log_prob: np.ndarray) -> np.ndarray:
+    """The greedy decoder used by ``recognize_chords``."""
+    trans_prob = np.full((log_prob.shape[0], log_prob.shape[0]), -1.0)
+    np.fill_diagonal(trans_prob, 0.0)
+    path = np.zeros(log_prob.shape[1], dtype=int)
+    path[0] = np.argmax(log_prob[:, 0])
+    for i in range(1, log_prob.shape[1]):
+        path[i] = np.argmax(log_prob[:, i] + trans_prob[path[i - 1], :])
+    return path
+
+
+def synthetic_input(minutes: float, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Noisy chroma following a random chord progression, one chord per bar."""
+    rng = np.random.default_rng(seed)
+    n_frames = int(minutes * 60 * SR / HOP_LENGTH)
+    beat_times = np.arange(0.5, minutes * 60, 60.0 / TEMPO)
+    beat_frames = librosa.time_to_frames(beat_times, sr=SR, hop_length=HOP_LENGTH)
+    chroma = rng.random((12, n_frames)) * 0.3
+    bar_frames = np.concatenate(([0], beat_frames[::4], [n_frames]))
+    templates = chord_recognition.chord_template_matrix()
+    for start, end in zip(bar_frames[:-1], bar_frames[1:]):
+        chroma[:, start:end] += templates[rng.integers(len(templates))][:, None]
+    return chroma / chroma.max(axis=0, keepdims=True), beat_times
+
+
+def run(minutes: float) -> None:
+    chroma, beat_times = synthetic_input(minutes)
+    beat_frames = librosa.time_to_frames(beat_times, sr=SR, hop_length=HOP_LENGTH)
+    beat_frames = np.concatenate(([0], beat_frames, [chroma.shape[1] - 1]))
+
+    start = time.perf_counter()
+    expected = legacy_emissions(chroma, beat_frames)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    beat_chroma = chord_recognition.beat_sync_chroma(chroma, beat_frames)
+    actual = chord_recognition.chord_emissions(beat_chroma)
+    actual[:, beat_frames[:-1] >= beat_frames[1:]] = 0.0
+    batched_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chords = chord_recognition.recognize_chords(chroma, beat_times, SR)
+    full_s = time.perf_counter() - start
+
+    same_path = np.array_equal(expected.argmax(axis=0), actual.argmax(axis=0))
+    same_path &= np.array_equal(greedy_path(expected), greedy_path(actual))
+    print(
+        f"{minutes:>4} min | {len(beat_times):>6} beats | "
+        f"legacy {legacy_s:8.3f}s | batched {batched_s:8.4f}s | "
+        f"speedup {legacy_s / batched_s:7.1f}x | "
+        f"max |diff| {np.max(np.abs(expected - actual)):.2e} | "
+        f"paths identical: {same_path} | "
+        f"recognize_chords {full_s:.3f}s ({len(chords)} segments)"
+    )
+
+
+if __name__ == "__main__":
+    for minutes in DURATIONS_MINUTES:
+        run(minutes)
@@ -0,0 +1,73 @@
+"""Cost of a full analysis versus re-decoding from the feature store.
+
+For every quality preset, analyzes a rendered track with an empty feature
+store (extract, store, decode), then again with the stored features, as
+after a change to decoder parameters. Checks that both runs give identical
+results and reports the on-disk size per track. Run from the repository
+root (durations in minutes are optional):
+
+    python -m benchmarks.bench_feature_store 3 20
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.analysis import (
+    feature_fingerprint,
+    iter_analysis_stages,
+    merge_partial,
+)
+from app.services.audio_cache import load_audio
+from app.services.feature_store import feature_store
+from app.services.presets import QUALITY_PRESETS
+from app.services.result_cache import hash_file
+from benchmarks.fixtures import write_fixture
+
+DEFAULT_DURATIONS_MINUTES = [3, 20]
+WARM_UP_SECONDS = 10
+
+
+def analyze(path: Path, quality: str, audio_hash: str) -> tuple[dict, float]:
+    start = time.perf_counter()
+    results = {"chords": []}
+    for partial in iter_analysis_stages(path, quality, audio_hash=audio_hash):
+        merge_partial(results, partial)
+    return (results, time.perf_counter() - start)
+
+
+def warm_up(workdir: Path) -> None:
+    """Compile numba kernels for every preset so the first timing is not skewed."""
+    path = workdir / "warm_up.wav"
+    write_fixture(path, WARM_UP_SECONDS)
+    for name in QUALITY_PRESETS:
+        for _ in iter_analysis_stages(path, name, use_cache=False):
+            pass
+
+
+def run(minutes: float, workdir: Path) -> None:
+    path = workdir / f"fixture_{minutes}min.wav"
+    write_fixture(path, minutes * 60)
+    audio_hash = hash_file(path)
+    for name, preset in QUALITY_PRESETS.items():
+        load_audio(path, preset.sample_rate)
+        feature_store.clear()
+        cold, cold_s = analyze(path, name, audio_hash)
+        warm, warm_s = analyze(path, name, audio_hash)
+        entry = feature_store.root / feature_fingerprint(name) / audio_hash
+        size_mb = sum(f.stat().st_size for f in entry.iterdir()) / 1e6
+        print(
+            f"{minutes:>4} min | {name:<8} | full {cold_s:6.2f}s | "
+            f"from store {warm_s * 1e3:7.1f} ms | {size_mb:6.1f} MB on disk | "
+            f"identical {cold == warm}"
+        )
+
+
+if __name__ == "__main__":
+    durations = [float(arg) for arg in sys.argv[1:]] or DEFAULT_DURATIONS_MINUTES
+    with tempfile.TemporaryDirectory() as workdir:
+        feature_store.root = Path(workdir) / "features"
+        warm_up(Path(workdir))
+        for minutes in durations:
+            run(minutes, Path(workdir))
@@ -0,0 +1,60 @@
+"""Cold-start import time of the web layer versus the DSP layer.
+
+Each module is imported in a fresh interpreter several times; the median
+wall time is reported together with any heavy DSP dependency it dragged in.
+Exits non-zero if a web-layer module imports one, so a stray top-level
+import fails loudly. Run from the repository root:
+
+    python -m benchmarks.bench_imports
+"""
+
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+WEB_MODULES = ("app.states.base", "app.app")
+DSP_MODULES = ("app.services.analysis", "app.batch")
+HEAVY_MODULES = ("numpy", "librosa", "scipy", "numba", "soundfile", "soxr")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def cold_import(module: str) -> tuple[float, list[str]]:
+    """Seconds to import ``module`` in a new interpreter, and the heavy modules it loaded."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()[-1]
+    elapsed, heavy = output.split(" ", 1)
+    return (float(elapsed), [m for m in heavy.split(",") if m])
+
+
+def main() -> int:
+    leaked = False
+    for module in WEB_MODULES + DSP_MODULES:
+        samples = [cold_import(module) for _ in range(RUNS)]
+        median_s = statistics.median(elapsed for elapsed, _ in samples)
+        heavy = samples[-1][1]
+        print(
+            f"{module:<24} | median {median_s * 1e3:7.1f} ms over {RUNS} runs | "
+            f"heavy: {', '.join(heavy) or '-'}"
+        )
+        if module in WEB_MODULES and heavy:
+            leaked = True
+    if leaked:
+        print("A web-layer module imported the DSP stack at import time.")
+    return 1 if leaked else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Cost and accuracy of inversion and slash-chord decoding with bass chroma.
+
+Compares, on synthetic chroma, the chord-only decoder, the factorized
+(chord, bass) decoder used by ``recognize_chords`` and a naive Viterbi over
+the full (chord, bass) vocabulary, checking that the last two agree. Then
+scores a rendered progression full of inversions. Run from the repository
+root:
+
+    python -m benchmarks.bench_inversions
+"""
+
+import time
+
+import librosa
+import numpy as np
+
+from app.services import chord_recognition
+from app.services.audio_cache import ANALYSIS_SR
+from benchmarks.bench_chord_recognition import HOP_LENGTH, SR, synthetic_input
+from benchmarks.fixtures import FIXTURE_SR, chord_accuracy, render_progression
+
+DURATIONS_MINUTES = [5, 60]
+NAIVE_MAX_MINUTES = 5
+KEY = "C Major"
+FIXTURE_SECONDS = 64
+INVERSION_PROGRESSION = [
+    "C:maj",
+    "C:maj/E",
+    "F:maj",
+    "G:maj/B",
+    "A:min",
+    "A:min/E",
+    "F:maj/A",
+    "G:dom7",
+    "C:maj/G",
+    "D:min/F",
+    "G:maj/D",
+    "E:min/G",
+]
+
+
+def synthetic_bass(chroma: np.ndarray, seed: int = 0) -> np.ndarray:
+    """Bass chroma sounding a random chord tone of each frame's strongest chord."""
+    rng = np.random.default_rng(seed)
+    templates = chord_recognition.chord_template_matrix()
+    best = np.argmax(templates @ chroma, axis=0)
+    bass = rng.random(chroma.shape) * 0.1
+    for start in range(0, chroma.shape[1], 200):
+        tones = np.flatnonzero(templates[best[start]])
+        bass[rng.choice(tones), start : start + 200] += 0.6
+    return bass
+
+
+def beat_scores(chroma: np.ndarray, bass: np.ndarray, beat_times: np.ndarray):
+    beat_frames = librosa.time_to_frames(beat_times, sr=SR, hop_length=HOP_LENGTH)
+    beat_frames = np.concatenate(([0], beat_frames, [chroma.shape[1] - 1]))
+    return (
+        chord_recognition.chord_emissions(
+            chord_recognition.beat_sync_chroma(chroma, beat_frames)
+        ),
+        chord_recognition.beat_sync_chroma(bass, beat_frames),
+    )
+
+
+def naive_joint_viterbi(log_prob: np.ndarray, beat_bass: np.ndarray) -> np.ndarray:
+    """Viterbi over every (chord, bass option) state; returns (chord, option) pairs."""
+    table = chord_recognition.bass_option_table()
+    chords, options = np.nonzero(table >= 0)
+    emission = (
+        log_prob[chords]
+        + chord_recognition.BASS_WEIGHT * beat_bass[table[chords, options]]
+    )
+    emission[options > 0] -= chord_recognition.INVERSION_PENALTY
+    log_trans = chord_recognition.key_transition_matrix(KEY)[np.ix_(chords, chords)]
+    log_init = np.log(chord_recognition.key_chord_prior(KEY))[chords]
+    path = chord_recognition.viterbi(
+        chord_recognition.EMISSION_SCALE * emission, log_trans, log_init
+    )
+    return np.stack((chords[path], options[path]))
+
+
+def run(minutes: float) -> None:
+    chroma, beat_times = synthetic_input(minutes)
+    bass = synthetic_bass(chroma)
+    log_prob, beat_bass = beat_scores(chroma, bass, beat_times)
+    log_trans = chord_recognition.key_transition_matrix(KEY)
+    log_init = np.log(chord_recognition.key_chord_prior(KEY))
+
+    start = time.perf_counter()
+    chord_recognition.viterbi(
+        chord_recognition.EMISSION_SCALE * log_prob, log_trans, log_init
+    )
+    chord_only_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    joint, inversions = chord_recognition.inversion_emissions(log_prob, beat_bass)
+    path = chord_recognition.viterbi(
+        chord_recognition.EMISSION_SCALE * joint, log_trans, log_init
+    )
+    factorized = np.stack((path, inversions[path, np.arange(len(path))]))
+    factorized_s = time.perf_counter() - start
+
+    vocabulary = int(np.count_nonzero(chord_recognition.bass_option_table() >= 0))
+    line = (
+        f"{minutes:>4} min | {log_prob.shape[1]:>6} beats | "
+        f"chord-only ({log_prob.shape[0]} states) {chord_only_s:7.3f}s | "
+        f"factorized ({vocabulary} entries) {factorized_s:7.3f}s"
+    )
+    if minutes <= NAIVE_MAX_MINUTES:
+        start = time.perf_counter()
+        naive = naive_joint_viterbi(log_prob, beat_bass)
+        naive_s = time.perf_counter() - start
+        line += (
+            f" | naive {naive_s:7.3f}s | "
+            f"paths agree on {np.mean(np.all(naive == factorized, axis=0)):6.1%} of beats"
+        )
+    print(line)
+
+
+def run_fixture() -> None:
+    y, truth = render_progression(FIXTURE_SECONDS, INVERSION_PROGRESSION, bass=True)
+    y = librosa.resample(y, orig_sr=FIXTURE_SR, target_sr=ANALYSIS_SR)
+    _, beat_frames = librosa.beat.beat_track(y=y, sr=ANALYSIS_SR)
+    beat_times = librosa.frames_to_time(beat_frames, sr=ANALYSIS_SR)
+    chroma, bass_chroma = chord_recognition.chroma_features(y, ANALYSIS_SR)
+    key = chord_recognition.detect_key(chroma)
+    without_bass = chord_recognition.recognize_chords(
+        chroma, beat_times, ANALYSIS_SR, key
+    )
+    with_bass = chord_recognition.recognize_chords(
+        chroma, beat_times, ANALYSIS_SR, key, bass_chroma
+    )
+    print(
+        f"fixture with inversions | label accuracy without bass chroma "
+        f"{chord_accuracy(without_bass, truth):6.1%} | "
+        f"with bass chroma {chord_accuracy(with_bass, truth):6.1%}"
+    )
+
+
+if __name__ == "__main__":
+    for minutes in DURATIONS_MINUTES:
+        run(minutes)
+    run_fixture()
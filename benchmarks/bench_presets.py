@@ -0,0 +1,68 @@
+"""Speed and accuracy of the analysis quality presets.
+
+Analyzes a rendered progression with inversions under every preset and
+reports the pipeline time (decode excluded), chord accuracy ignoring the
+bass, full label accuracy including inversions, and the detected tempo
+against the rendered one. Run from the repository root:
+
+    python -m benchmarks.bench_presets
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.analysis import iter_analysis_stages, merge_partial
+from app.services.audio_cache import load_audio
+from app.services.presets import QUALITY_PRESETS
+from benchmarks.bench_inversions import INVERSION_PROGRESSION
+from benchmarks.fixtures import chord_accuracy, write_fixture
+
+FIXTURE_SECONDS = 180
+FIXTURE_TEMPO = 110.0
+RUNS = 3
+
+
+def without_bass(labels: list) -> list:
+    return [(start, end, label.split("/")[0]) for start, end, label in labels]
+
+
+def analyze(path: Path, quality: str) -> dict:
+    results = {"chords": []}
+    for partial in iter_analysis_stages(path, quality, use_cache=False):
+        merge_partial(results, partial)
+    return results
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / "fixture.wav"
+        truth = write_fixture(
+            path,
+            FIXTURE_SECONDS,
+            progression=INVERSION_PROGRESSION,
+            tempo=FIXTURE_TEMPO,
+            bass=True,
+        )
+        for name, preset in QUALITY_PRESETS.items():
+            load_audio(path, preset.sample_rate)
+            analyze(path, name)
+            timings = []
+            for _ in range(RUNS):
+                start = time.perf_counter()
+                results = analyze(path, name)
+                timings.append(time.perf_counter() - start)
+            chords = [
+                {**chord, "label": chord["label"].split("/")[0]}
+                for chord in results["chords"]
+            ]
+            print(
+                f"{name:<8} | {min(timings):6.2f}s | "
+                f"chords {chord_accuracy(chords, without_bass(truth)):6.1%} | "
+                f"labels incl. inversions {chord_accuracy(results['chords'], truth):6.1%} | "
+                f"tempo {results['tempo']:6.1f} (rendered {FIXTURE_TEMPO:.0f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare streaming and in-memory analysis: equivalence, time and peak memory.
+
+Run from the repository root (durations in minutes are optional):
+
+    python -m benchmarks.bench_streaming 3 20
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import librosa
+import numpy as np
+
+from app.services import chord_recognition
+from app.services.analysis import decode_features
+from app.services.audio_cache import ANALYSIS_SR
+from app.services.presets import get_preset
+from app.services.streaming import extract_streaming_features
+from benchmarks.fixtures import chord_accuracy, write_fixture
+
+DEFAULT_DURATIONS_MINUTES = [3, 20]
+
+
+def run_in_memory_analysis(file_path: Path, sr: int) -> dict:
+    """The whole-file pipeline used below the streaming threshold."""
+    y, sr = librosa.load(file_path, sr=sr)
+    tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
+    beat_times = librosa.frames_to_time(beat_frames, sr=sr)
+    chroma, bass_chroma = chord_recognition.chroma_features(y, sr)
+    key = chord_recognition.detect_key(chroma)
+    chords = chord_recognition.recognize_chords(
+        chroma, beat_times, sr, key, bass_chroma
+    )
+    return {
+        "tempo": float(np.atleast_1d(tempo)[0]),
+        "beats": beat_times.tolist(),
+        "key": key,
+        "chords": chords,
+        "duration": librosa.get_duration(y=y, sr=sr),
+    }
+
+
+def run_streaming_analysis(file_path: Path) -> dict:
+    """The block-by-block pipeline used above the streaming threshold."""
+    return decode_features(extract_streaming_features(file_path, get_preset()))
+
+
+def measure(fn, *args) -> tuple[dict, float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (result, elapsed, peak / 1e6)
+
+
+def beat_agreement(reference: list[float], other: list[float], tol: float = 0.05):
+    if not reference or not other:
+        return 0.0
+    other = np.asarray(other)
+    idx = np.searchsorted(other, reference).clip(1, len(other) - 1)
+    nearest = np.minimum(
+        np.abs(other[idx] - reference), np.abs(other[idx - 1] - reference)
+    )
+    return float(np.mean(nearest <= tol))
+
+
+def run(minutes: float, workdir: Path) -> None:
+    path = workdir / f"fixture_{minutes}min.wav"
+    truth = write_fixture(path, minutes * 60)
+    full, full_s, full_mb = measure(run_in_memory_analysis, path, ANALYSIS_SR)
+    streamed, stream_s, stream_mb = measure(run_streaming_analysis, path)
+    print(
+        f"{minutes:>4} min | in-memory {full_s:7.1f}s {full_mb:8.1f} MB peak | "
+        f"streaming {stream_s:7.1f}s {stream_mb:8.1f} MB peak | "
+        f"tempo {full['tempo']:.1f} vs {streamed['tempo']:.1f} | "
+        f"key {full['key']} vs {streamed['key']} | "
+        f"beats agree {beat_agreement(full['beats'], streamed['beats']):.1%} | "
+        f"chord accuracy {chord_accuracy(full['chords'], truth):.1%} vs "
+        f"{chord_accuracy(streamed['chords'], truth):.1%}"
+    )
+
+
+if __name__ == "__main__":
+    durations = [float(arg) for arg in sys.argv[1:]] or DEFAULT_DURATIONS_MINUTES
+    with tempfile.TemporaryDirectory() as workdir:
+        for minutes in durations:
+            run(minutes, Path(workdir))
@@ -0,0 +1,354 @@
+"""Reproducible end-to-end benchmark over deterministic synthetic fixtures.
+
+Renders the default progression at a known tempo and key for every entry of
+``FIXTURES`` (30 s to 2 h). Fixtures are cached in ``BENCH_FIXTURE_DIR``
+and are bit-identical on every machine, and each file's hash is recorded
+with its results. Every fixture and quality preset runs in a fresh process.
+That process warms up the numba kernels, then times:
+
+- decode: ``load_audio`` at the waveform sample rate
+- waveform: peak pyramid build and write
+- the analysis pipeline from ``iter_analysis_stages``, uncached, stage by stage:
+  load, beats, chroma, key and chords, or stream for long files, which
+  covers decode, beats and chroma in one pass
+
+Each case also records throughput and peak RSS. Results are scored against
+the ground truth: chord accuracy, key, tempo error and beat F-measure.
+
+Results go to a JSON file named after the current commit, so two runs can be
+compared. ``--compare`` prints the differences. It exits non-zero when any
+case lost accuracy, so a speedup cannot quietly cost correctness. Run from
+the repository root:
+
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --max-minutes 3 --quality fast
+    python -m benchmarks.bench_suite --compare .bench_results/A.json .bench_results/B.json
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import librosa
+import numpy as np
+
+from app.services import chord_recognition
+from app.services.analysis import iter_analysis_stages, merge_partial
+from app.services.audio_cache import evict_audio, load_audio
+from app.services.metrics import StageTimer, current_rss_bytes
+from app.services.presets import QUALITY_PRESETS
+from app.services.result_cache import hash_file
+from app.services.waveform import build_peak_pyramid
+from benchmarks.fixtures import (
+    DEFAULT_PROGRESSION,
+    chord_accuracy,
+    iter_progression,
+    transpose,
+    write_fixture,
+)
+
+SUITE_VERSION = 1
+FIXTURE_DIR = Path(os.environ.get("BENCH_FIXTURE_DIR", ".bench_fixtures"))
+RESULTS_DIR = Path(os.environ.get("BENCH_RESULTS_DIR", ".bench_results"))
+WARM_UP_SECONDS = 10
+BEAT_TOLERANCE_S = 0.07
+# --compare fails on accuracy drops beyond this and flags slowdowns beyond
+# SLOWDOWN_TOLERANCE (timings are reported, never failed: they are noisy).
+ACCURACY_TOLERANCE = 0.005
+SLOWDOWN_TOLERANCE = 0.10
+
+
+class Fixture(NamedTuple):
+    minutes: float
+    tempo: float
+    tonic: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.minutes:g}min_{self.tonic}_{self.tempo:g}bpm"
+
+    @property
+    def key(self) -> str:
+        return f"{self.tonic} Major"
+
+    @property
+    def progression(self) -> list[str]:
+        return transpose(
+            DEFAULT_PROGRESSION, chord_recognition.PITCH_CLASSES.index(self.tonic)
+        )
+
+
+FIXTURES = [
+    Fixture(0.5, 96.0, "C"),
+    Fixture(3, 110.0, "G"),
+    Fixture(20, 124.0, "D"),
+    Fixture(60, 100.0, "A"),
+    Fixture(120, 132.0, "F"),
+]
+
+
+def ensure_fixture(fixture: Fixture) -> tuple[Path, list[tuple]]:
+    """Path of the rendered ``fixture`` (rendering it if missing) and its ground truth."""
+    path = FIXTURE_DIR / f"{fixture.name}.wav"
+    kwargs = {"progression": fixture.progression, "tempo": fixture.tempo}
+    if path.exists():
+        _, truth = iter_progression(fixture.minutes * 60, **kwargs)
+        return (path, truth)
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp.wav")
+    truth = write_fixture(tmp_path, fixture.minutes * 60, **kwargs)
+    tmp_path.replace(path)
+    return (path, truth)
+
+
+def _hit_rate(times: np.ndarray, reference: np.ndarray, tolerance: float) -> float:
+    """Fraction of ``times`` within ``tolerance`` of some ``reference`` time."""
+    if not len(times) or not len(reference):
+        return 0.0
+    index = np.searchsorted(reference, times).clip(1, len(reference) - 1)
+    nearest = np.minimum(
+        np.abs(times - reference[index - 1]), np.abs(times - reference[index])
+    )
+    return float(np.mean(nearest <= tolerance))
+
+
+def score(results: dict, fixture: Fixture, truth: list[tuple]) -> dict:
+    """Accuracy of ``results`` against the fixture's ground truth."""
+    beats = np.asarray(results["beats"])
+    true_beats = np.arange(0.0, fixture.minutes * 60, 60.0 / fixture.tempo)
+    precision = _hit_rate(beats, true_beats, BEAT_TOLERANCE_S)
+    recall = _hit_rate(true_beats, beats, BEAT_TOLERANCE_S)
+    return {
+        "chords": round(chord_accuracy(results["chords"], truth), 4),
+        "key": results["key"],
+        "key_correct": results["key"] == fixture.key,
+        "tempo": round(results["tempo"], 2),
+        "tempo_error": round(abs(results["tempo"] - fixture.tempo) / fixture.tempo, 4),
+        "beat_f_measure": round(
+            2 * precision * recall / max(precision + recall, 1e-9), 4
+        ),
+    }
+
+
+def warm_up(quality: str) -> None:
+    """Compile numba kernels and load lazy modules outside the timed region."""
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / "warm_up.wav"
+        write_fixture(path, WARM_UP_SECONDS)
+        for _ in iter_analysis_stages(path, quality, use_cache=False):
+            pass
+        load_audio(path)
+        evict_audio(path)
+
+
+def run_case(path: Path, fixture: Fixture, quality: str, repeat: int) -> dict:
+    """Benchmark one fixture under one preset; meant to run in a fresh process."""
+    _, truth = iter_progression(
+        fixture.minutes * 60, progression=fixture.progression, tempo=fixture.tempo
+    )
+    warm_up(quality)
+    baseline_rss = current_rss_bytes()
+
+    timer = StageTimer(enabled=True)
+    timer.sample_rss()
+    with tempfile.TemporaryDirectory() as workdir:
+        with timer.stage("decode"):
+            y, _ = load_audio(path)
+        with timer.stage("waveform"):
+            np.save(Path(workdir) / "peaks.npy", build_peak_pyramid(y))
+    del y
+    evict_audio(path)
+    preview = timer.as_dict()
+
+    best = None
+    for _ in range(repeat):
+        results = {"chords": []}
+        for partial in iter_analysis_stages(path, quality, use_cache=False):
+            merge_partial(results, partial)
+        if best is None or results["metrics"]["wall_s"] < best["metrics"]["wall_s"]:
+            best = results
+        evict_audio(path)
+    pipeline = best["metrics"]
+    return {
+        "fixture": fixture.name,
+        "minutes": fixture.minutes,
+        "quality": quality,
+        "stages": {**preview["stages"], **pipeline["stages"]},
+        "pipeline_wall_s": pipeline["wall_s"],
+        "audio_seconds_per_second": pipeline["audio_seconds_per_second"],
+        "baseline_rss_bytes": baseline_rss,
+        "preview_peak_rss_bytes": preview["peak_rss_bytes"],
+        "pipeline_peak_rss_bytes": pipeline["peak_rss_bytes"],
+        "accuracy": score(best, fixture, truth),
+    }
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "librosa": librosa.__version__,
+    }
+
+
+def run_suite(
+    fixtures: list[Fixture], qualities: list[str], repeat: int, output: Optional[Path]
+) -> Path:
+    commit = _git("rev-parse", "HEAD")
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    report = {
+        "suite_version": SUITE_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "dirty": dirty,
+        "environment": environment(),
+        "cases": [],
+    }
+    if output is None:
+        output = (
+            RESULTS_DIR
+            / f"{(commit or 'unknown')[:12]}{'-dirty' if dirty else ''}.json"
+        )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    for fixture in fixtures:
+        start = time.perf_counter()
+        path, _ = ensure_fixture(fixture)
+        fixture_hash = hash_file(path)
+        print(f"{fixture.name}: fixture ready in {time.perf_counter() - start:.1f}s")
+        for quality in qualities:
+            with ProcessPoolExecutor(
+                1, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                case = pool.submit(run_case, path, fixture, quality, repeat).result()
+            case["fixture_hash"] = fixture_hash
+            report["cases"].append(case)
+            accuracy = case["accuracy"]
+            print(
+                f"  {quality:<8} | pipeline {case['pipeline_wall_s']:7.2f}s "
+                f"({case['audio_seconds_per_second']:6.1f}x) | "
+                f"decode {case['stages']['decode']['wall_s']:6.2f}s | "
+                f"waveform {case['stages']['waveform']['wall_s']:5.2f}s | "
+                f"peak {case['pipeline_peak_rss_bytes'] / 2**20:6.0f} MiB | "
+                f"chords {accuracy['chords']:6.1%} | key {accuracy['key_correct']!s:<5} | "
+                f"tempo {accuracy['tempo']:6.1f} | beats F {accuracy['beat_f_measure']:.3f}"
+            )
+            # Written after every case so an interrupted run keeps what it has.
+            output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {output}")
+    return output
+
+
+def compare(base_path: Path, new_path: Path) -> int:
+    """Print per-case differences between two result files; 1 if accuracy regressed."""
+    base, new = (json.loads(base_path.read_text()), json.loads(new_path.read_text()))
+    print(
+        f"{base.get('commit') or base_path.name} -> {new.get('commit') or new_path.name}"
+    )
+    base_cases = {(c["fixture"], c["quality"]): c for c in base["cases"]}
+    regressions = 0
+    for case in new["cases"]:
+        key = (case["fixture"], case["quality"])
+        old = base_cases.get(key)
+        if old is None:
+            print(f"{key[0]:<22} {key[1]:<8} | not in base")
+            continue
+        notes = []
+        if old["fixture_hash"] != case["fixture_hash"]:
+            notes.append("FIXTURE CHANGED")
+        speed = case["pipeline_wall_s"] / max(old["pipeline_wall_s"], 1e-9) - 1
+        if speed > SLOWDOWN_TOLERANCE:
+            notes.append("slower")
+        accuracy, old_accuracy = (case["accuracy"], old["accuracy"])
+        for metric in ("chords", "beat_f_measure"):
+            if accuracy[metric] < old_accuracy[metric] - ACCURACY_TOLERANCE:
+                notes.append(f"{metric} REGRESSED")
+        if old_accuracy["key_correct"] and not accuracy["key_correct"]:
+            notes.append("key REGRESSED")
+        if accuracy["tempo_error"] > old_accuracy["tempo_error"] + ACCURACY_TOLERANCE:
+            notes.append("tempo REGRESSED")
+        regressions += any("REGRESSED" in note for note in notes)
+        memory = (
+            case["pipeline_peak_rss_bytes"] / max(old["pipeline_peak_rss_bytes"], 1) - 1
+        )
+        print(
+            f"{key[0]:<22} {key[1]:<8} | "
+            f"pipeline {old['pipeline_wall_s']:7.2f}s -> {case['pipeline_wall_s']:7.2f}s "
+            f"({speed:+6.1%}) | peak RSS {memory:+6.1%} | "
+            f"chords {old_accuracy['chords']:6.1%} -> {accuracy['chords']:6.1%} | "
+            f"{', '.join(notes) or 'ok'}"
+        )
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark every pipeline stage on synthetic fixtures."
+    )
+    parser.add_argument(
+        "--max-minutes",
+        type=float,
+        default=None,
+        help="skip fixtures longer than this (default: run all, 30 s to 2 h)",
+    )
+    parser.add_argument(
+        "-q",
+        "--quality",
+        action="append",
+        choices=list(QUALITY_PRESETS),
+        help="preset to run; repeat for several (default: all)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="pipeline runs per case; the fastest is kept",
+    )
+    parser.add_argument("-o", "--output", type=Path, help="results JSON path")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        type=Path,
+        metavar=("BASE", "NEW"),
+        help="compare two results files instead of running",
+    )
+    args = parser.parse_args()
+    if args.compare:
+        return compare(*args.compare)
+    # Stage timings come from StageTimer, so the case processes need it on.
+    os.environ["METRICS_ENABLED"] = "1"
+    fixtures = [
+        f for f in FIXTURES if args.max_minutes is None or f.minutes <= args.max_minutes
+    ]
+    run_suite(
+        fixtures,
+        args.quality or list(QUALITY_PRESETS),
+        max(1, args.repeat),
+        args.output,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
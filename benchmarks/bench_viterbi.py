@@ -0,0 +1,86 @@
+"""Benchmark the key-informed Viterbi decoder against the old greedy path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_viterbi
+"""
+
+import time
+
+import librosa
+import numpy as np
+
+from app.services import chord_recognition
+from benchmarks.bench_chord_recognition import (
+    HOP_LENGTH,
+    SR,
+    greedy_path,
+    synthetic_input,
+)
+
+DURATIONS_MINUTES = [5, 60, 180]
+LARGE_VOCABULARY = 4 * len(chord_recognition.CHORD_LABELS)
+
+
+def beat_emissions(chroma: np.ndarray, beat_times: np.ndarray) -> np.ndarray:
+    beat_frames = librosa.time_to_frames(beat_times, sr=SR, hop_length=HOP_LENGTH)
+    beat_frames = np.concatenate(([0], beat_frames, [chroma.shape[1] - 1]))
+    beat_chroma = chord_recognition.beat_sync_chroma(chroma, beat_frames)
+    return chord_recognition.chord_emissions(beat_chroma)
+
+
+def segment_count(path: np.ndarray) -> int:
+    return int(np.count_nonzero(np.diff(path))) + 1 if len(path) else 0
+
+
+def run(minutes: float, key: str = "C Major") -> None:
+    chroma, beat_times = synthetic_input(minutes)
+    log_prob = beat_emissions(chroma, beat_times)
+
+    start = time.perf_counter()
+    greedy = greedy_path(log_prob)
+    greedy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = chord_recognition.viterbi(
+        chord_recognition.EMISSION_SCALE * log_prob,
+        chord_recognition.key_transition_matrix(key),
+        np.log(chord_recognition.key_chord_prior(key)),
+    )
+    viterbi_s = time.perf_counter() - start
+
+    frame_argmax = log_prob.argmax(axis=0)
+    print(
+        f"{minutes:>4} min | {log_prob.shape[1]:>6} beats | "
+        f"greedy {greedy_s:7.3f}s ({segment_count(greedy):>5} segments, "
+        f"{np.mean(greedy == frame_argmax):6.1%} match per-beat best) | "
+        f"viterbi {viterbi_s:7.3f}s ({segment_count(decoded):>5} segments, "
+        f"{np.mean(decoded == frame_argmax):6.1%} match per-beat best) | "
+        f"paths agree on {np.mean(greedy == decoded):6.1%} of beats"
+    )
+
+
+def run_large_vocabulary(minutes: float) -> None:
+    rng = np.random.default_rng(0)
+    n_beats = int(minutes * 60 * 2)
+    log_emission = -rng.random((LARGE_VOCABULARY, n_beats))
+    log_trans = np.full(
+        (LARGE_VOCABULARY, LARGE_VOCABULARY), np.log(0.2 / (LARGE_VOCABULARY - 1))
+    )
+    np.fill_diagonal(log_trans, np.log(0.8))
+    log_init = np.full(LARGE_VOCABULARY, -np.log(LARGE_VOCABULARY))
+    start = time.perf_counter()
+    chord_recognition.viterbi(
+        chord_recognition.EMISSION_SCALE * log_emission, log_trans, log_init
+    )
+    print(
+        f"{minutes:>4} min | {n_beats:>6} beats | {LARGE_VOCABULARY} states | "
+        f"viterbi {time.perf_counter() - start:7.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    for minutes in DURATIONS_MINUTES:
+        run(minutes)
+    for minutes in DURATIONS_MINUTES:
+        run_large_vocabulary(minutes)
@@ -0,0 +1,66 @@
+"""Waveform preview cost: legacy 2000-rect list vs peak pyramid with an SVG path.
+
+Reports the build time, the JSON payload that a state update ships, and the
+number of SVG elements the timeline renders at several zoom levels. Run from
+the repository root:
+
+    python -m benchmarks.bench_waveform
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services.audio_cache import load_audio
+from app.services.waveform import generate_waveform, read_peak_window
+from benchmarks.fixtures import write_fixture
+
+FIXTURE_SECONDS = 600
+LEGACY_SAMPLES = 2000
+ZOOMS = (1.0, 2.25, 5.06, 10.0)
+
+
+def legacy_waveform(y: np.ndarray, num_samples: int) -> list[float]:
+    """The per-bucket ``np.max`` list comprehension this module replaced."""
+    if np.max(np.abs(y)) > 0:
+        y = y / np.max(np.abs(y))
+    step = max(1, len(y) // num_samples)
+    peaks = [float(np.max(np.abs(y[i : i + step]))) for i in range(0, len(y), step)]
+    return peaks[:num_samples]
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / "fixture.wav"
+        write_fixture(path, FIXTURE_SECONDS)
+        y, _ = load_audio(path)
+
+        start = time.perf_counter()
+        peaks = legacy_waveform(y, LEGACY_SAMPLES)
+        legacy_s = time.perf_counter() - start
+        legacy_bytes = len(json.dumps(peaks))
+        print(
+            f"legacy  | build {legacy_s * 1e3:7.1f} ms | "
+            f"payload {legacy_bytes / 1024:6.1f} KiB | {len(peaks)} rects at any zoom"
+        )
+
+        start = time.perf_counter()
+        generate_waveform(path)
+        pyramid_s = time.perf_counter() - start
+        print(f"pyramid | build {pyramid_s * 1e3:7.1f} ms (all levels, incl. write)")
+        for zoom in ZOOMS:
+            start = time.perf_counter()
+            window = read_peak_window(path, zoom, 0.4)
+            read_ms = (time.perf_counter() - start) * 1e3
+            print(
+                f"  zoom {zoom:5.2f} | read {read_ms:5.1f} ms | "
+                f"payload {len(json.dumps(window.path)) / 1024:6.1f} KiB | "
+                f"{window.buckets:5d} buckets in 1 path"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Event-loop responsiveness under concurrent analyses: threads vs worker processes.
+
+Run from the repository root (number of concurrent jobs is optional):
+
+    python -m benchmarks.bench_workers 4
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.analysis import run_full_analysis
+from app.services.workers import analysis_engine
+from benchmarks.fixtures import write_fixture
+
+FIXTURE_SECONDS = 120
+TICK_S = 0.01
+
+
+async def measure_loop_lag(stop: asyncio.Event) -> list[float]:
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_S)
+        lags.append(time.perf_counter() - start - TICK_S)
+    return lags
+
+
+async def run(max_workers: int, paths: list[Path]) -> None:
+    analysis_engine.max_workers = max_workers
+    analysis_engine.start()
+    # Warm up every worker so only steady-state analysis is timed.
+    await asyncio.gather(
+        *(run_full_analysis(p, use_cache=False) for p in paths[: max(1, max_workers)])
+    )
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(run_full_analysis(p, use_cache=False) for p in paths))
+    wall = time.perf_counter() - start
+    stop.set()
+    lags = sorted(await ticker)
+    analysis_engine.shutdown()
+    mode = f"{max_workers} processes" if max_workers else "thread pool"
+    print(
+        f"{mode:>12} | {len(paths)} jobs in {wall:6.1f}s | "
+        f"loop lag p50 {lags[len(lags) // 2] * 1e3:6.1f} ms, "
+        f"p99 {lags[int(len(lags) * 0.99)] * 1e3:7.1f} ms, "
+        f"max {lags[-1] * 1e3:7.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for i in range(jobs):
+            path = Path(workdir) / f"fixture_{i}.wav"
+            write_fixture(path, FIXTURE_SECONDS, seed=i)
+            paths.append(path)
+        asyncio.run(run(0, paths))
+        asyncio.run(run(min(jobs, 4), paths))
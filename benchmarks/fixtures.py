@@ -0,0 +1,149 @@
+"""Deterministic synthetic audio fixtures rendered from the chord vocabulary."""
+
+import numpy as np
+import soundfile as sf
+from pathlib import Path
+from typing import Iterator
+
+from app.services import chord_recognition
+
+FIXTURE_SR = 44100
+BASS_GAIN = 1.5
+DEFAULT_PROGRESSION = [
+    "C:maj",
+    "A:min",
+    "F:maj",
+    "G:dom7",
+    "E:min",
+    "D:min",
+    "G:maj",
+    "C:maj",
+]
+
+
+def transpose(progression: list[str], semitones: int) -> list[str]:
+    """``progression`` moved by ``semitones``, slash basses included."""
+
+    def move(name: str) -> str:
+        pc = chord_recognition.PITCH_CLASSES.index(name)
+        return chord_recognition.PITCH_CLASSES[(pc + semitones) % 12]
+
+    moved = []
+    for label in progression:
+        chord, slash, bass_name = label.partition("/")
+        root_name, quality = chord.split(":")
+        moved.append(
+            f"{move(root_name)}:{quality}" + (slash + move(bass_name) if slash else "")
+        )
+    return moved
+
+
+def iter_progression(
+    duration_s: float,
+    progression: list[str] = DEFAULT_PROGRESSION,
+    tempo: float = 110.0,
+    beats_per_chord: int = 4,
+    sr: int = FIXTURE_SR,
+    seed: int = 0,
+    bass: bool = False,
+) -> tuple[Iterator[np.ndarray], list[tuple[float, float, str]]]:
+    """A looped progression as decaying harmonic tones with beat clicks.
+
+    Labels may name a slash bass (``"C:maj/E"``), which sounds an octave below
+    the chord; with ``bass`` every other chord gets its root there as well.
+    Returns an iterator of mono float32 blocks, one per chord, and the
+    ``(start, end, label)`` ground truth. Only one block is held at a time,
+    so fixtures of any length render in constant memory.
+    """
+    rng = np.random.default_rng(seed)
+    beat_s = 60.0 / tempo
+    chord_s = beat_s * beats_per_chord
+    chord_samples = int(round(chord_s * sr))
+    t = np.arange(chord_samples) / sr
+    envelope = np.exp(-(t % beat_s) * 1.5)
+    click = rng.normal(0, 1.0, 256) * np.exp(-np.arange(256) / 40)
+    rendered = {}
+    for label in set(progression):
+        chord, _, bass_name = label.partition("/")
+        root_name = chord.split(":")[0]
+        root = chord_recognition.PITCH_CLASSES.index(root_name)
+        voices = [
+            (48 + root + interval, 1.0)
+            for interval in chord_recognition.CHORD_MIDI_INTERVALS[chord]
+        ]
+        if bass_name or bass:
+            bass_pc = chord_recognition.PITCH_CLASSES.index(bass_name or root_name)
+            voices.append((36 + bass_pc, BASS_GAIN))
+        tone = np.zeros(chord_samples)
+        for midi, gain in voices:
+            freq = 440.0 * 2 ** ((midi - 69) / 12)
+            for harmonic in range(1, 5):
+                tone += gain * np.sin(2 * np.pi * freq * harmonic * t) / harmonic
+        tone *= envelope
+        for beat in range(beats_per_chord):
+            start = int(beat * beat_s * sr)
+            tone[start : start + len(click)] += click * 3
+        rendered[label] = tone.astype(np.float32)
+    n_chords = int(np.ceil(duration_s / chord_s))
+    n_samples = min(n_chords * chord_samples, int(duration_s * sr))
+    layout = [
+        (progression[i % len(progression)], min(chord_samples, n_samples - offset))
+        for i, offset in enumerate(range(0, n_samples, chord_samples))
+    ]
+    peak = max(
+        float(np.abs(rendered[label][:length]).max()) for label, length in set(layout)
+    )
+
+    def blocks() -> Iterator[np.ndarray]:
+        for label, length in layout:
+            yield rendered[label][:length] / np.float32(peak) * 0.9
+
+    truth = [
+        (
+            i * chord_s,
+            min((i + 1) * chord_s, duration_s),
+            progression[i % len(progression)],
+        )
+        for i in range(n_chords)
+        if i * chord_s < duration_s
+    ]
+    return (blocks(), truth)
+
+
+def render_progression(
+    duration_s: float, *args, **kwargs
+) -> tuple[np.ndarray, list[tuple[float, float, str]]]:
+    """The whole ``iter_progression`` signal in memory, with its ground truth."""
+    blocks, truth = iter_progression(duration_s, *args, **kwargs)
+    return (np.concatenate(list(blocks)), truth)
+
+
+def write_fixture(path: Path, duration_s: float, **kwargs) -> list[tuple]:
+    """Render a fixture to a 16-bit WAV at ``path`` and return its ground truth."""
+    blocks, truth = iter_progression(duration_s, **kwargs)
+    with sf.SoundFile(
+        str(path), "w", kwargs.get("sr", FIXTURE_SR), 1, subtype="PCM_16"
+    ) as f:
+        for block in blocks:
+            f.write(block)
+    return truth
+
+
+def chord_accuracy(
+    chords: list[dict], truth: list[tuple], resolution_s: float = 0.1
+) -> float:
+    """Fraction of time grid points where the predicted label matches the truth."""
+    if not truth:
+        return 0.0
+    grid = np.arange(0.0, truth[-1][1], resolution_s)
+    expected = np.array([label for _, _, label in truth])[
+        np.searchsorted([end for _, end, _ in truth], grid, side="right").clip(
+            0, len(truth) - 1
+        )
+    ]
+    if not chords:
+        return 0.0
+    starts = np.array([float(c["start_time"]) for c in chords])
+    labels = np.array([c["label"].replace(" ", ":") for c in chords])
+    predicted = labels[np.searchsorted(starts, grid, side="right").clip(1) - 1]
+    return float(np.mean(predicted == expected))
@@ -0,0 +1,35 @@
+import numpy as np
+
+from app.services.assets import (
+    CHORD_DTYPE,
+    MAX_WINDOW_BEATS,
+    MAX_WINDOW_CHORDS,
+    beats_in_window,
+    chords_in_window,
+)
+
+
+def _chord_table(boundaries: np.ndarray) -> np.ndarray:
+    table = np.zeros(len(boundaries) - 1, dtype=CHORD_DTYPE)
+    table["start_time"], table["end_time"] = (boundaries[:-1], boundaries[1:])
+    return table
+
+
+def test_short_windows_keep_every_beat_and_chord():
+    beats = np.arange(0.0, 60.0, 0.5, dtype=np.float32)
+    assert np.array_equal(beats_in_window(beats, 10.0, 20.0), beats[20:40])
+    table = _chord_table(np.arange(0.0, 61.0, 2.0))
+    assert len(chords_in_window(table, 9.0, 21.0)) == 7
+
+
+def test_long_windows_are_capped():
+    # Three hours of beats, and chords of very uneven lengths.
+    beats = np.arange(0.0, 3 * 3600.0, 0.5, dtype=np.float32)
+    assert len(beats_in_window(beats, 0.0, 3 * 3600.0)) <= MAX_WINDOW_BEATS
+    rng = np.random.default_rng(0)
+    lengths = rng.choice([0.25, 2.0, 90.0], size=400)
+    table = _chord_table(np.concatenate([[0.0], np.cumsum(lengths)]))
+    end = float(table["end_time"][-1])
+    kept = chords_in_window(table, 0.0, end)
+    assert 0 < len(kept) <= MAX_WINDOW_CHORDS
+    assert np.all(kept["end_time"] - kept["start_time"] >= end / MAX_WINDOW_CHORDS)
@@ -0,0 +1,44 @@
+import pytest
+
+from app.services.cancellation import (
+    AnalysisCancelled,
+    CancelToken,
+    cancel_job,
+    check_cancelled,
+    register_job,
+    unregister_job,
+)
+
+
+def test_token_raises_once_cancelled():
+    token = CancelToken()
+    token.raise_if_cancelled()
+    assert not token.cancelled
+    token.cancel()
+    assert token.cancelled
+    with pytest.raises(AnalysisCancelled):
+        token.raise_if_cancelled()
+    with pytest.raises(AnalysisCancelled):
+        check_cancelled(token)
+
+
+def test_check_cancelled_without_token_is_a_no_op():
+    check_cancelled(None)
+
+
+def test_cancel_job_cancels_registered_jobs_once():
+    token = CancelToken()
+    register_job("session:1:a", token)
+    assert cancel_job("session:1:a")
+    assert token.cancelled
+    assert not cancel_job("session:1:a")
+
+
+def test_cancel_job_ignores_unknown_and_finished_jobs():
+    token = CancelToken()
+    register_job("session:1:b", token)
+    unregister_job("session:1:b")
+    assert not cancel_job("session:1:b")
+    assert not cancel_job("")
+    assert not cancel_job(None)
+    assert not token.cancelled
@@ -0,0 +1,118 @@
+import itertools
+
+import numpy as np
+
+from app.services import chord_recognition
+from app.services.chord_recognition import (
+    ChordLattice,
+    decode_lattice,
+    decode_window,
+    viterbi,
+)
+
+
+def random_hmm(n_states: int, n_steps: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    log_emission = np.log(rng.dirichlet(np.ones(n_states), size=n_steps).T)
+    log_trans = np.log(rng.dirichlet(np.ones(n_states), size=n_states))
+    log_init = np.log(rng.dirichlet(np.ones(n_states)))
+    return (log_emission, log_trans, log_init)
+
+
+def path_score(path, log_emission, log_trans, log_init, log_final=None) -> float:
+    score = log_init[path[0]] + log_emission[path[0], 0]
+    for t in range(1, len(path)):
+        score += log_trans[path[t - 1], path[t]] + log_emission[path[t], t]
+    if log_final is not None:
+        score += log_final[path[-1]]
+    return score
+
+
+def brute_force(log_emission, log_trans, log_init, log_final=None) -> np.ndarray:
+    n_states, n_steps = log_emission.shape
+    best = max(
+        itertools.product(range(n_states), repeat=n_steps),
+        key=lambda p: path_score(p, log_emission, log_trans, log_init, log_final),
+    )
+    return np.array(best)
+
+
+def random_lattice(n_beats: int, seed: int = 0) -> ChordLattice:
+    n_states = len(chord_recognition.CHORD_LABELS)
+    log_emission, log_trans, log_init = random_hmm(n_states, n_beats, seed)
+    return ChordLattice(
+        emission=log_emission.astype(np.float32),
+        log_prob=log_emission - 1.0,
+        inversions=np.zeros(log_emission.shape, dtype=np.uint8),
+        log_trans=log_trans,
+        log_init=log_init,
+        segment_times=np.arange(n_beats + 1, dtype=float),
+    )
+
+
+def test_viterbi_finds_the_most_likely_path():
+    for seed in range(5):
+        hmm = random_hmm(3, 6, seed)
+        np.testing.assert_array_equal(viterbi(*hmm), brute_force(*hmm))
+
+
+def test_viterbi_scores_the_final_state():
+    log_emission, log_trans, log_init = random_hmm(3, 5, seed=1)
+    log_final = np.log(np.array([1e-6, 1e-6, 1.0]))
+    path = viterbi(log_emission, log_trans, log_init, log_final)
+    np.testing.assert_array_equal(
+        path, brute_force(log_emission, log_trans, log_init, log_final)
+    )
+
+
+def test_viterbi_stays_exact_over_long_float32_inputs():
+    # About three hours of beats; a float32 running score drifts enough to
+    # change dozens of steps of the decoded path.
+    log_emission, log_trans, log_init = random_hmm(12, 20000)
+    log_emission = log_emission.astype(np.float32)
+    score = log_init + log_emission[:, 0]
+    backpointers = np.zeros(log_emission.shape[::-1], dtype=int)
+    for t in range(1, log_emission.shape[1]):
+        candidates = score[:, None] + log_trans
+        backpointers[t] = candidates.argmax(axis=0)
+        score = candidates.max(axis=0) + log_emission[:, t]
+    expected = [int(score.argmax())]
+    for t in range(log_emission.shape[1] - 1, 0, -1):
+        expected.append(backpointers[t, expected[-1]])
+    np.testing.assert_array_equal(
+        viterbi(log_emission, log_trans, log_init), expected[::-1]
+    )
+
+
+def test_viterbi_empty_input():
+    assert len(viterbi(np.zeros((4, 0)), np.zeros((4, 4)), np.zeros(4))) == 0
+
+
+def test_decode_window_over_everything_matches_full_decode():
+    lattice = random_lattice(40)
+    full = decode_lattice(lattice)
+    pinned = np.full(40, -1)
+    np.testing.assert_array_equal(
+        decode_window(lattice, np.zeros(40, dtype=int), pinned, 0, 40), full
+    )
+
+
+def test_decode_window_keeps_an_optimal_path():
+    lattice = random_lattice(60, seed=2)
+    full = decode_lattice(lattice)
+    path = decode_window(lattice, full.copy(), np.full(60, -1), 20, 35)
+    np.testing.assert_array_equal(path, full)
+
+
+def test_decode_window_honours_pins_and_leaves_the_rest():
+    lattice = random_lattice(60, seed=3)
+    full = decode_lattice(lattice)
+    pinned = np.full(60, -1)
+    chord = (full[30] + 1) % lattice.emission.shape[0]
+    pinned[28:32] = chord
+    path = decode_window(lattice, full.copy(), pinned, 20, 40)
+    assert (path[28:32] == chord).all()
+    np.testing.assert_array_equal(path[:20], full[:20])
+    np.testing.assert_array_equal(path[40:], full[40:])
+    whole = decode_window(lattice, full.copy(), pinned, 0, 60)
+    assert (whole[28:32] == chord).all()
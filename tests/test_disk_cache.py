@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+
+from app.services.disk_cache import evict_lru
+from app.services.feature_store import AudioFeatures, FeatureStore
+
+
+def make_entries(root, sizes):
+    """Files and directories of the given sizes, each used a second after the last."""
+    entries = []
+    for i, size in enumerate(sizes):
+        entry = root / f"entry{i}"
+        if i % 2:
+            entry.mkdir()
+            (entry / "data").write_bytes(b"x" * size)
+        else:
+            entry.write_bytes(b"x" * size)
+        os.utime(entry, (1000 + i, 1000 + i))
+        entries.append(entry)
+    return entries
+
+
+def test_evicts_least_recently_used_until_under_budget(tmp_path):
+    entries = make_entries(tmp_path, [100, 100, 100, 100])
+    evicted = evict_lru(entries, max_bytes=250)
+    assert evicted == entries[:2]
+    assert [e.exists() for e in entries] == [False, False, True, True]
+
+
+def test_pinned_entries_are_kept_and_not_counted(tmp_path):
+    entries = make_entries(tmp_path, [100, 100, 100])
+    assert evict_lru(entries, max_bytes=150, pinned=lambda: {"entry0"}) == [entries[1]]
+    assert entries[0].exists() and entries[2].exists()
+
+
+def test_vanished_and_temporary_entries_are_skipped(tmp_path):
+    entries = make_entries(tmp_path, [100, 100])
+    tmp = tmp_path / "entry.123.tmp"
+    tmp.write_bytes(b"x" * 1000)
+    assert evict_lru([tmp_path / "gone", tmp, *entries], max_bytes=150) == [entries[0]]
+    assert tmp.exists()
+
+
+def test_unwritable_feature_store_is_skipped(tmp_path):
+    root = tmp_path / "features"
+    root.write_text("")
+    store = FeatureStore(root)
+    empty = np.zeros(0)
+    features = AudioFeatures(1.0, 120.0, None, empty, empty, empty, empty)
+    store.put("audio", "fast-v1", features)
+    assert store.get("audio", "fast-v1") is None
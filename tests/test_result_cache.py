@@ -0,0 +1,36 @@
+from app.services.analysis import analysis_fingerprint
+from app.services.result_cache import AnalysisResultCache
+
+
+def test_fingerprints_are_namespaced_by_preset():
+    fast, balanced = (analysis_fingerprint("fast"), analysis_fingerprint("balanced"))
+    assert fast.startswith("fast-") and balanced.startswith("balanced-")
+    assert fast != balanced
+
+
+def test_new_fingerprint_drops_only_its_own_namespace(tmp_path):
+    cache = AnalysisResultCache(tmp_path)
+    cache.put("audio", "fast-old", {"key": "C Major"})
+    cache.put("audio", "balanced-v1", {"key": "G Major"})
+
+    assert cache.get("audio", "fast-new") is None
+    assert not (tmp_path / "fast-old").exists()
+    assert cache.get("audio", "balanced-v1") == {"key": "G Major"}
+
+
+def test_presets_do_not_evict_each_other(tmp_path):
+    cache = AnalysisResultCache(tmp_path)
+    for preset in ("fast", "balanced", "hq"):
+        cache.put("audio", f"{preset}-v1", {"quality": preset})
+    fresh = AnalysisResultCache(tmp_path)
+    for preset in ("hq", "fast", "balanced"):
+        assert fresh.get("audio", f"{preset}-v1") == {"quality": preset}
+
+
+def test_unwritable_cache_is_skipped(tmp_path):
+    # A file where the cache directory should be makes every write fail.
+    root = tmp_path / "cache"
+    root.write_text("")
+    cache = AnalysisResultCache(root)
+    cache.put("audio", "fast-v1", {"key": "C Major"})
+    assert cache.get("audio", "fast-v1") is None
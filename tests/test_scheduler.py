@@ -0,0 +1,55 @@
+import pytest
+
+from app.services.scheduler import AnalysisScheduler, SessionLimitError
+
+
+def scheduler(**kwargs) -> AnalysisScheduler:
+    options = {"max_concurrent": 1, "max_per_session": 3, "memory_budget": 2**40}
+    return AnalysisScheduler(**{**options, **kwargs})
+
+
+def admission_order(tickets) -> list:
+    """Release each job as soon as it runs; returns the order they ran in."""
+    order = []
+    while len(order) < len(tickets):
+        running = [t for t in tickets if t.admitted.is_set() and not t.released]
+        assert len(running) == 1
+        order.append(running[0])
+        running[0].release()
+    return order
+
+
+def test_sessions_take_turns():
+    s = scheduler()
+    a1, a2, a3 = (s.submit("a", 60) for _ in range(3))
+    b1 = s.submit("b", 60)
+    c1 = s.submit("c", 60)
+    assert admission_order([a1, a2, a3, b1, c1]) == [a1, b1, c1, a2, a3]
+
+
+def test_session_limit():
+    s = scheduler(max_per_session=2)
+    s.submit("a", 10)
+    s.submit("a", 10)
+    with pytest.raises(SessionLimitError):
+        s.submit("a", 10)
+    s.submit("b", 10)
+
+
+def test_memory_budget_holds_back_large_jobs_but_never_a_lone_one():
+    s = scheduler(max_concurrent=4, memory_budget=1)
+    first, second = (s.submit("a", 600), s.submit("b", 600))
+    assert first.admitted.is_set() and not second.admitted.is_set()
+    first.release()
+    assert second.admitted.is_set()
+
+
+def test_queue_positions_and_cancellation_stats():
+    s = scheduler()
+    running, queued = (s.submit("a", 60), s.submit("b", 60))
+    assert s.status(queued).position == 1
+    assert s.status(running).position == 0
+    queued.release(cancelled=True)
+    stats = s.cancellation_stats()
+    assert stats["cancelled_jobs"] == 1 and stats["cancelled_while_queued"] == 1
+    assert stats["worker_seconds_saved_estimate"] > 0
@@ -0,0 +1,28 @@
+from app.services.uploads import sniff_audio_format
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, no padding: 417-byte frames.
+MP3_HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+MP3_FRAME = MP3_HEADER + bytes(413)
+
+
+def test_mp3_frames_are_recognized():
+    assert sniff_audio_format(MP3_FRAME * 3) == "mp3"
+    assert sniff_audio_format(MP3_FRAME) == "mp3"
+    assert sniff_audio_format(b"ID3\x04\x00" + bytes(16)) == "mp3"
+
+
+def test_lookalike_sync_bytes_are_rejected():
+    utf16_text = b"\xff\xfe" + "hello, world".encode("utf-16-le") * 40
+    adts_aac = [bytes([0xFF, b, 0x50, 0x80]) + bytes(400) for b in (0xF1, 0xF9)]
+    bad_bitrate = bytes([0xFF, 0xFB, 0xF0, 0x00]) + bytes(413)
+    bad_rate = bytes([0xFF, 0xFB, 0x9C, 0x00]) + bytes(413)
+    no_second_frame = MP3_FRAME + bytes(417)
+
+    for head in (utf16_text, *adts_aac, bad_bitrate, bad_rate, no_second_frame):
+        assert sniff_audio_format(head) is None
+
+
+def test_container_formats_are_recognized():
+    assert sniff_audio_format(b"RIFF\x24\x00\x00\x00WAVEfmt ") == "wav"
+    assert sniff_audio_format(b"fLaC\x00\x00\x00\x22") == "flac"
+    assert sniff_audio_format(b"OggS\x00\x02") == "ogg"
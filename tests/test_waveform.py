@@ -0,0 +1,61 @@
+import re
+
+import numpy as np
+import soundfile as sf
+
+from app.services import streaming
+from app.services.audio_cache import ANALYSIS_SR
+from app.services.waveform import (
+    PEAK_SCALE,
+    build_peak_pyramid,
+    generate_waveform,
+    peak_outline_path,
+    peaks_path,
+)
+
+
+def outline_points(path: str) -> list[tuple[int, int]]:
+    """Absolute vertices of a path made of M, relative l, V and Z commands."""
+    x, y = map(int, re.match(r"M(-?\d+) (-?\d+)", path).groups())
+    points = [(x, y)]
+    for command, args in re.findall(r"([lV])([^lVZ]*)", path):
+        numbers = [int(n) for n in re.findall(r"-?\d+", args)]
+        if command == "V":
+            y = numbers[0]
+            points.append((x, y))
+            continue
+        for dx, dy in zip(numbers[::2], numbers[1::2]):
+            x, y = (x + dx, y + dy)
+            points.append((x, y))
+    return points
+
+
+def test_outline_traces_maxs_forward_and_mins_back():
+    maxs = np.array([10, 20, 5, 127, 0], dtype=np.int8)
+    mins = np.array([-10, -20, -5, -128, 0], dtype=np.int8)
+    path = peak_outline_path(mins, maxs)
+    assert path.startswith("M0 ") and path.endswith("Z")
+    points = outline_points(path)
+    top = [(i, PEAK_SCALE - int(v)) for i, v in enumerate(maxs)]
+    bottom = [(i, PEAK_SCALE - int(v)) for i, v in enumerate(mins)][::-1]
+    assert points == top + bottom
+
+
+def test_outline_of_one_bucket_spans_one_unit():
+    points = outline_points(peak_outline_path(np.array([-3]), np.array([4])))
+    assert points == [(0, 123), (1, 123), (1, 130), (0, 130)]
+
+
+def test_outline_of_nothing_is_empty():
+    assert peak_outline_path(np.array([]), np.array([])) == ""
+
+
+def test_streamed_pyramid_matches_in_memory_build(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    y = (0.5 * rng.standard_normal(ANALYSIS_SR * 70)).clip(-1, 1).astype(np.float32)
+    path = tmp_path / "noise.wav"
+    sf.write(path, y, ANALYSIS_SR, subtype="FLOAT")
+    monkeypatch.setattr(streaming, "STREAMING_MIN_DURATION_S", 0)
+
+    assert generate_waveform(path) == len(y) / ANALYSIS_SR
+    assert np.array_equal(np.load(peaks_path(path)), build_peak_pyramid(y))
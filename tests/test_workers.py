@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.cancellation import AnalysisCancelled, check_cancelled
+from app.services.workers import AnalysisEngine
+
+
+def test_cancelled_stream_keeps_its_worker_busy_until_it_stops():
+    engine = AnalysisEngine(max_workers=0)
+    in_stage = threading.Event()
+    finish_stage = threading.Event()
+
+    def slow_stages(token):
+        yield "first"
+        in_stage.set()
+        finish_stage.wait(5)  # a long stage with no checkpoint inside
+        check_cancelled(token)
+        yield "second"
+
+    async def main():
+        token = engine.new_cancel_token()
+        items = []
+        with pytest.raises(AnalysisCancelled):
+            async for item in engine.stream(
+                "a.wav", slow_stages, token, cancel_token=token
+            ):
+                items.append(item)
+                await asyncio.get_running_loop().run_in_executor(None, in_stage.wait)
+                token.cancel()
+        assert items == ["first"]
+        still_running = engine.still_running(token)
+        assert still_running is not None
+        assert engine._pending == [1]
+
+        finish_stage.set()
+        with pytest.raises(AnalysisCancelled):
+            await still_running
+        await asyncio.sleep(0)
+        assert engine._pending == [0]
+        assert engine.still_running(token) is None
+
+    try:
+        asyncio.run(main())
+    finally:
+        engine.shutdown()